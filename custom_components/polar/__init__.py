@@ -2,18 +2,52 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
 import logging
+import shutil
+
+from aiohttp import ClientError
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
-
-from .const import CONF_USER_ID, DOMAIN
-from .coordinator import PolarCoordinator
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .activity_samples import DailyActivitySampleStore
+from .client import async_release_client
+from .const import (
+    CONF_USER_ID,
+    CONF_WEBHOOK,
+    CONF_WEBHOOK_SECRET,
+    DOMAIN,
+    WEBHOOK_FALLBACK_SCAN_INTERVAL,
+)
+from .coordinator import PolarData
+from .exercise_samples import ExerciseSampleStore
+from .history import (
+    DailyActivityHistory,
+    ExerciseHistory,
+    PhysicalInfoHistory,
+    RechargeHistory,
+    RouteHistory,
+    SleepHistory,
+)
+from .polaraccesslink.ratelimit import RateLimitExceeded
+from .services import async_setup_services
+from .training_load import TrainingLoadTracker
+from .webhook import async_remove_webhook, async_setup_webhook
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [Platform.SENSOR]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Polar services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -26,23 +60,79 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             entry, unique_id=str(entry.data[CONF_USER_ID])
         )
 
-    coordinator = PolarCoordinator(hass, entry)
+    polar = PolarData(hass, entry)
 
-    await coordinator.async_refresh()
+    await polar.async_refresh()
 
-    if not coordinator.last_update_success:
+    if not polar.last_update_success:
+        async_release_client(hass, entry)
         raise ConfigEntryNotReady
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+    hass.data[DOMAIN][entry.entry_id] = polar
+
+    if entry.options.get(CONF_WEBHOOK, False):
+        try:
+            await async_setup_webhook(hass, entry, polar)
+        except (ClientError, TimeoutError, KeyError, RateLimitExceeded) as err:
+            _LOGGER.error("Unable to set up Polar webhook, keep polling: %s", err)
+        else:
+            polar.set_push_mode(timedelta(minutes=WEBHOOK_FALLBACK_SCAN_INTERVAL))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options changed."""
+    polar: PolarData = hass.data[DOMAIN][entry.entry_id]
+    if entry.options == polar.options:
+        # data was updated, like the webhook secret
+        return
+
+    if not entry.options.get(CONF_WEBHOOK, False) and entry.data.get(
+        CONF_WEBHOOK_SECRET
+    ):
+        await _async_remove_webhook(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_remove_webhook(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the Polar webhook, logging failures."""
+    try:
+        await async_remove_webhook(hass, entry)
+    except (ClientError, TimeoutError, RateLimitExceeded) as err:
+        _LOGGER.warning("Unable to remove Polar webhook: %s", err)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_release_client(hass, entry)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove stored data and the Polar webhook of the last entry of a client."""
+    for history_class in (
+        DailyActivityHistory,
+        ExerciseHistory,
+        PhysicalInfoHistory,
+        RechargeHistory,
+        RouteHistory,
+        SleepHistory,
+    ):
+        await history_class(hass, entry.entry_id).async_remove()
+    await ExerciseSampleStore(hass, entry.entry_id).async_remove()
+    await DailyActivitySampleStore(hass, entry.entry_id).async_remove()
+    await TrainingLoadTracker(hass, entry.entry_id).async_remove()
+    # exported route files
+    await hass.async_add_executor_job(
+        shutil.rmtree, hass.config.path(DOMAIN, "routes", entry.entry_id), True
+    )
+
+    if entry.data.get(CONF_WEBHOOK_SECRET):
+        await _async_remove_webhook(hass, entry)
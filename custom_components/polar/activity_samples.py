@@ -0,0 +1,37 @@
+"""Storage of Polar daily activity samples."""
+
+from __future__ import annotations
+
+from datetime import date
+import mmap
+
+from .polaraccesslink.activity_samples import (
+    DailyActivitySamples,
+    dump_activity_samples,
+    load_activity_samples,
+)
+from .sample_store import SampleStore
+
+
+class DailyActivitySampleStore(SampleStore[DailyActivitySamples]):
+    """Step and activity zone samples of a user, in one binary file per day.
+
+    Files are named after the ISO date of their day, so the newest day is
+    found without reading any file.
+    """
+
+    directory = "activity_samples"
+
+    def _dump(self, samples: DailyActivitySamples) -> bytes:
+        """Serialize samples of a day."""
+        return dump_activity_samples(samples)
+
+    def _load(self, key: str, buffer: mmap.mmap) -> DailyActivitySamples:
+        """Deserialize samples of a day."""
+        return load_activity_samples(date.fromisoformat(key), buffer)
+
+    async def async_load_latest(self) -> DailyActivitySamples | None:
+        """Load samples of the newest stored day."""
+        if not (days := await self._async_get_stored_keys()):
+            return None
+        return await self.async_load(max(days))
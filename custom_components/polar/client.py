@@ -0,0 +1,116 @@
+"""Polar client shared by config entries."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DATA_CLIENTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DOMAIN,
+    NOTIFICATIONS_TTL,
+    REFRESH_STAGGER,
+)
+from .polaraccesslink.accesslink import AsyncAccessLink
+from .polaraccesslink.metrics import RequestMetrics
+from .polaraccesslink.ratelimit import RateLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PolarClient:
+    """Runtime of a Polar client, shared by the entries of its users.
+
+    Entries of family members often share a client ID and secret. They use a
+    single AccessLink, so one connection pool, response cache and rate limit
+    budget, and their refreshes are staggered.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the client."""
+        self.client_id: str = entry.data[CONF_CLIENT_ID]
+        max_concurrency = entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        self.accesslink = AsyncAccessLink(
+            session=async_get_clientsession(hass),
+            client_id=self.client_id,
+            client_secret=entry.data[CONF_CLIENT_SECRET],
+            max_concurrency=max_concurrency,
+            limiter=RateLimiter(max_concurrency),
+            # requests are counted per local day
+            metrics=RequestMetrics(today=lambda: dt_util.now().date()),
+        )
+        self.entry_ids: set[str] = set()
+        # loop time the refresh of the next entry may start at
+        self._next_refresh_turn: float | None = None
+        self._notifications_lock = asyncio.Lock()
+        self._notifications: dict | None = None
+        self._notifications_time = 0.0
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        """Return metrics of the requests of the client."""
+        return self.accesslink.oauth.metrics
+
+    def reserve_refresh_turn(self) -> float:
+        """Return the loop time the next refresh of an entry may start at.
+
+        Turns are reserved without waiting, so entries only wait for their own
+        turn and the coordinators of an entry still refresh together.
+        """
+        now = asyncio.get_running_loop().time()
+        turn = (
+            now
+            if self._next_refresh_turn is None
+            else max(now, self._next_refresh_turn)
+        )
+        self._next_refresh_turn = turn + REFRESH_STAGGER
+        return turn
+
+    async def async_get_available_data_types(self, user_id: str) -> set[str]:
+        """Return data types Polar announces new data of for a user.
+
+        Pull notifications list every user of the client, so they are fetched
+        once for all the coordinators of its entries.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._notifications_lock:
+            if (
+                self._notifications is None
+                or loop.time() - self._notifications_time > NOTIFICATIONS_TTL
+            ):
+                self._notifications = await self.accesslink.pull_notifications.list()
+                self._notifications_time = loop.time()
+        return {
+            notification["data-type"]
+            for notification in self._notifications.get("available-user-data", [])
+            if str(notification["user-id"]) == user_id
+        }
+
+
+def async_get_client(hass: HomeAssistant, entry: ConfigEntry) -> PolarClient:
+    """Return the client of an entry, creating it for its first entry."""
+    clients: dict[str, PolarClient] = hass.data[DOMAIN].setdefault(DATA_CLIENTS, {})
+    if (client := clients.get(entry.data[CONF_CLIENT_ID])) is None:
+        client = clients[entry.data[CONF_CLIENT_ID]] = PolarClient(hass, entry)
+    client.entry_ids.add(entry.entry_id)
+    return client
+
+
+def async_release_client(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release the client of an unloaded entry, dropping it after its last one."""
+    clients: dict[str, PolarClient] = hass.data[DOMAIN].get(DATA_CLIENTS, {})
+    if (client := clients.get(entry.data[CONF_CLIENT_ID])) is None:
+        return
+    client.entry_ids.discard(entry.entry_id)
+    if not client.entry_ids:
+        clients.pop(client.client_id)
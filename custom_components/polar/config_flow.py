@@ -26,9 +26,24 @@ from homeassistant.helpers.config_entry_oauth2_flow import _decode_jwt, _encode_
 from .const import (
     AUTH_CALLBACK_NAME,
     AUTH_CALLBACK_PATH,
+    CONF_ACTIVITY_SAMPLES,
+    CONF_ADAPTIVE_POLLING,
+    CONF_EXERCISE_SAMPLES,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PULL_NOTIFICATIONS,
+    CONF_ROUTE_COMPRESS,
+    CONF_ROUTE_EXPORT,
     CONF_USER_ID,
+    CONF_WEBHOOK,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
+    ROUTE_EXPORT_FORMATS,
+    ROUTE_EXPORT_NONE,
 )
 from .polaraccesslink.accesslink import AccessLink
 
@@ -163,8 +178,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None) -> ConfigFlowResult:
         """Handle options flow."""
+        errors: dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_scan_interval_range"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         data_schema = vol.Schema(
             {
@@ -174,9 +193,61 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_SCAN_INTERVAL, self.config_entry.data[CONF_SCAN_INTERVAL]
                     ),
                 ): int,
+                vol.Required(
+                    CONF_ADAPTIVE_POLLING,
+                    default=self.config_entry.options.get(CONF_ADAPTIVE_POLLING, False),
+                ): bool,
+                vol.Required(
+                    CONF_MIN_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Required(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=self.config_entry.options.get(
+                        CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                    ),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Required(
+                    CONF_PULL_NOTIFICATIONS,
+                    default=self.config_entry.options.get(
+                        CONF_PULL_NOTIFICATIONS, False
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_WEBHOOK,
+                    default=self.config_entry.options.get(CONF_WEBHOOK, False),
+                ): bool,
+                vol.Required(
+                    CONF_EXERCISE_SAMPLES,
+                    default=self.config_entry.options.get(CONF_EXERCISE_SAMPLES, False),
+                ): bool,
+                vol.Required(
+                    CONF_ACTIVITY_SAMPLES,
+                    default=self.config_entry.options.get(CONF_ACTIVITY_SAMPLES, False),
+                ): bool,
+                vol.Required(
+                    CONF_ROUTE_EXPORT,
+                    default=self.config_entry.options.get(
+                        CONF_ROUTE_EXPORT, ROUTE_EXPORT_NONE
+                    ),
+                ): vol.In(ROUTE_EXPORT_FORMATS),
+                vol.Required(
+                    CONF_ROUTE_COMPRESS,
+                    default=self.config_entry.options.get(CONF_ROUTE_COMPRESS, True),
+                ): bool,
             }
         )
-        return self.async_show_form(step_id="init", data_schema=data_schema)
+        return self.async_show_form(
+            step_id="init", data_schema=data_schema, errors=errors
+        )
 
 
 class PolarAuthCallbackView(HomeAssistantView):
@@ -3,20 +3,68 @@
 DOMAIN = "polar"
 
 CONF_USER_ID = "user_id"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_PULL_NOTIFICATIONS = "pull_notifications"
+CONF_WEBHOOK = "webhook"
+CONF_EXERCISE_SAMPLES = "exercise_samples"
+CONF_ACTIVITY_SAMPLES = "activity_samples"
+CONF_ROUTE_EXPORT = "route_export"
+CONF_ROUTE_COMPRESS = "route_compress"
+CONF_WEBHOOK_SECRET = "webhook_secret"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
 DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+# minutes between two polls in adaptive polling mode
+DEFAULT_MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 240
+ROUTE_EXPORT_NONE = "none"
+ROUTE_EXPORT_FORMATS = [ROUTE_EXPORT_NONE, "gpx", "tcx"]
+# minutes between two polls when webhook push mode is enabled
+WEBHOOK_FALLBACK_SCAN_INTERVAL = 360
+# minutes between two polls of user data, which rarely changes
+USER_DATA_SCAN_INTERVAL = 360
+# minutes user information is kept, physical information being delivered by
+# transactions when it changes
+USER_INFO_TTL = 1440
+# seconds between the refreshes of entries sharing a client
+REFRESH_STAGGER = 10
+# seconds pull notifications of a client are reused
+NOTIFICATIONS_TTL = 60
+# days exercises missing their samples or route are downloaded again for, the
+# exercise list covering 30 days
+EXTRAS_BACKFILL_DAYS = 30
+# failed downloads of the samples or route of an exercise before giving up
+EXTRAS_MAX_ATTEMPTS = 3
+
+DATA_CLIENTS = "clients"
 
 ATTR_EXERCISE_DATA = "exercisedata"
 ATTR_SLEEP_DATA = "sleepdata"
 ATTR_RECHARGE_DATA = "rechargedata"
 ATTR_USER_DATA = "userdata"
 ATTR_DAILY_DATA = "dailydata"
+# statistics of step and zone samples of daily activities
+ATTR_ACTIVITY_SAMPLES = "activitysamples"
+
+# pull notification data type announcing new data of a category
+NOTIFICATION_DATA_TYPES = {
+    ATTR_EXERCISE_DATA: "EXERCISE",
+    ATTR_DAILY_DATA: "ACTIVITY_SUMMARY",
+    ATTR_USER_DATA: "PHYSICAL_INFORMATION",
+}
 
 ATTR_LAST_EXERCISE = "last_exercise"
 ATTR_LAST_SLEEP = "last_sleep"
 ATTR_LAST_DAILY = "last_daily"
 ATTR_LAST_RECHARGE = "last_recharge"
+ATTR_LAST_ACTIVITY_SAMPLES = "last_activity_samples"
+ATTR_TRAINING_LOAD = "training_load"
 
 AUTH_CALLBACK_NAME = "api:polar_auth"
 AUTH_CALLBACK_PATH = "/api/polar_auth"
+WEBHOOK_NAME = "api:polar_webhook"
+WEBHOOK_PATH = "/api/polar_webhook"
 
 ATTRIBUTION = "Data provided by Polar"
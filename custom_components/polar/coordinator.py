@@ -1,59 +1,293 @@
-"""Polar data coordinator."""
+"""Polar data coordinators."""
 
 from __future__ import annotations
 
-from datetime import timedelta
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Awaitable, Callable, Mapping
+from datetime import date, timedelta
+from functools import partial
+import hashlib
 import logging
+import time
+from typing import Any
+from xml.etree.ElementTree import ParseError
+
+from aiohttp import ClientError, ClientResponseError
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    CONF_ACCESS_TOKEN,
-    CONF_CLIENT_ID,
-    CONF_CLIENT_SECRET,
-    CONF_NAME,
-    CONF_SCAN_INTERVAL,
-)
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_NAME, CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .activity_samples import DailyActivitySampleStore
+from .client import async_get_client
 from .const import (
+    ATTR_ACTIVITY_SAMPLES,
     ATTR_DAILY_DATA,
     ATTR_EXERCISE_DATA,
+    ATTR_LAST_ACTIVITY_SAMPLES,
     ATTR_LAST_DAILY,
     ATTR_LAST_EXERCISE,
     ATTR_LAST_RECHARGE,
     ATTR_LAST_SLEEP,
     ATTR_RECHARGE_DATA,
     ATTR_SLEEP_DATA,
+    ATTR_TRAINING_LOAD,
     ATTR_USER_DATA,
+    CONF_ACTIVITY_SAMPLES,
+    CONF_ADAPTIVE_POLLING,
+    CONF_EXERCISE_SAMPLES,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PULL_NOTIFICATIONS,
+    CONF_ROUTE_COMPRESS,
+    CONF_ROUTE_EXPORT,
     CONF_USER_ID,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
     DOMAIN,
+    EXTRAS_BACKFILL_DAYS,
+    EXTRAS_MAX_ATTEMPTS,
+    NOTIFICATION_DATA_TYPES,
+    REFRESH_STAGGER,
+    ROUTE_EXPORT_NONE,
+    USER_DATA_SCAN_INTERVAL,
+    USER_INFO_TTL,
+)
+from .exercise_samples import ExerciseSampleStore
+from .history import (
+    DailyActivityHistory,
+    ExerciseHistory,
+    PhysicalInfoHistory,
+    PolarHistory,
+    RechargeHistory,
+    RouteHistory,
+    SleepHistory,
+)
+from .polaraccesslink.activity_samples import (
+    ACTIVITY_ZONES,
+    SEDENTARY_ZONE,
+    DailyActivitySamples,
+)
+from .polaraccesslink.models import (
+    DailyActivity,
+    Exercise,
+    Night,
+    PhysicalInfo,
+    Recharge,
+    UserInfo,
 )
-from .polaraccesslink.accesslink import AccessLink
+from .polaraccesslink.ratelimit import PRIORITY_LOW, RateLimitExceeded, request_priority
+from .polaraccesslink.routes import summarize_route
+from .polaraccesslink.serializer import DEFAULT_SERIALIZER
+from .polaraccesslink.utils import gather_limited
+from .scheduler import AdaptiveScheduler
+from .statistics import PolarStatisticsImporter
+from .training_load import TrainingLoadTracker
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class PolarCoordinator(DataUpdateCoordinator):
-    """Data update coordinator."""
+def _is_rate_limited(err: Exception) -> bool:
+    """Return True if a request failed because of the rate limit."""
+    return isinstance(err, RateLimitExceeded) or (
+        isinstance(err, ClientResponseError) and err.status == 429
+    )
+
+
+def _fingerprint(record: Mapping[str, Any]) -> str:
+    """Return a digest of a record, to detect changes."""
+    return hashlib.sha1(
+        DEFAULT_SERIALIZER.dumps(dict(record), sort_keys=True)
+    ).hexdigest()
+
+
+class PolarData:
+    """Runtime data of a Polar entry, shared by its coordinators."""
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the runtime data and the coordinators."""
+        self.hass = hass
+        self.entry = entry
+        # options the entry was set up with
+        self.options = dict(entry.options)
+        self.client = async_get_client(hass, entry)
+        self.accesslink = self.client.accesslink
+        self.histories: dict[str, PolarHistory] = {
+            ATTR_EXERCISE_DATA: ExerciseHistory(hass, entry.entry_id),
+            ATTR_SLEEP_DATA: SleepHistory(hass, entry.entry_id),
+            ATTR_RECHARGE_DATA: RechargeHistory(hass, entry.entry_id),
+            ATTR_DAILY_DATA: DailyActivityHistory(hass, entry.entry_id),
+            ATTR_USER_DATA: PhysicalInfoHistory(hass, entry.entry_id),
+        }
+        self.exercise_samples = ExerciseSampleStore(hass, entry.entry_id)
+        self.activity_samples = DailyActivitySampleStore(hass, entry.entry_id)
+        self.route_history = RouteHistory(hass, entry.entry_id)
+        self.training_load = TrainingLoadTracker(hass, entry.entry_id)
+        self.statistics = PolarStatisticsImporter(hass, self.user_id, self.user_name)
+        # loop time the refreshes of the current cycle may start at
+        self._refresh_turn: float | None = None
+        self.coordinators: dict[str, PolarCoordinator] = {
+            coordinator_class.category: coordinator_class(hass, entry, self)
+            for coordinator_class in (
+                PolarUserDataCoordinator,
+                PolarExerciseCoordinator,
+                PolarSleepCoordinator,
+                PolarRechargeCoordinator,
+                PolarDailyActivityCoordinator,
+            )
+        }
+
+    @property
+    def user_name(self) -> str:
+        """Return name of the user."""
+        return self.entry.data[CONF_NAME]
+
+    @property
+    def entry_id(self) -> str:
+        """Return entry ID."""
+        return self.entry.entry_id
+
+    @property
+    def user_id(self) -> str:
+        """Return Polar user ID."""
+        return str(self.entry.data[CONF_USER_ID])
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """Return the last data of every coordinator."""
+        data: dict[str, Any] = {}
+        for coordinator in self.coordinators.values():
+            data.update(coordinator.data or {})
+        return data
+
+    @property
+    def last_update_success(self) -> bool:
+        """Return True if a data category could be updated."""
+        return any(
+            coordinator.last_update_success
+            for coordinator in self.coordinators.values()
+        )
+
+    @property
+    def refresh_durations(self) -> dict[str, float]:
+        """Return seconds the last refresh of every data category took."""
+        return {
+            category: coordinator.last_refresh_duration
+            for category, coordinator in self.coordinators.items()
+            if coordinator.last_refresh_duration is not None
+        }
+
+    def get_coordinator(self, key_category: str) -> PolarCoordinator:
+        """Return the coordinator providing a data key."""
+        return next(
+            coordinator
+            for coordinator in self.coordinators.values()
+            if key_category
+            in (coordinator.category, coordinator.last_key, *coordinator.extra_keys)
+        )
+
+    async def async_refresh(self) -> None:
+        """Refresh every data category."""
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in self.coordinators.values())
+        )
+
+    async def async_wait_refresh_turn(self) -> None:
+        """Wait for the turn of the entry among the entries of its client.
+
+        A turn is reserved once per refresh cycle, so the coordinators of the
+        entry, which are scheduled together, share it and refresh at the same
+        time.
+        """
+        now = asyncio.get_running_loop().time()
+        if self._refresh_turn is None or now >= self._refresh_turn + REFRESH_STAGGER:
+            self._refresh_turn = self.client.reserve_refresh_turn()
+        if (delay := self._refresh_turn - now) > 0:
+            _LOGGER.debug(
+                "Delaying refresh of %s by %.1f seconds", self.user_name, delay
+            )
+            await asyncio.sleep(delay)
+
+    async def async_request_categories_refresh(self, categories: list[str]) -> None:
+        """Request a refresh of some data categories, new data being available."""
+        for category in categories:
+            await self.coordinators[category].async_request_new_data_refresh()
+
+    def set_push_mode(self, fallback_interval: timedelta) -> None:
+        """Poll every fallback interval at most, Polar pushing new data."""
+        for coordinator in self.coordinators.values():
+            coordinator.push_mode = True
+            coordinator.update_interval = max(
+                coordinator.update_interval, fallback_interval
+            )
+
+
+class PolarCoordinator(DataUpdateCoordinator[dict[str, Any]], ABC):
+    """Coordinator of one category of Polar data.
+
+    Every category has its own update interval, failures and listeners. Its
+    data holds the records of the category and, when it has one, its last
+    record.
+    """
+
+    category: str
+    last_key: str | None = None
+    # other data keys built from the records of the category
+    extra_keys: tuple[str, ...] = ()
+    # data categories telling when new data of the category usually appears
+    arrival_categories: tuple[str, ...] = ()
+    min_update_interval = timedelta(0)
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, polar: PolarData
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
             _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(
-                minutes=entry.options.get(
-                    CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL)
-                )
+            config_entry=entry,
+            name=f"{DOMAIN} {self.category}",
+            # listeners are not called when data did not change
+            always_update=False,
+            update_interval=max(
+                timedelta(
+                    minutes=entry.options.get(
+                        CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL)
+                    )
+                ),
+                self.min_update_interval,
             ),
         )
         self._entry = entry
-        self.accesslink = AccessLink(
-            client_id=self._entry.data[CONF_CLIENT_ID],
-            client_secret=self._entry.data[CONF_CLIENT_SECRET],
-        )
+        self.polar = polar
+        self.accesslink = polar.accesslink
+        self.history = polar.histories.get(self.category)
+        self.scheduler: AdaptiveScheduler | None = None
+        if self.arrival_categories and entry.options.get(CONF_ADAPTIVE_POLLING, False):
+            self.scheduler = AdaptiveScheduler(
+                floor=timedelta(
+                    minutes=entry.options.get(
+                        CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                    )
+                ),
+                ceiling=timedelta(
+                    minutes=entry.options.get(
+                        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                    )
+                ),
+                default=self.update_interval,
+            )
+        # set when Polar pushes new data, then the interval is a fallback
+        self.push_mode = False
+        self._new_data_announced = False
+        # digest of the records sensors show, by data key
+        self.fingerprints: dict[str, str] = {}
+        # seconds the last refresh took, without waiting for its turn
+        self.last_refresh_duration: float | None = None
 
     @property
     def user_name(self) -> str:
@@ -65,38 +299,593 @@ class PolarCoordinator(DataUpdateCoordinator):
         """Return entry ID."""
         return self._entry.entry_id
 
-    async def _async_update_data(self) -> dict:
-        """Fetch the latest data from the source."""
-        userdata = await self.hass.async_add_executor_job(
-            self.accesslink.get_userdata,
+    @property
+    def user_id(self) -> str:
+        """Return Polar user ID."""
+        return str(self._entry.data[CONF_USER_ID])
+
+    async def async_request_new_data_refresh(self) -> None:
+        """Request a refresh, Polar announcing new data of the category."""
+        self._new_data_announced = True
+        await self.async_request_refresh()
+
+    @abstractmethod
+    async def _async_fetch(self) -> Any:
+        """Fetch new records of the category."""
+
+    async def _async_has_new_data(self) -> bool:
+        """Return False if pull notifications tell there is no new data."""
+        new_data_announced = self._new_data_announced
+        self._new_data_announced = False
+        if (
+            new_data_announced
+            or self.data is None
+            or self.category not in NOTIFICATION_DATA_TYPES
+            or not self._entry.options.get(CONF_PULL_NOTIFICATIONS, False)
+        ):
+            return True
+
+        try:
+            available_data_types = (
+                await self.polar.client.async_get_available_data_types(self.user_id)
+            )
+        except (ClientError, TimeoutError, RateLimitExceeded) as err:
+            _LOGGER.debug("Unable to get pull notifications, update data: %s", err)
+            return True
+        _LOGGER.debug(
+            "Available data types for %s: %s", self.user_name, available_data_types
+        )
+        return NOTIFICATION_DATA_TYPES[self.category] in available_data_types
+
+    def _build_data(self, records: Any) -> dict[str, Any]:
+        """Return the coordinator data from the records of the category."""
+        data = {self.category: records}
+        if self.last_key is not None:
+            if self.history is not None:
+                data[self.last_key] = self.history.latest or {}
+            else:
+                data[self.last_key] = next(iter(records), {})
+        return data
+
+    def _update_fingerprints(self, data: dict[str, Any]) -> None:
+        """Compute digests of the records shown by sensors."""
+        if self.last_key is not None:
+            self.fingerprints = {self.last_key: _fingerprint(data[self.last_key])}
+        else:
+            self.fingerprints = {self.category: _fingerprint(data[self.category])}
+        for key in self.extra_keys:
+            self.fingerprints[key] = _fingerprint(data[key])
+
+    def _schedule_next_update(self, records: Any) -> None:
+        """Plan the next update from when new data usually appears."""
+        if self.scheduler is None or self.push_mode:
+            return
+        self.scheduler.learn(
+            {**self.polar.data, self.category: records}, self.arrival_categories
+        )
+        self.update_interval = self.scheduler.next_interval(dt_util.now())
+        _LOGGER.debug(
+            "Next update of %s for %s in %s",
+            self.category,
+            self.user_name,
+            self.update_interval,
+        )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch the latest data of the category, measuring the refresh."""
+        new_data_announced = self._new_data_announced
+        if not await self._async_has_new_data():
+            self._schedule_next_update(self.data[self.category])
+            return self.data
+        if self.data is not None and not new_data_announced:
+            # do not hit Polar at once with all the users of the client, new
+            # data pushed by Polar being fetched right away
+            await self.polar.async_wait_refresh_turn()
+
+        start = time.monotonic()
+        try:
+            return await self._async_refresh_data()
+        finally:
+            self.last_refresh_duration = time.monotonic() - start
+
+    async def _async_refresh_data(self) -> dict[str, Any]:
+        """Fetch the latest data of the category."""
+        _LOGGER.debug("Fetching %s for %s", self.category, self.user_name)
+        try:
+            records = await self._async_fetch()
+        except (
+            ClientError,
+            TimeoutError,
+            RateLimitExceeded,
+            HomeAssistantError,
+            # saving histories before committing a transaction
+            OSError,
+        ) as err:
+            if self.data is not None and _is_rate_limited(err):
+                # the data is still valid, wait for the rate limit to reset
+                _LOGGER.warning(
+                    "Polar rate limit reached, keep last %s of %s",
+                    self.category,
+                    self.user_name,
+                )
+                return self.data
+            raise UpdateFailed(f"Error communicating with Polar API: {err}") from err
+
+        try:
+            await self.polar.statistics.async_import(
+                {self.category: records}, [self.category]
+            )
+        except HomeAssistantError as err:
+            _LOGGER.warning(
+                "Unable to import statistics for %s: %s", self.user_name, err
+            )
+
+        if self.history is not None:
+            # data holds the whole history, ordered by time
+            await self.history.async_load()
+            if self.history.merge(records):
+                self.history.async_schedule_save()
+            records = self.history.records
+
+        self._schedule_next_update(records)
+        data = self._build_data(records)
+        self._update_fingerprints(data)
+        return data
+
+
+class PolarUserDataCoordinator(PolarCoordinator):
+    """Coordinator of the user profile.
+
+    Physical information, like weight or heart rates, is only delivered by
+    transactions when it changes, and kept in a history. User information is
+    requested again once its TTL expired. The profile is the user information
+    updated with the latest physical information.
+    """
+
+    category = ATTR_USER_DATA
+    min_update_interval = timedelta(minutes=USER_DATA_SCAN_INTERVAL)
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, polar: PolarData
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, entry, polar)
+        self._user_info: UserInfo | None = None
+        # monotonic time the user information must be requested again at
+        self._user_info_expiry = 0.0
+
+    async def _async_fetch(self) -> list[PhysicalInfo]:
+        """Fetch new physical information, and user information if expired."""
+        await self.history.async_load()
+        if self._user_info is None or time.monotonic() >= self._user_info_expiry:
+            self._user_info = await self.accesslink.get_userdata(
+                self._entry.data[CONF_USER_ID], self._entry.data[CONF_ACCESS_TOKEN]
+            )
+            self._user_info_expiry = time.monotonic() + USER_INFO_TTL * 60
+        return await self.accesslink.get_new_physical_info(
             self._entry.data[CONF_USER_ID],
             self._entry.data[CONF_ACCESS_TOKEN],
+            self.history.async_merge_and_save,
         )
-        exercisedata = await self.hass.async_add_executor_job(
-            self.accesslink.get_exercises, self._entry.data[CONF_ACCESS_TOKEN]
+
+    def _build_data(self, records: Any) -> dict[str, Any]:
+        """Return the profile of the user."""
+        return {self.category: self._user_info.with_physical_info(self.history.latest)}
+
+
+class PolarExerciseCoordinator(PolarCoordinator):
+    """Coordinator of exercises.
+
+    The exercise list bootstraps an empty history. Then only new exercises are
+    fetched, from training data transactions, so a refresh costs a request
+    when there is nothing new whatever the size of the history. A transaction
+    is committed once its exercises are saved. Their samples and routes are
+    optional: those which could not be stored are downloaded by exercise ID on
+    the next refreshes. New exercises update the rolling training load, which
+    moves on every day.
+    """
+
+    category = ATTR_EXERCISE_DATA
+    last_key = ATTR_LAST_EXERCISE
+    extra_keys = (ATTR_TRAINING_LOAD,)
+    arrival_categories = (ATTR_EXERCISE_DATA,)
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, polar: PolarData
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, entry, polar)
+        # failed sample or route downloads, by exercise ID
+        self._extras_failures: dict[str, int] = {}
+
+    @property
+    def _route_format(self) -> str:
+        """Return the format routes are exported in."""
+        return self._entry.options.get(CONF_ROUTE_EXPORT, ROUTE_EXPORT_NONE)
+
+    async def _async_has_new_data(self) -> bool:
+        """Return True on a new day too, the training load moving on."""
+        has_new_data = await super()._async_has_new_data()
+        return has_new_data or self.polar.training_load.day != dt_util.now().date()
+
+    async def _async_fetch(self) -> list[Exercise]:
+        """Fetch new exercises, from the exercise list on first sync."""
+        await self.history.async_load()
+        if self._route_format != ROUTE_EXPORT_NONE:
+            # the last exercise shows its route even without new exercises
+            await self.polar.route_history.async_load()
+        today = dt_util.now().date()
+        await self.polar.training_load.async_load(self.history, today)
+        self.polar.training_load.advance(today)
+        if not self.history.records:
+            return await self._async_bootstrap()
+        await self._async_backfill_extras(today)
+        return await self.accesslink.get_new_exercises(
+            self._entry.data[CONF_USER_ID],
+            self._entry.data[CONF_ACCESS_TOKEN],
+            self._async_persist_new_exercises,
         )
-        sleepdata = await self.hass.async_add_executor_job(
-            self.accesslink.get_sleep, self._entry.data[CONF_ACCESS_TOKEN]
+
+    async def _async_bootstrap(self) -> list[Exercise]:
+        """Fetch the exercises of the last 30 days."""
+        exercises = await self.accesslink.get_exercises(
+            self._entry.data[CONF_ACCESS_TOKEN]
         )
-        rechargedata = await self.hass.async_add_executor_job(
-            self.accesslink.get_recharge, self._entry.data[CONF_ACCESS_TOKEN]
+        await self.polar.training_load.async_add(exercises)
+        await self._async_download_extras(exercises)
+        return exercises
+
+    async def _async_backfill_extras(self, today: date) -> None:
+        """Download samples and routes of recent exercises which lack them.
+
+        Exercises are given up on after a few failed downloads, until restart,
+        so a missing resource does not cost requests on every refresh.
+        """
+        start = today - timedelta(days=EXTRAS_BACKFILL_DAYS)
+        await self._async_download_extras(
+            [
+                exercise
+                for exercise in self.history.between(start.isoformat())
+                if self._extras_failures.get(exercise.id, 0) < EXTRAS_MAX_ATTEMPTS
+            ]
         )
-        dailydata = await self.hass.async_add_executor_job(
-            self.accesslink.get_daily_activities,
+
+    async def _async_persist_new_exercises(
+        self, exercises: dict[str, Exercise], transaction: Any
+    ) -> None:
+        """Save exercises of a transaction, then store their samples and routes.
+
+        Errors saving the exercises are raised, so the transaction is not
+        committed and its exercises are delivered again.
+        """
+        new_exercises = {
+            url: exercise
+            for url, exercise in exercises.items()
+            if not self.history.contains(exercise)
+        }
+        _LOGGER.debug(
+            "Saving %s new exercises of %s", len(new_exercises), self.user_name
+        )
+        # exercises already counted are skipped when delivered again
+        await self.polar.training_load.async_add(new_exercises.values())
+        await self.history.async_merge_and_save(new_exercises.values())
+        await self._async_download_extras(
+            list(new_exercises.values()),
+            {exercise.id: url for url, exercise in new_exercises.items()},
+            transaction,
+        )
+
+    async def _async_download_extras(
+        self,
+        exercises: list[Exercise],
+        urls: dict[str, str] | None = None,
+        transaction: Any = None,
+    ) -> None:
+        """Store samples and routes of exercises, as enabled in options.
+
+        Exercises are downloaded by ID, or by URL in the transaction. Failures
+        are logged and counted, without stopping the other downloads.
+        """
+        if self._entry.options.get(CONF_EXERCISE_SAMPLES, False):
+            await self._async_ingest_exercise_samples(exercises, urls, transaction)
+        if self._route_format != ROUTE_EXPORT_NONE:
+            await self._async_export_routes(exercises, urls)
+
+    async def _async_try_extra(
+        self,
+        name: str,
+        download: Callable[[str], Awaitable[None]],
+        exercise_id: str,
+    ) -> None:
+        """Download the samples or route of an exercise, counting failures."""
+        try:
+            await download(exercise_id)
+        except (
+            ClientError,
+            TimeoutError,
+            RateLimitExceeded,
+            HomeAssistantError,
+            OSError,
+            EOFError,
+            ParseError,
+            ValueError,
+        ) as err:
+            failures = self._extras_failures.get(exercise_id, 0) + 1
+            self._extras_failures[exercise_id] = failures
+            _LOGGER.warning(
+                "Unable to store %s of exercise %s of %s, attempt %s of %s: %s",
+                name,
+                exercise_id,
+                self.user_name,
+                failures,
+                EXTRAS_MAX_ATTEMPTS,
+                err,
+            )
+
+    async def _async_export_routes(
+        self, exercises: list[Exercise], urls: dict[str, str] | None
+    ) -> None:
+        """Stream routes of exercises not exported yet to files."""
+        missing = [
+            exercise.id
+            for exercise in exercises
+            if exercise.has_route and self.polar.route_history.get(exercise.id) is None
+        ]
+        if not missing:
+            return
+
+        extension = self._route_format
+        if self._entry.options.get(CONF_ROUTE_COMPRESS, True):
+            extension += ".gz"
+
+        async def _async_export(exercise_id: str) -> None:
+            file_path = self.hass.config.path(
+                DOMAIN, "routes", self.entry_id, f"{exercise_id}.{extension}"
+            )
+            await self.accesslink.export_route(
+                exercise_id,
+                self._entry.data[CONF_ACCESS_TOKEN],
+                file_path,
+                self._route_format,
+                url=(urls or {}).get(exercise_id),
+            )
+            summary = await self.hass.async_add_executor_job(summarize_route, file_path)
+            self.polar.route_history.merge(
+                [{"id": exercise_id, "file": file_path, **summary}]
+            )
+
+        _LOGGER.debug("Exporting routes of %s exercises", len(missing))
+        try:
+            with request_priority(PRIORITY_LOW):
+                await gather_limited(
+                    missing,
+                    partial(self._async_try_extra, "route", _async_export),
+                    self.accesslink.max_concurrency,
+                )
+        finally:
+            self.polar.route_history.async_schedule_save()
+
+    async def _async_ingest_exercise_samples(
+        self,
+        exercises: list[Exercise],
+        urls: dict[str, str] | None,
+        transaction: Any,
+    ) -> None:
+        """Download and store samples of exercises not stored yet."""
+        missing = await self.polar.exercise_samples.async_get_missing(
+            [exercise.id for exercise in exercises]
+        )
+        if not missing:
+            return
+
+        async def _async_ingest(exercise_id: str) -> None:
+            if urls and exercise_id in urls:
+                samples = await self.accesslink.get_transaction_exercise_samples(
+                    transaction, urls[exercise_id]
+                )
+            else:
+                samples = await self.accesslink.get_exercise_samples(
+                    exercise_id, self._entry.data[CONF_ACCESS_TOKEN]
+                )
+            await self.polar.exercise_samples.async_save(exercise_id, samples)
+
+        _LOGGER.debug("Fetching samples of %s exercises", len(missing))
+        with request_priority(PRIORITY_LOW):
+            await gather_limited(
+                missing,
+                partial(self._async_try_extra, "samples", _async_ingest),
+                self.accesslink.max_concurrency,
+            )
+
+    def _build_data(self, records: Any) -> dict[str, Any]:
+        """Return exercises, with the route of the last one and training load."""
+        data = super()._build_data(records)
+        if route := self.polar.route_history.get(data[ATTR_LAST_EXERCISE].get("id")):
+            data[ATTR_LAST_EXERCISE] = {**data[ATTR_LAST_EXERCISE], "route": route}
+        data[ATTR_TRAINING_LOAD] = self.polar.training_load.summary()
+        return data
+
+
+class PolarSleepCoordinator(PolarCoordinator):
+    """Coordinator of sleeps."""
+
+    category = ATTR_SLEEP_DATA
+    last_key = ATTR_LAST_SLEEP
+    arrival_categories = (ATTR_SLEEP_DATA,)
+
+    async def _async_fetch(self) -> list[Night]:
+        """Fetch sleeps."""
+        return await self.accesslink.get_sleep(self._entry.data[CONF_ACCESS_TOKEN])
+
+
+class PolarRechargeCoordinator(PolarCoordinator):
+    """Coordinator of nightly recharges, computed after each sleep."""
+
+    category = ATTR_RECHARGE_DATA
+    last_key = ATTR_LAST_RECHARGE
+    arrival_categories = (ATTR_SLEEP_DATA,)
+
+    async def _async_fetch(self) -> list[Recharge]:
+        """Fetch nightly recharges."""
+        return await self.accesslink.get_recharge(self._entry.data[CONF_ACCESS_TOKEN])
+
+
+def _summarize_activity_samples(
+    samples: DailyActivitySamples | None,
+) -> dict[str, Any]:
+    """Return what sensors show of the samples of a day."""
+    if samples is None:
+        return {}
+    hourly_steps = samples.hourly_steps()
+    summary: dict[str, Any] = {
+        "date": samples.date.isoformat(),
+        "steps_by_hour": hourly_steps,
+        "sedentary_time": round(samples.zone_seconds(SEDENTARY_ZONE) / 60),
+        "zones": {
+            name: round(samples.zone_seconds(zone) / 60)
+            for zone, name in ACTIVITY_ZONES.items()
+        },
+    }
+    if hourly_steps:
+        summary["hourly_steps"] = hourly_steps[-1]
+        summary["hour"] = f"{len(hourly_steps) - 1:02d}:00"
+    return summary
+
+
+class PolarDailyActivityCoordinator(PolarCoordinator):
+    """Coordinator of daily activities, synced with sleeps and exercises.
+
+    Activities of a transaction are saved before it is committed. When
+    enabled, step and zone samples of its days are stored then, unless the
+    activity of the day did not change since they were downloaded. Samples
+    are optional: days they could not be stored for are downloaded again when
+    Polar delivers them in a later transaction.
+    """
+
+    category = ATTR_DAILY_DATA
+    last_key = ATTR_LAST_DAILY
+    extra_keys = (ATTR_LAST_ACTIVITY_SAMPLES,)
+    arrival_categories = (ATTR_SLEEP_DATA, ATTR_EXERCISE_DATA)
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, polar: PolarData
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, entry, polar)
+        # samples of the newest stored day
+        self._latest_samples: DailyActivitySamples | None = None
+        # days whose samples could not be stored, even if older ones are
+        self._missing_sample_days: set[str] = set()
+
+    @property
+    def _samples_enabled(self) -> bool:
+        """Return True if activity samples are stored."""
+        return self._entry.options.get(CONF_ACTIVITY_SAMPLES, False)
+
+    async def _async_fetch(self) -> list[DailyActivity]:
+        """Fetch new daily activities, saved in the history before commit."""
+        await self.history.async_load()
+        activities = await self.accesslink.get_daily_activities(
             self._entry.data[CONF_USER_ID],
             self._entry.data[CONF_ACCESS_TOKEN],
-            self.hass.config.path(
-                f".storage/polar_dailydata_{self._entry.entry_id}.json"
-            ),
+            self._async_persist_activities,
         )
-        return {
-            ATTR_USER_DATA: userdata,
-            ATTR_EXERCISE_DATA: exercisedata,
-            ATTR_SLEEP_DATA: sleepdata,
-            ATTR_RECHARGE_DATA: rechargedata,
-            ATTR_DAILY_DATA: dailydata,
-            ATTR_LAST_EXERCISE: next(iter(exercisedata), {}),
-            ATTR_LAST_SLEEP: next(iter(sleepdata), {}),
-            ATTR_LAST_RECHARGE: next(iter(rechargedata), {}),
-            ATTR_LAST_DAILY: next(iter(dailydata), {}),
+        if self._samples_enabled and self._latest_samples is None:
+            self._latest_samples = await self.polar.activity_samples.async_load_latest()
+        return activities
+
+    async def _async_persist_activities(
+        self, activities: dict[str, dict[str, Any]], transaction: Any
+    ) -> None:
+        """Save activities of a transaction, then store their samples.
+
+        Errors saving the activities are raised, so the transaction is not
+        committed and its activities are delivered again. Errors storing
+        samples are not.
+        """
+        changed_urls = {
+            url
+            for url, activity in activities.items()
+            if (stored := self.history.get(activity["date"])) is None
+            or stored.raw != activity
         }
+        await self.history.async_merge_and_save(activities.values())
+        if self._samples_enabled:
+            await self._async_ingest_activity_samples(
+                activities, changed_urls, transaction
+            )
+
+    async def _async_ingest_activity_samples(
+        self,
+        activities: dict[str, dict[str, Any]],
+        changed_urls: set[str],
+        transaction: Any,
+    ) -> None:
+        """Download and store samples of days not stored or changed since."""
+        missing = set(
+            await self.polar.activity_samples.async_get_missing(
+                [activity["date"] for activity in activities.values()]
+            )
+        )
+        urls = {
+            activity["date"]: url
+            for url, activity in activities.items()
+            if url in changed_urls
+            or activity["date"] in missing
+            or activity["date"] in self._missing_sample_days
+        }
+        if not urls:
+            return
+
+        async def _async_ingest(day: str) -> DailyActivitySamples | None:
+            try:
+                samples = await self.accesslink.get_activity_samples(
+                    transaction, urls[day], date.fromisoformat(day)
+                )
+                await self.polar.activity_samples.async_save(day, samples)
+            except (
+                ClientError,
+                TimeoutError,
+                RateLimitExceeded,
+                HomeAssistantError,
+                OSError,
+                ValueError,
+            ) as err:
+                self._missing_sample_days.add(day)
+                _LOGGER.warning(
+                    "Unable to store activity samples of %s for %s, "
+                    "will retry when Polar delivers the day again: %s",
+                    day,
+                    self.user_name,
+                    err,
+                )
+                return None
+            self._missing_sample_days.discard(day)
+            return samples
+
+        _LOGGER.debug("Fetching activity samples of %s days", len(urls))
+        with request_priority(PRIORITY_LOW):
+            results = await gather_limited(
+                sorted(urls), _async_ingest, self.accesslink.max_concurrency
+            )
+        if not (days := [samples for samples in results if samples is not None]):
+            return
+
+        if self._latest_samples is None or days[-1].date >= self._latest_samples.date:
+            self._latest_samples = days[-1]
+        try:
+            await self.polar.statistics.async_import(
+                {ATTR_ACTIVITY_SAMPLES: days}, [ATTR_ACTIVITY_SAMPLES]
+            )
+        except HomeAssistantError as err:
+            _LOGGER.warning(
+                "Unable to import activity statistics for %s: %s", self.user_name, err
+            )
+
+    def _build_data(self, records: Any) -> dict[str, Any]:
+        """Return daily activities, with the samples of the newest day."""
+        data = super()._build_data(records)
+        data[ATTR_LAST_ACTIVITY_SAMPLES] = _summarize_activity_samples(
+            self._latest_samples
+        )
+        return data
@@ -0,0 +1,73 @@
+"""Diagnostics support for Polar."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_EXTERNAL_URL,
+    CONF_NAME,
+)
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_USER_ID, CONF_WEBHOOK_SECRET, DOMAIN
+from .coordinator import PolarData
+
+TO_REDACT = {
+    CONF_ACCESS_TOKEN,
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_EXTERNAL_URL,
+    CONF_NAME,
+    CONF_USER_ID,
+    CONF_WEBHOOK_SECRET,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics of a config entry.
+
+    Request metrics are those of the client, shared by the entries using the
+    same client ID.
+    """
+    polar: PolarData = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinators": {
+            category: {
+                "last_update_success": coordinator.last_update_success,
+                "last_exception": (
+                    None
+                    if coordinator.last_exception is None
+                    else repr(coordinator.last_exception)
+                ),
+                "update_interval": (
+                    None
+                    if coordinator.update_interval is None
+                    else coordinator.update_interval.total_seconds()
+                ),
+                "push_mode": coordinator.push_mode,
+                "last_refresh_duration": coordinator.last_refresh_duration,
+                "records": (
+                    None
+                    if coordinator.history is None
+                    else len(coordinator.history.records)
+                ),
+            }
+            for category, coordinator in polar.coordinators.items()
+        },
+        "client": {
+            "entries": len(polar.client.entry_ids),
+            "requests": polar.client.metrics.as_dict(),
+        },
+    }
@@ -0,0 +1,22 @@
+"""Storage of Polar exercise samples."""
+
+from __future__ import annotations
+
+import mmap
+
+from .polaraccesslink.samples import ExerciseSamples, dump_samples, load_samples
+from .sample_store import SampleStore
+
+
+class ExerciseSampleStore(SampleStore[dict[int, ExerciseSamples]]):
+    """Samples of the exercises of a user, in one binary file per exercise ID."""
+
+    directory = "samples"
+
+    def _dump(self, samples: dict[int, ExerciseSamples]) -> bytes:
+        """Serialize samples of an exercise."""
+        return dump_samples(samples)
+
+    def _load(self, key: str, buffer: mmap.mmap) -> dict[int, ExerciseSamples]:
+        """Deserialize samples of an exercise."""
+        return load_samples(buffer)
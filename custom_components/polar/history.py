@@ -0,0 +1,314 @@
+"""Persistent history of Polar data."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util.json import load_json
+
+from .const import DOMAIN
+from .polaraccesslink.models import (
+    DailyActivity,
+    Exercise,
+    Night,
+    PhysicalInfo,
+    Recharge,
+    Record,
+)
+from .polaraccesslink.time_index import TimeIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# seconds to wait before writing a history that is not critical
+SAVE_DELAY = 60
+
+
+class PolarHistory:
+    """History of Polar records of a user, keyed by a field and ordered by time.
+
+    The store is read once, then the history is kept in memory with an index
+    sorted by time, where the records of a merge are inserted at once and time
+    ranges are found by bisection. Changes are saved with a
+    delay, unless the caller needs them on disk before going on, like before
+    committing a transaction.
+    """
+
+    key_field: str
+    # ISO 8601 field the records are ordered by
+    time_field: str
+    store_name: str
+    record_type: type[Record] | None = None
+    # bulky fields sensors do not use, not stored so the history stays small
+    excluded_fields: tuple[str, ...] = ()
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the history."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.{self.store_name}"
+        )
+        self._records: dict[str, dict[str, Any]] = {}
+        self._index = TimeIndex()
+        self._views: dict[str, Any] = {}
+        self._newest_first: list[Any] | None = None
+        self._loaded = False
+
+    def _time(self, record: Mapping[str, Any]) -> str:
+        """Return the time a record is indexed at."""
+        return record.get(self.time_field) or record[self.key_field]
+
+    def _view(self, key: str) -> Any:
+        """Return the record with a key, typed if the history has a record type."""
+        if (view := self._views.get(key)) is None:
+            view = self._records[key]
+            if self.record_type is not None:
+                view = self.record_type(view)
+            self._views[key] = view
+        return view
+
+    def _strip(self, record: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Return a record without its excluded fields."""
+        if not any(field in record for field in self.excluded_fields):
+            return record
+        return {
+            key: value
+            for key, value in record.items()
+            if key not in self.excluded_fields
+        }
+
+    def _set_records(self, records: dict[str, dict[str, Any]]) -> None:
+        """Replace all records and rebuild the index."""
+        self._records = records
+        self._index = TimeIndex(
+            {key: self._time(record) for key, record in records.items()}
+        )
+        self._views = {}
+        self._newest_first = None
+
+    @property
+    def records(self) -> list[Any]:
+        """Return records, newest first."""
+        if self._newest_first is None:
+            self._newest_first = [self._view(key) for key in self._index.between()]
+        return self._newest_first
+
+    @property
+    def latest(self) -> Any | None:
+        """Return the newest record."""
+        if (key := self._index.latest) is None:
+            return None
+        return self._view(key)
+
+    def get(self, key: str) -> Any | None:
+        """Return the record with a key."""
+        if key not in self._records:
+            return None
+        return self._view(key)
+
+    def between(self, start: str | None = None, end: str | None = None) -> list[Any]:
+        """Return records from start, included, to end, excluded, newest first.
+
+        Bounds are ISO 8601 dates or timestamps compared to the time field, a
+        date bound matching the whole day for timestamps.
+        """
+        return [self._view(key) for key in self._index.between(start, end)]
+
+    async def _async_load_legacy(self) -> list[dict[str, Any]] | None:
+        """Load records saved before the history used a store."""
+        return None
+
+    async def _async_remove_legacy(self) -> None:
+        """Remove records saved before the history used a store."""
+
+    async def async_load(self) -> None:
+        """Load the history, once."""
+        if self._loaded:
+            return
+        if (data := await self._store.async_load()) is not None:
+            records = {
+                key: self._strip(record) for key, record in data["records"].items()
+            }
+            self._set_records(records)
+            if any(
+                record is not data["records"][key] for key, record in records.items()
+            ):
+                # stored before the fields were excluded
+                self.async_schedule_save()
+        elif (records := await self._async_load_legacy()) is not None:
+            self._set_records({record[self.key_field]: record for record in records})
+            await self._store.async_save(self._data_to_save())
+            await self._async_remove_legacy()
+        self._loaded = True
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return data of the store."""
+        return {"records": self._records}
+
+    def merge(self, records: Iterable[Mapping[str, Any]]) -> bool:
+        """Merge records into the history, return True if it changed.
+
+        A record replaces the stored record with the same key. Typed records
+        are stored as their raw payload.
+        """
+        times: dict[str, str] = {}
+        for record in records:
+            if isinstance(record, Record):
+                record = record.raw
+            record = self._strip(record)
+            key = record[self.key_field]
+            if self._records.get(key) == record:
+                continue
+            self._records[key] = record
+            self._views.pop(key, None)
+            times[key] = self._time(record)
+        if not times:
+            return False
+        self._index.update(times)
+        self._newest_first = None
+        return True
+
+    def async_schedule_save(self) -> None:
+        """Save the history after a delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the history now."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_merge_and_save(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """Merge records and save the history before returning."""
+        if self.merge(records):
+            await self.async_save()
+
+    async def async_remove(self) -> None:
+        """Remove the stored history."""
+        await self._store.async_remove()
+
+
+class DailyActivityHistory(PolarHistory):
+    """Daily activities of a user, keyed by date.
+
+    Activities of new transactions are merged into the history, the latest
+    summary of a day replacing the previous one.
+    """
+
+    key_field = "date"
+    time_field = "date"
+    store_name = "daily_activities"
+    record_type = DailyActivity
+
+    @property
+    def _legacy_file_path(self) -> str:
+        """Return path of the former pretty-printed backup file."""
+        return self.hass.config.path(f".storage/polar_dailydata_{self.entry_id}.json")
+
+    def _read_legacy_file(self) -> list[dict[str, Any]] | None:
+        """Read the former backup file."""
+        if not os.path.isfile(self._legacy_file_path):
+            return None
+        activities = load_json(self._legacy_file_path, default=[])
+        return activities if isinstance(activities, list) else []
+
+    async def _async_load_legacy(self) -> list[dict[str, Any]] | None:
+        """Import activities of the former backup file."""
+        activities = await self.hass.async_add_executor_job(self._read_legacy_file)
+        if activities is not None:
+            _LOGGER.debug(
+                "Importing %s daily activities from the former backup file",
+                len(activities),
+            )
+        return activities
+
+    async def _async_remove_legacy(self) -> None:
+        """Remove the former backup file once imported."""
+        await self.hass.async_add_executor_job(os.remove, self._legacy_file_path)
+
+
+class ExerciseHistory(PolarHistory):
+    """Exercises of a user, keyed by ID and ordered by start time.
+
+    The exercise list and training data transactions identify an exercise
+    with different IDs, so an exercise starting at the same time as a stored
+    one with another ID is the same exercise, and is skipped.
+    """
+
+    key_field = "id"
+    time_field = "start_time"
+    store_name = "exercises"
+    record_type = Exercise
+
+    def _is_stored_under_other_id(self, record: Mapping[str, Any]) -> bool:
+        """Return True if an exercise with another ID starts at the same time."""
+        return any(
+            key != record[self.key_field] for key in self._index.at(self._time(record))
+        )
+
+    def contains(self, exercise: Exercise) -> bool:
+        """Return True if the exercise is stored, under its ID or another one."""
+        return exercise.id in self._records or self._is_stored_under_other_id(
+            exercise.raw
+        )
+
+    def merge(self, records: Iterable[Mapping[str, Any]]) -> bool:
+        """Merge exercises, skipping those stored or merged under another ID."""
+        # ID of the exercises of the merge, by start time
+        merged: dict[str, str] = {}
+        exercises = []
+        for record in records:
+            if isinstance(record, Record):
+                record = record.raw
+            if self._is_stored_under_other_id(record):
+                continue
+            key = record[self.key_field]
+            if merged.setdefault(self._time(record), key) != key:
+                continue
+            exercises.append(record)
+        return super().merge(exercises)
+
+
+class SleepHistory(PolarHistory):
+    """Sleeps of a user, keyed by date, without their sample series."""
+
+    key_field = "date"
+    time_field = "date"
+    store_name = "sleeps"
+    record_type = Night
+    excluded_fields = ("hypnogram", "heart_rate_samples")
+
+
+class RechargeHistory(PolarHistory):
+    """Nightly recharges of a user, keyed by date, without their sample series."""
+
+    key_field = "date"
+    time_field = "date"
+    store_name = "recharges"
+    record_type = Recharge
+    excluded_fields = ("hrv_samples", "breathing_samples")
+
+
+class PhysicalInfoHistory(PolarHistory):
+    """Physical information of a user, keyed by creation time.
+
+    Polar delivers physical information when it changes, so the history keeps
+    the changes of weight, heart rates or VO2max, the newest being current.
+    """
+
+    key_field = "created"
+    time_field = "created"
+    store_name = "physical_info"
+    record_type = PhysicalInfo
+
+
+class RouteHistory(PolarHistory):
+    """Exported exercise routes and their summary, keyed by exercise ID."""
+
+    key_field = "id"
+    time_field = "id"
+    store_name = "routes"
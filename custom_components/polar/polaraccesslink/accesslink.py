@@ -1,17 +1,20 @@
 """Accesslink library."""
-from datetime import datetime
-import json
+import asyncio
 import logging
-from os import path
-
-import isodate
 
+from . import models
+from .activity_samples import decode_activity_samples
+from .cache import ResponseCache
 from .endpoints.daily_activity import DailyActivity
 from .endpoints.physical_info import PhysicalInfo
 from .endpoints.pull_notifications import PullNotifications
 from .endpoints.training_data import TrainingData
 from .endpoints.users import Users
-from .oauth2 import OAuth2Client
+from .endpoints.webhooks import Webhooks
+from .oauth2 import AsyncOAuth2Client, OAuth2Client
+from .routes import ROUTE_FORMATS, RouteFileWriter
+from .samples import decode_samples
+from .utils import DEFAULT_MAX_CONCURRENCY
 
 AUTHORIZATION_URL = "https://flow.polar.com/oauth2/authorization"
 ACCESS_TOKEN_URL = "https://polarremote.com/v2/oauth2/token"
@@ -20,15 +23,10 @@ ACCESSLINK_URL = "https://www.polaraccesslink.com/v3"
 _LOGGER = logging.getLogger(__name__)
 
 
-def parse_date(raw_date: str) -> str:
-    """Parse Polar date format."""
-    return str(isodate.parse_duration(raw_date))
-
-
 class AccessLink:
     """Wrapper class for Polar Open AccessLink API v3."""
 
-    def __init__(self, client_id, client_secret, redirect_url=None):
+    def __init__(self, client_id, client_secret, redirect_url=None, serializer=None):
         """Init an Accesslink access."""
         if not client_id or not client_secret:
             raise ValueError("Client id and secret must be provided.")
@@ -40,6 +38,7 @@ class AccessLink:
             redirect_url=redirect_url,
             client_id=client_id,
             client_secret=client_secret,
+            serializer=serializer,
         )
 
         self.users = Users(oauth=self.oauth)
@@ -47,6 +46,7 @@ class AccessLink:
         self.training_data = TrainingData(oauth=self.oauth)
         self.physical_info = PhysicalInfo(oauth=self.oauth)
         self.daily_activity = DailyActivity(oauth=self.oauth)
+        self.webhooks = Webhooks(oauth=self.oauth)
 
     def get_authorization_url(self, state=None):
         """Get the authorization url for the client."""
@@ -56,100 +56,248 @@ class AccessLink:
         """Request access token for a user."""
         return self.oauth.get_access_token(authorization_code)
 
-    def get_exercises(self, access_token):
-        """Get last exercises."""
-        exercises = self.oauth.get(endpoint="/exercises", access_token=access_token)
-        for exercise in exercises:
-            exercise["duration"] = parse_date(exercise["duration"])
-        return sorted(
-            exercises,
-            key=lambda t: datetime.strptime(t["start_time"], "%Y-%m-%dT%H:%M:%S"),
-            reverse=True,
-        )
-
-    def get_sleep(self, access_token):
-        """Get last sleeps."""
-        sleepdata = self.oauth.get(endpoint="/users/sleep/", access_token=access_token)[
-            "nights"
-        ]
-        return sorted(
-            sleepdata,
-            key=lambda t: datetime.strptime(t["date"], "%Y-%m-%d"),
-            reverse=True,
-        )
-
-    def get_recharge(self, access_token):
-        """Get last nightly recharges."""
-        rechargedata = self.oauth.get(
-            endpoint="/users/nightly-recharge/", access_token=access_token
-        )["recharges"]
-        return sorted(
-            rechargedata,
-            key=lambda t: datetime.strptime(t["date"], "%Y-%m-%d"),
-            reverse=True,
-        )
-
     def get_userdata(self, user_id, access_token):
         """Get user data."""
         return self.oauth.get(
             endpoint="/users/" + str(user_id), access_token=access_token
         )
 
-    def get_daily_activities(self, user_id, access_token, state_file_path):
-        """Get daily activities from Polar or backup file."""
-        activities = []
 
-        transaction = self.daily_activity.create_transaction(
+class AsyncAccessLink:
+    """Asyncio wrapper class for Polar Open AccessLink API v3."""
+
+    def __init__(
+        self,
+        session,
+        client_id,
+        client_secret,
+        redirect_url=None,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        limiter=None,
+        metrics=None,
+        serializer=None,
+    ):
+        """Init an Accesslink access on top of an aiohttp session."""
+        if not client_id or not client_secret:
+            raise ValueError("Client id and secret must be provided.")
+
+        self.oauth = AsyncOAuth2Client(
+            session=session,
+            url=ACCESSLINK_URL,
+            authorization_url=AUTHORIZATION_URL,
+            access_token_url=ACCESS_TOKEN_URL,
+            redirect_url=redirect_url,
+            client_id=client_id,
+            client_secret=client_secret,
+            response_cache=ResponseCache(),
+            limiter=limiter,
+            metrics=metrics,
+            serializer=serializer,
+        )
+
+        self.users = Users(oauth=self.oauth)
+        self.pull_notifications = PullNotifications(oauth=self.oauth)
+        self.training_data = TrainingData(oauth=self.oauth)
+        self.physical_info = PhysicalInfo(oauth=self.oauth)
+        self.daily_activity = DailyActivity(oauth=self.oauth)
+        self.webhooks = Webhooks(oauth=self.oauth)
+        self.max_concurrency = max_concurrency
+        self._processed = {}
+
+    def get_authorization_url(self, state=None):
+        """Get the authorization url for the client."""
+        return self.oauth.get_authorization_url(state=state)
+
+    async def get_access_token(self, authorization_code):
+        """Request access token for a user."""
+        return await self.oauth.get_access_token(authorization_code)
+
+    def _process(self, key, response, process):
+        """Process a response, reusing the result when the response is unchanged.
+
+        The response cache returns the very same object for an unchanged
+        response, so it does not need to be parsed and sorted again.
+        """
+        previous = self._processed.get(key)
+        if previous is not None and previous[0] is response:
+            return previous[1]
+        result = process(response)
+        self._processed[key] = (response, result)
+        return result
+
+    async def get_exercises(self, access_token):
+        """Get last exercises, newest first."""
+        return self._process(
+            ("exercises", access_token),
+            await self.oauth.get(
+                endpoint="/exercises", access_token=access_token, cache=True
+            ),
+            lambda response: models.newest_first(
+                map(models.Exercise, response), "start_time"
+            ),
+        )
+
+    async def get_sleep(self, access_token):
+        """Get last sleeps, newest first."""
+        return self._process(
+            ("sleep", access_token),
+            await self.oauth.get(
+                endpoint="/users/sleep/", access_token=access_token, cache=True
+            ),
+            lambda response: models.newest_first(
+                map(models.Night, response["nights"]), "date"
+            ),
+        )
+
+    async def get_recharge(self, access_token):
+        """Get last nightly recharges, newest first."""
+        return self._process(
+            ("recharge", access_token),
+            await self.oauth.get(
+                endpoint="/users/nightly-recharge/",
+                access_token=access_token,
+                cache=True,
+            ),
+            lambda response: models.newest_first(
+                map(models.Recharge, response["recharges"]), "date"
+            ),
+        )
+
+    async def get_exercise_samples(self, exercise_id, access_token):
+        """Get samples of an exercise, decoded into typed arrays."""
+        exercise = await self.oauth.get(
+            endpoint=f"/exercises/{exercise_id}",
+            access_token=access_token,
+            params={"samples": "true"},
+        )
+        return decode_samples(exercise.get("samples") or [])
+
+    async def get_transaction_exercise_samples(self, transaction, url):
+        """Get samples of an exercise of an open transaction, decoded."""
+        return decode_samples(
+            await transaction.async_get_all_samples(url, self.max_concurrency)
+        )
+
+    async def export_route(
+        self, exercise_id, access_token, file_path, route_format="gpx", url=None
+    ):
+        """Stream the GPX or TCX route of an exercise to a file.
+
+        The exercise is found by its ID, or by its URL in an open transaction.
+        The file is gzip compressed when its name ends with .gz. Chunks are
+        written in the executor as they arrive, and the file only replaces an
+        existing one once the download is complete.
+        """
+        loop = asyncio.get_running_loop()
+        writer = RouteFileWriter(file_path)
+        await loop.run_in_executor(None, writer.open)
+        try:
+            async for chunk in self.oauth.iter_chunks(
+                endpoint=None if url else f"/exercises/{exercise_id}/{route_format}",
+                url=f"{url}/{route_format}" if url else None,
+                access_token=access_token,
+                headers={"Accept": ROUTE_FORMATS[route_format]},
+            ):
+                await loop.run_in_executor(None, writer.write, chunk)
+        except BaseException:
+            await loop.run_in_executor(None, writer.close, False)
+            raise
+        await loop.run_in_executor(None, writer.close)
+
+    async def get_new_exercises(self, user_id, access_token, persist):
+        """Get exercises of a new training data transaction, newest first.
+
+        Exercises are mapped to the format of the exercise list. The awaitable
+        persist callback receives them by URL in the transaction, with the
+        transaction, and must save them. Samples and routes can be downloaded
+        from these URLs until the transaction is committed, once it returned.
+        """
+        transaction = await self.training_data.async_create_transaction(
+            user_id=user_id, access_token=access_token
+        )
+
+        if not transaction:
+            _LOGGER.debug("No new exercise available")
+            return []
+
+        summaries = await transaction.async_get_exercise_summaries_by_url(
+            self.max_concurrency
+        )
+        exercises = {
+            url: models.Exercise.from_transaction(summary)
+            for url, summary in summaries.items()
+        }
+        _LOGGER.debug("%s new exercises available", len(exercises))
+
+        await persist(exercises, transaction)
+        await transaction.commit()
+
+        return models.newest_first(exercises.values(), "start_time")
+
+    async def get_userdata(self, user_id, access_token):
+        """Get user data."""
+        return self._process(
+            ("userdata", access_token),
+            await self.oauth.get(
+                endpoint="/users/" + str(user_id), access_token=access_token, cache=True
+            ),
+            models.UserInfo,
+        )
+
+    async def get_new_physical_info(self, user_id, access_token, persist):
+        """Get physical information of a new transaction, newest first.
+
+        Polar only delivers physical information when it changed. The awaitable
+        persist callback receives the new records, as raw payloads, and must
+        save them. The transaction is only committed once it returned.
+        """
+        transaction = await self.physical_info.async_create_transaction(
+            user_id=user_id, access_token=access_token
+        )
+
+        if not transaction:
+            _LOGGER.debug("No new physical information available")
+            return []
+
+        infos = await transaction.async_get_physical_infos(self.max_concurrency)
+        _LOGGER.debug("%s new physical information available", len(infos))
+
+        await persist(infos)
+        await transaction.commit()
+
+        return models.newest_first(map(models.PhysicalInfo, infos), "created")
+
+    async def get_activity_samples(self, transaction, url, date):
+        """Get step and zone samples of a daily activity of an open transaction."""
+        step_samples, zone_samples = await asyncio.gather(
+            transaction.get_step_samples(url), transaction.get_zone_samples(url)
+        )
+        return decode_activity_samples(date, step_samples, zone_samples)
+
+    async def get_daily_activities(self, user_id, access_token, persist):
+        """Get new daily activities from a transaction, newest first.
+
+        The awaitable persist callback receives the new activities by URL in
+        the transaction, as raw payloads, with the transaction, and must save
+        them. Step and zone samples can be downloaded from these URLs until
+        the transaction is committed, once it returned.
+        """
+        transaction = await self.daily_activity.async_create_transaction(
             user_id=user_id, access_token=access_token
         )
 
         if not transaction:
-            try:
-                if path.isfile(state_file_path):
-                    _LOGGER.debug(
-                        "No new daily activity available, get from backup file"
-                    )
-                    with open(state_file_path, encoding="utf-8") as state_file:
-                        activities = json.loads(state_file.read())
-                else:
-                    _LOGGER.debug(
-                        "No daily activity available, will try for the next sync"
-                    )
-            except OSError as exc:
-                _LOGGER.error(
-                    "Unable to get daily activities from backup file %s: %s",
-                    state_file_path,
-                    exc,
-                )
-        else:
-            _LOGGER.debug(
-                "New daily activity available, get it and save to backup file"
-            )
-            resource_urls = transaction.list_activities()["activity-log"]
-
-            for url in resource_urls:
-                actity = transaction.get_activity_summary(url)
-                actity["duration"] = parse_date(actity["duration"])
-                activities.append(actity)
-
-            transaction.commit()
-
-            # sort by date
-            activities = sorted(
-                activities,
-                key=lambda t: datetime.strptime(t["date"], "%Y-%m-%d"),
-                reverse=True,
-            )
-
-            # backup activities
-            try:
-                with open(state_file_path, "w+", encoding="utf-8") as state_file:
-                    json.dump(activities, state_file, sort_keys=True, indent=4)
-            except OSError as exc:
-                _LOGGER.error(
-                    "Unable to write daily activities to backup file %s: %s",
-                    state_file_path,
-                    exc,
-                )
-
-        return activities
+            _LOGGER.debug("No new daily activity available")
+            return []
+
+        _LOGGER.debug("New daily activity available, get it and save it")
+        activities = await transaction.async_get_activity_summaries_by_url(
+            self.max_concurrency
+        )
+
+        await persist(activities, transaction)
+        await transaction.commit()
+
+        return models.newest_first(
+            map(models.DailyActivity, activities.values()), "date"
+        )
@@ -0,0 +1,131 @@
+"""Daily activity step and zone samples, as per-day arrays."""
+from array import array
+
+from .models import parse_duration
+from .samples import ExerciseSamples, dump_samples, load_samples
+
+MINUTES_PER_DAY = 1440
+HOURS_PER_DAY = 24
+# activity zone index: name
+ACTIVITY_ZONES = {
+    0: "sleep",
+    1: "sedentary",
+    2: "light",
+    3: "moderate",
+    4: "vigorous",
+    5: "non_wear",
+}
+SEDENTARY_ZONE = 1
+
+# series of the samples file, stored in the container of exercise samples
+_STEP_SERIES = 0
+_ZONE_SERIES = 1
+
+
+def _minute_of_day(value):
+    """Return the minute of the day of a Polar time, like 12:37:33.000."""
+    try:
+        hours, minutes = value.split(":")[:2]
+        minute = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    return minute if 0 <= minute < MINUTES_PER_DAY else None
+
+
+class DailyActivitySamples:
+    """Step and activity zone samples of the date of a day.
+
+    Steps are counted by minute of the day, up to the last sampled minute, so
+    the samples of the current day are shorter than those of past days. Time
+    spent in each activity zone is counted in seconds by hour of the day.
+    """
+
+    __slots__ = ("date", "steps", "zones")
+
+    def __init__(self, date, steps=None, zones=None):
+        """Init the samples."""
+        self.date = date
+        self.steps = array("H") if steps is None else steps
+        self.zones = (
+            array("I", bytes(4 * HOURS_PER_DAY * len(ACTIVITY_ZONES)))
+            if zones is None
+            else zones
+        )
+
+    @property
+    def hours(self):
+        """Return the number of hours with step samples."""
+        return -(-len(self.steps) // 60)
+
+    @property
+    def total_steps(self):
+        """Return steps of the day."""
+        return sum(self.steps)
+
+    def hourly_steps(self):
+        """Return steps by hour of the day, up to the last sampled hour."""
+        return [
+            sum(self.steps[hour * 60 : hour * 60 + 60]) for hour in range(self.hours)
+        ]
+
+    def zone_seconds(self, zone):
+        """Return seconds spent in an activity zone during the day."""
+        count = len(ACTIVITY_ZONES)
+        return sum(self.zones[zone::count])
+
+    def add_step_samples(self, payload):
+        """Count steps of a step samples payload."""
+        for sample in (payload or {}).get("samples") or []:
+            if (minute := _minute_of_day(sample.get("time"))) is None:
+                continue
+            if minute >= len(self.steps):
+                self.steps.extend([0] * (minute + 1 - len(self.steps)))
+            self.steps[minute] = min(
+                self.steps[minute] + int(sample.get("steps") or 0), 65535
+            )
+
+    def add_zone_samples(self, payload):
+        """Count time in activity zones of a zone samples payload."""
+        count = len(ACTIVITY_ZONES)
+        for sample in (payload or {}).get("samples") or []:
+            if (minute := _minute_of_day(sample.get("time"))) is None:
+                continue
+            hour = minute // 60
+            for zone in sample.get("activity-zones") or []:
+                index = zone.get("index")
+                duration = parse_duration(zone.get("inzone"))
+                if index not in ACTIVITY_ZONES or duration is None:
+                    continue
+                self.zones[hour * count + index] += int(duration.total_seconds())
+
+
+def decode_activity_samples(date, step_samples, zone_samples):
+    """Decode the step and zone samples of a day, as returned by Polar.
+
+    ValueError is raised when the samples are malformed.
+    """
+    samples = DailyActivitySamples(date)
+    try:
+        samples.add_step_samples(step_samples)
+        samples.add_zone_samples(zone_samples)
+    except (AttributeError, TypeError, ValueError) as err:
+        raise ValueError(f"Invalid activity samples of {date}: {err!r}") from err
+    return samples
+
+
+def dump_activity_samples(samples):
+    """Serialize the samples of a day to bytes."""
+    return dump_samples(
+        {
+            _STEP_SERIES: ExerciseSamples(_STEP_SERIES, 60, samples.steps),
+            _ZONE_SERIES: ExerciseSamples(_ZONE_SERIES, 3600, samples.zones),
+        }
+    )
+
+
+def load_activity_samples(date, buffer):
+    """Deserialize the samples of a day from bytes, a memoryview or a mmap."""
+    series = load_samples(buffer)
+    return DailyActivitySamples(
+        date, series[_STEP_SERIES].values, series[_ZONE_SERIES].values
+    )
@@ -0,0 +1,74 @@
+"""Conditional request cache for Polar Access Link."""
+from collections import OrderedDict
+import hashlib
+
+DEFAULT_MAX_ENTRIES = 64
+
+
+class CachedResponse:
+    """Validators, body digest and parsed body of a cached response."""
+
+    __slots__ = ("data", "digest", "etag", "last_modified")
+
+    def __init__(self, data, digest, etag=None, last_modified=None):
+        """Init the cached response."""
+        self.data = data
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def get_conditional_headers(self):
+        """Get headers to revalidate the cached response."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """LRU cache of parsed GET responses, per url and credentials.
+
+    Responses are revalidated with their ETag or Last-Modified validators.
+    When the server sends no validator, the digest of the body tells if the
+    cached parsed body can be reused, so unchanged bodies are not parsed again.
+    Callers get the very same object back for an unchanged response.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """Init the cache."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def build_key(url, authorization):
+        """Build the cache key, without keeping credentials in clear."""
+        return url, hashlib.sha256(str(authorization).encode()).hexdigest()
+
+    @staticmethod
+    def digest(body):
+        """Get the digest of a response body."""
+        return hashlib.sha1(body, usedforsecurity=False).digest()
+
+    def get(self, key):
+        """Get a cached response."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        """Cache a response, evicting the least recently used ones."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached responses."""
+        self._entries.clear()
+
+    def __len__(self):
+        """Return the number of cached responses."""
+        return len(self._entries)
@@ -12,6 +12,18 @@ class DailyActivity(Resource):
             endpoint=f"/users/{user_id}/activity-transactions",
             access_token=access_token,
         )
+        return self._build_transaction(response, user_id, access_token)
+
+    async def async_create_transaction(self, user_id, access_token):
+        """Initiate daily activity transaction with an async client."""
+        response = await self._post(
+            endpoint=f"/users/{user_id}/activity-transactions",
+            access_token=access_token,
+        )
+        return self._build_transaction(response, user_id, access_token)
+
+    def _build_transaction(self, response, user_id, access_token):
+        """Build the transaction from the creation response."""
         if not response:
             return None
 
@@ -1,4 +1,5 @@
 """Daily activity transaction."""
+from ..utils import DEFAULT_MAX_CONCURRENCY
 from .transaction import Transaction
 
 
@@ -15,6 +16,18 @@ class DailyActivityTransaction(Transaction):
         """Get user's activity summary from the transaction."""
         return self._get(endpoint=None, url=url, access_token=self.access_token)
 
+    async def async_get_activity_summaries_by_url(
+        self, max_concurrency=DEFAULT_MAX_CONCURRENCY
+    ):
+        """Download all activity summaries of the transaction, by URL."""
+
+        async def _get(url):
+            return url, await self.get_activity_summary(url)
+
+        return dict(
+            await self._async_get_resources("activity-log", _get, max_concurrency)
+        )
+
     def get_step_samples(self, url):
         """Get activity step samples."""
         return self._get(
@@ -12,6 +12,18 @@ class PhysicalInfo(Resource):
             endpoint=f"/users/{user_id}/physical-information-transactions",
             access_token=access_token,
         )
+        return self._build_transaction(response, user_id, access_token)
+
+    async def async_create_transaction(self, user_id, access_token):
+        """Initiate physical info transaction with an async client."""
+        response = await self._post(
+            endpoint=f"/users/{user_id}/physical-information-transactions",
+            access_token=access_token,
+        )
+        return self._build_transaction(response, user_id, access_token)
+
+    def _build_transaction(self, response, user_id, access_token):
+        """Build the transaction from the creation response."""
         if not response:
             return None
 
@@ -1,4 +1,5 @@
 """Physical information transaction."""
+from ..utils import DEFAULT_MAX_CONCURRENCY
 from .transaction import Transaction
 
 
@@ -14,3 +15,9 @@ class PhysicalInfoTransaction(Transaction):
     def get_physical_info(self, url):
         """Get user's physical information from the transaction."""
         return self._get(endpoint=None, url=url, access_token=self.access_token)
+
+    async def async_get_physical_infos(self, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """Download all physical information of the transaction."""
+        return await self._async_get_resources(
+            "physical-informations", self.get_physical_info, max_concurrency
+        )
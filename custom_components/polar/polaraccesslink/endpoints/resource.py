@@ -14,6 +14,9 @@ class Resource:
     def _post(self, *args, **kwargs):
         return self.oauth.post(*args, **kwargs)
 
+    def _patch(self, *args, **kwargs):
+        return self.oauth.patch(*args, **kwargs)
+
     def _put(self, *args, **kwargs):
         return self.oauth.put(*args, **kwargs)
 
@@ -1,4 +1,5 @@
 """Training data transaction."""
+from ..utils import DEFAULT_MAX_CONCURRENCY, gather_limited
 from .transaction import Transaction
 
 
@@ -15,6 +16,23 @@ class TrainingDataTransaction(Transaction):
         """Retrieve training session summary data."""
         return self._get(endpoint=None, url=url, access_token=self.access_token)
 
+    async def async_get_exercise_summaries_by_url(
+        self, max_concurrency=DEFAULT_MAX_CONCURRENCY
+    ):
+        """Download all training session summaries of the transaction, by URL."""
+
+        async def _get(url):
+            return url, await self.get_exercise_summary(url)
+
+        return dict(await self._async_get_resources("exercises", _get, max_concurrency))
+
+    async def async_get_all_samples(self, url, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """Download samples of every type of a training session."""
+        listing = await self.get_available_samples(url)
+        return await gather_limited(
+            (listing or {}).get("samples", []), self.get_samples, max_concurrency
+        )
+
     def get_gpx(self, url):
         """Retrieve training session summary data in GPX format."""
         return self._get(
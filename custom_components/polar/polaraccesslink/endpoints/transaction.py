@@ -1,4 +1,5 @@
 """Generic transaction."""
+from ..utils import DEFAULT_MAX_CONCURRENCY, gather_limited
 from .resource import Resource
 
 
@@ -17,3 +18,19 @@ class Transaction(Resource):
         return self._put(
             endpoint=None, url=self.transaction_url, access_token=self.access_token
         )
+
+    async def _async_get_resources(
+        self, list_key, getter, max_concurrency=DEFAULT_MAX_CONCURRENCY
+    ):
+        """Download every resource listed in the transaction with an async client.
+
+        At most max_concurrency downloads run at once and results keep the order
+        of the listing. The first failure cancels the remaining downloads, so the
+        caller must not commit the transaction when this raises.
+        """
+        listing = await self._get(
+            endpoint=None, url=self.transaction_url, access_token=self.access_token
+        )
+        return await gather_limited(
+            (listing or {}).get(list_key, []), getter, max_concurrency
+        )
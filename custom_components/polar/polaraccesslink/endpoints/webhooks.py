@@ -0,0 +1,47 @@
+"""Webhooks."""
+import hashlib
+import hmac
+
+from .resource import Resource
+
+
+def is_valid_signature(secret, body, signature):
+    """Return True if an event body was signed by Polar with the secret.
+
+    Polar sends the hex HMAC-SHA256 of the body, keyed with the signature
+    secret key of the webhook.
+    """
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(
+        hmac.new(secret.encode(), body, hashlib.sha256).hexdigest(), signature
+    )
+
+
+class Webhooks(Resource):
+    """This resource allows partners to manage the webhook of their client."""
+
+    def create(self, url, events):
+        """Create the webhook, Polar sends a PING event to the url first."""
+        return self._post(endpoint="/webhooks", json={"events": events, "url": url})
+
+    def get(self):
+        """Get the webhook of the client."""
+        return self._get(endpoint="/webhooks")
+
+    def update(self, webhook_id, url=None, events=None):
+        """Update the url or the events of the webhook."""
+        data = {}
+        if url is not None:
+            data["url"] = url
+        if events is not None:
+            data["events"] = events
+        return self._patch(endpoint=f"/webhooks/{webhook_id}", json=data)
+
+    def delete(self, webhook_id):
+        """Delete the webhook."""
+        return self._delete(endpoint=f"/webhooks/{webhook_id}")
+
+    def activate(self):
+        """Activate the webhook after it was deactivated by Polar."""
+        return self._post(endpoint="/webhooks/activate")
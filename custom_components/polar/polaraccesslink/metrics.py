@@ -0,0 +1,195 @@
+"""Request metrics of Polar Access Link."""
+from bisect import bisect_left
+from datetime import UTC, date, datetime
+import logging
+import re
+import time
+from urllib.parse import urlsplit
+
+_LOGGER = logging.getLogger(__name__)
+
+# upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# days request counts are kept for
+DAILY_COUNTS_DAYS = 7
+# status of a request that got no response
+STATUS_ERROR = "error"
+
+_ID_SEGMENT = re.compile(r"/[^/]*\d[^/]*")
+
+
+def endpoint_name(method, url, base_url=""):
+    """Return the endpoint of a request.
+
+    IDs in the path below the base URL are replaced, so requests to the same
+    endpoint for different users or resources are aggregated.
+    """
+    path = urlsplit(url).path
+    base_path = urlsplit(base_url).path.rstrip("/")
+    if base_path and path.startswith(base_path + "/"):
+        path = base_path + _ID_SEGMENT.sub("/{id}", path[len(base_path) :])
+    return f"{method.upper()} {path}"
+
+
+class RequestSample:
+    """Measure of a request."""
+
+    __slots__ = ("endpoint", "latency", "retry", "size", "status")
+
+    def __init__(self, endpoint, status, latency, size=0, retry=False):
+        """Init the sample."""
+        self.endpoint = endpoint
+        self.status = status
+        self.latency = latency
+        self.size = size
+        self.retry = retry
+
+    @property
+    def success(self):
+        """Return True if the request succeeded."""
+        return self.status != STATUS_ERROR and self.status < 400
+
+
+class EndpointMetrics:
+    """Aggregated measures of the requests to an endpoint."""
+
+    def __init__(self):
+        """Init the metrics."""
+        self.requests = 0
+        self.retries = 0
+        self.statuses = {}
+        # request count per latency bucket, the last one being unbounded
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.bytes = 0
+        self.last_success = None
+
+    def add(self, sample):
+        """Add the measure of a request."""
+        self.requests += 1
+        self.retries += sample.retry
+        self.statuses[sample.status] = self.statuses.get(sample.status, 0) + 1
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, sample.latency)] += 1
+        self.latency_sum += sample.latency
+        self.latency_max = max(self.latency_max, sample.latency)
+        self.bytes += sample.size
+        if sample.success:
+            self.last_success = datetime.now(UTC)
+
+    def as_dict(self):
+        """Return the metrics as a serializable dict."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "latency": {
+                "average": self.latency_sum / self.requests if self.requests else None,
+                "max": self.latency_max,
+                "histogram": {
+                    f"le_{bound}": count
+                    for bound, count in zip(
+                        (*LATENCY_BUCKETS, "inf"), self.latency_histogram
+                    )
+                },
+            },
+            "bytes": self.bytes,
+            "last_success": (
+                None if self.last_success is None else self.last_success.isoformat()
+            ),
+        }
+
+
+class _Measure:
+    """Context measuring a request, recorded as failed if no response is set."""
+
+    __slots__ = ("endpoint", "metrics", "retry", "size", "start", "status")
+
+    def __init__(self, metrics, endpoint, retry):
+        """Init the measure."""
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.retry = retry
+        self.status = STATUS_ERROR
+        self.size = 0
+        self.start = None
+
+    def set_response(self, status, size=None):
+        """Set status and body size of the response."""
+        self.status = status
+        self.size = size or 0
+
+    def __enter__(self):
+        """Start measuring."""
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Record the measure."""
+        self.metrics.record(
+            RequestSample(
+                self.endpoint,
+                self.status,
+                time.monotonic() - self.start,
+                self.size,
+                self.retry,
+            )
+        )
+
+
+class RequestMetrics:
+    """Metrics of the requests of a client, per endpoint.
+
+    Listeners get every request sample, to feed external metrics systems.
+    """
+
+    def __init__(self, today=date.today):
+        """Init the metrics, today returning the date requests are counted on."""
+        self.today = today
+        self.endpoints = {}
+        self.daily_requests = {}
+        self._listeners = []
+
+    def measure(self, endpoint, retry=False):
+        """Return a context measuring a request to an endpoint."""
+        return _Measure(self, endpoint, retry)
+
+    def record(self, sample):
+        """Record the measure of a request."""
+        if (metrics := self.endpoints.get(sample.endpoint)) is None:
+            metrics = self.endpoints[sample.endpoint] = EndpointMetrics()
+        metrics.add(sample)
+
+        today = self.today()
+        self.daily_requests[today] = self.daily_requests.get(today, 0) + 1
+        if len(self.daily_requests) > DAILY_COUNTS_DAYS:
+            del self.daily_requests[min(self.daily_requests)]
+
+        for listener in list(self._listeners):
+            try:
+                listener(sample)
+            except Exception:
+                _LOGGER.exception("Error in request metrics listener")
+
+    def add_listener(self, listener):
+        """Call listener with every request sample, return a remove callback."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @property
+    def requests_today(self):
+        """Return the number of requests made today."""
+        return self.daily_requests.get(self.today(), 0)
+
+    def as_dict(self):
+        """Return the metrics as a serializable dict."""
+        return {
+            "requests_today": self.requests_today,
+            "daily_requests": {
+                day.isoformat(): count for day, count in self.daily_requests.items()
+            },
+            "endpoints": {
+                endpoint: metrics.as_dict()
+                for endpoint, metrics in sorted(self.endpoints.items())
+            },
+        }
@@ -0,0 +1,337 @@
+"""Typed records of Polar Access Link payloads."""
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from typing import ClassVar
+
+import isodate
+
+
+def parse_duration(value):
+    """Parse an ISO 8601 duration, or an already formatted H:MM:SS one."""
+    try:
+        return isodate.parse_duration(value)
+    except (isodate.ISO8601Error, TypeError, ValueError):
+        pass
+    try:
+        hours, minutes, seconds = value.split(":")
+        return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_datetime(value):
+    """Parse a Polar timestamp, with or without offset."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_date(value):
+    """Parse a Polar date."""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LazyField:
+    """Field of a record parsed from its raw value on first access."""
+
+    __slots__ = ("key", "name", "parser")
+
+    def __init__(self, key, parser):
+        """Init the field."""
+        self.key = key
+        self.parser = parser
+        self.name = key
+
+    def __set_name__(self, owner, name):
+        """Use the attribute name as cache key."""
+        self.name = name
+
+    def __get__(self, record, owner=None):
+        """Return the parsed value, None if missing or invalid."""
+        if record is None:
+            return self
+        try:
+            return record.parsed[self.name]
+        except KeyError:
+            pass
+        value = record.raw.get(self.key)
+        if value is not None:
+            value = self.parser(value)
+        record.parsed[self.name] = value
+        return value
+
+
+@dataclass(slots=True, eq=False)
+class Record(Mapping):
+    """Polar record, with typed fields parsed lazily.
+
+    It is also a read only mapping of the raw payload, where durations are
+    formatted as H:MM:SS, so it can be used as the dict it replaces.
+    """
+
+    raw: dict
+    parsed: dict = field(default_factory=dict, repr=False)
+
+    # mapping keys formatted from a typed field
+    formatted_keys: ClassVar[Mapping[str, str]] = MappingProxyType({})
+
+    def __getitem__(self, key):
+        """Return a field of the payload."""
+        if (attribute := self.formatted_keys.get(key)) is not None and (
+            value := getattr(self, attribute)
+        ) is not None:
+            return str(value)
+        return self.raw[key]
+
+    def __iter__(self):
+        """Iterate over keys of the payload."""
+        return iter(self.raw)
+
+    def __len__(self):
+        """Return number of fields of the payload."""
+        return len(self.raw)
+
+    def __eq__(self, other):
+        """Compare payloads."""
+        if isinstance(other, Record):
+            return self.raw == other.raw
+        return Mapping.__eq__(self, other)
+
+    def as_dict(self):
+        """Return the raw payload."""
+        return self.raw
+
+
+class Exercise(Record):
+    """Exercise summary."""
+
+    __slots__ = ()
+
+    formatted_keys: ClassVar[Mapping[str, str]] = MappingProxyType(
+        {"duration": "duration"}
+    )
+
+    start_time = LazyField("start_time", parse_datetime)
+    duration = LazyField("duration", parse_duration)
+
+    @classmethod
+    def from_transaction(cls, summary):
+        """Return an exercise of a transaction, in the format of the exercise list.
+
+        Transaction summaries have hyphenated keys and a numeric ID.
+        """
+        raw = {key.replace("-", "_"): value for key, value in summary.items()}
+        raw["id"] = str(raw["id"])
+        return cls(raw)
+
+    @property
+    def id(self):
+        """Return exercise ID."""
+        return self.raw.get("id")
+
+    @property
+    def duration_seconds(self):
+        """Return duration in seconds."""
+        return None if self.duration is None else self.duration.total_seconds()
+
+    @property
+    def sport(self):
+        """Return sport."""
+        return self.raw.get("sport")
+
+    @property
+    def distance(self):
+        """Return distance in meters."""
+        return self.raw.get("distance")
+
+    @property
+    def calories(self):
+        """Return burnt calories."""
+        return self.raw.get("calories")
+
+    @property
+    def training_load(self):
+        """Return training load."""
+        return self.raw.get("training_load")
+
+    @property
+    def has_route(self):
+        """Return True if the exercise has a route."""
+        return bool(self.raw.get("has_route"))
+
+
+class Night(Record):
+    """Sleep of a night, stage durations being in seconds."""
+
+    __slots__ = ()
+
+    date = LazyField("date", parse_date)
+    sleep_start_time = LazyField("sleep_start_time", parse_datetime)
+    sleep_end_time = LazyField("sleep_end_time", parse_datetime)
+
+    @property
+    def sleep_score(self):
+        """Return sleep score."""
+        return self.raw.get("sleep_score")
+
+    @property
+    def sleep_seconds(self):
+        """Return time spent in light, deep and REM sleep, in seconds."""
+        stages = ("light_sleep", "deep_sleep", "rem_sleep")
+        if not any(stage in self.raw for stage in stages):
+            return None
+        return sum(self.raw.get(stage, 0) for stage in stages)
+
+
+class Recharge(Record):
+    """Nightly recharge."""
+
+    __slots__ = ()
+
+    date = LazyField("date", parse_date)
+
+    @property
+    def ans_charge(self):
+        """Return ANS charge."""
+        return self.raw.get("ans_charge")
+
+    @property
+    def heart_rate_avg(self):
+        """Return average heart rate, in bpm."""
+        return self.raw.get("heart_rate_avg")
+
+    @property
+    def heart_rate_variability_avg(self):
+        """Return average heart rate variability, in ms."""
+        return self.raw.get("heart_rate_variability_avg")
+
+    @property
+    def breathing_rate_avg(self):
+        """Return average breathing rate, in breaths per minute."""
+        return self.raw.get("breathing_rate_avg")
+
+
+class DailyActivity(Record):
+    """Daily activity summary."""
+
+    __slots__ = ()
+
+    formatted_keys: ClassVar[Mapping[str, str]] = MappingProxyType(
+        {"duration": "duration"}
+    )
+
+    date = LazyField("date", parse_date)
+    duration = LazyField("duration", parse_duration)
+
+    @property
+    def duration_seconds(self):
+        """Return activity duration in seconds."""
+        return None if self.duration is None else self.duration.total_seconds()
+
+    @property
+    def calories(self):
+        """Return burnt calories."""
+        return self.raw.get("calories")
+
+    @property
+    def active_calories(self):
+        """Return calories burnt by activity."""
+        return self.raw.get("active-calories")
+
+    @property
+    def active_steps(self):
+        """Return steps."""
+        return self.raw.get("active-steps")
+
+
+class PhysicalInfo(Record):
+    """Physical information, delivered by Polar when it changes."""
+
+    __slots__ = ()
+
+    created = LazyField("created", parse_datetime)
+
+    # fields describing the body of the user, the others identifying the record
+    profile_keys = (
+        "weight",
+        "height",
+        "maximum-heart-rate",
+        "resting-heart-rate",
+        "aerobic-threshold",
+        "anaerobic-threshold",
+        "vo2-max",
+        "weight-source",
+    )
+
+    @property
+    def weight(self):
+        """Return weight, in kg."""
+        return self.raw.get("weight")
+
+    @property
+    def height(self):
+        """Return height, in cm."""
+        return self.raw.get("height")
+
+    @property
+    def maximum_heart_rate(self):
+        """Return maximum heart rate, in bpm."""
+        return self.raw.get("maximum-heart-rate")
+
+    @property
+    def resting_heart_rate(self):
+        """Return resting heart rate, in bpm."""
+        return self.raw.get("resting-heart-rate")
+
+    @property
+    def vo2_max(self):
+        """Return VO2max, in ml/kg/min."""
+        return self.raw.get("vo2-max")
+
+
+class UserInfo(Record):
+    """User information."""
+
+    __slots__ = ()
+
+    birthdate = LazyField("birthdate", parse_date)
+    registration_date = LazyField("registration-date", parse_datetime)
+
+    @property
+    def weight(self):
+        """Return weight, in kg."""
+        return self.raw.get("weight")
+
+    @property
+    def height(self):
+        """Return height, in cm."""
+        return self.raw.get("height")
+
+    def with_physical_info(self, physical_info):
+        """Return the user information updated with physical information."""
+        if physical_info is None:
+            return self
+        return UserInfo(
+            {
+                **self.raw,
+                **{
+                    key: physical_info.raw[key]
+                    for key in PhysicalInfo.profile_keys
+                    if physical_info.raw.get(key) is not None
+                },
+            }
+        )
+
+
+def newest_first(records, key):
+    """Sort records by an ISO 8601 field, newest first.
+
+    ISO 8601 dates and timestamps sort as strings, so they are not parsed.
+    """
+    return sorted(records, key=lambda record: record.raw[key], reverse=True)
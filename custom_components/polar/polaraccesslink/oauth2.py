@@ -2,12 +2,25 @@
 import logging
 from urllib.parse import urlencode
 
+from aiohttp import BasicAuth, ClientResponseError, ClientSession, ClientTimeout
 import requests
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import HTTPError
 
+from .cache import CachedResponse, ResponseCache
+from .metrics import RequestMetrics, endpoint_name
+from .ratelimit import RETRY_AFTER_HEADER, RateLimiter, RateLimitExceeded
+from .serializer import DEFAULT_SERIALIZER
+
 _LOGGER = logging.getLogger(__name__)
 
+REQUEST_TIMEOUT = 60
+CHUNK_SIZE = 65536
+# retries of a request rate limited by the short-term window
+MAX_RETRIES = 3
+# compressed transfer, JSON payloads shrinking several times
+ACCEPT_ENCODING = "gzip, deflate"
+
 
 class OAuth2Client:
     """Wrapper class for OAuth2 requests."""
@@ -20,6 +33,9 @@ class OAuth2Client:
         redirect_url,
         client_id,
         client_secret,
+        response_cache=None,
+        metrics=None,
+        serializer=None,
     ):
         """Init the client object."""
         self.url = url
@@ -28,6 +44,13 @@ class OAuth2Client:
         self.redirect_url = redirect_url
         self.client_id = client_id
         self.client_secret = client_secret
+        self.response_cache = response_cache
+        self.metrics = metrics or RequestMetrics()
+        self.serializer = serializer or DEFAULT_SERIALIZER
+
+    def _measure(self, method, url, retry=False):
+        """Return a context measuring a request."""
+        return self.metrics.measure(endpoint_name(method, url, self.url), retry)
 
     def get_auth_headers(self, access_token):
         """Get authorization headers for user level api resources."""
@@ -36,6 +59,7 @@ class OAuth2Client:
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
             "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
 
     def get_authorization_url(self, response_type="code", state=None):
@@ -75,7 +99,7 @@ class OAuth2Client:
             endpoint=None, url=self.access_token_url, data=data, headers=headers
         )
 
-    def __build_endpoint_kwargs(self, **kwargs):
+    def _build_endpoint_kwargs(self, **kwargs):
         """Create endpoint url for requests."""
 
         if "endpoint" in kwargs:
@@ -85,7 +109,7 @@ class OAuth2Client:
 
         return kwargs
 
-    def __build_auth_kwargs(self, **kwargs):
+    def _build_auth_kwargs(self, **kwargs):
         """Build the authentication to make requests."""
 
         if "access_token" in kwargs:
@@ -101,13 +125,24 @@ class OAuth2Client:
 
         return kwargs
 
-    def __build_request_kwargs(self, **kwargs):
+    def _build_body_kwargs(self, **kwargs):
+        """Encode the JSON body of requests with the serializer."""
+        if "json" in kwargs:
+            kwargs["data"] = self.serializer.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {
+                "Content-Type": "application/json",
+                **kwargs.get("headers", {}),
+            }
+        return kwargs
+
+    def _build_request_kwargs(self, **kwargs):
         """Build requests."""
-        kwargs = self.__build_endpoint_kwargs(**kwargs)
-        kwargs = self.__build_auth_kwargs(**kwargs)
+        kwargs = self._build_endpoint_kwargs(**kwargs)
+        kwargs = self._build_auth_kwargs(**kwargs)
+        kwargs = self._build_body_kwargs(**kwargs)
         return kwargs
 
-    def __parse_response(self, response):
+    def _parse_response(self, response):
         """Parse response."""
         if response.status_code >= 400:
             message = "{code} {reason}: {body}".format(
@@ -119,31 +154,222 @@ class OAuth2Client:
             return {}
 
         try:
-            return response.json()
+            return self.serializer.loads(response.content)
         except ValueError:
             return response.text
 
-    def __request(self, method, **kwargs):
-        """Make a request."""
-        kwargs = self.__build_request_kwargs(**kwargs)
+    def _get_cached_response(self, method, cache, kwargs):
+        """Get the cache key and the cached response of a request.
+
+        Conditional headers are added to the request when a cached response
+        exists. The key is None when the request must not be cached.
+        """
+        if not cache or method != "get" or self.response_cache is None:
+            return None, None
+
+        headers = kwargs.get("headers", {})
+        key = ResponseCache.build_key(
+            kwargs["url"], headers.get("Authorization", self.client_id)
+        )
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            kwargs["headers"] = {**headers, **cached.get_conditional_headers()}
+        return key, cached
+
+    def _cache_response(self, key, cached, headers, body):
+        """Cache a successful response, reusing the parsed body if unchanged."""
+        digest = ResponseCache.digest(body)
+        if cached is not None and cached.digest == digest:
+            _LOGGER.debug("Response body unchanged, reuse parsed body")
+            data = cached.data
+        else:
+            try:
+                data = self.serializer.loads(body)
+            except ValueError:
+                data = body.decode("utf-8", "replace")
+
+        self.response_cache.set(
+            key,
+            CachedResponse(
+                data, digest, headers.get("ETag"), headers.get("Last-Modified")
+            ),
+        )
+        return data
+
+    def _request(self, method, cache=False, **kwargs):
+        """Make a request, GET responses are cached when cache is True."""
+        kwargs = self._build_request_kwargs(**kwargs)
+        cache_key, cached = self._get_cached_response(method, cache, kwargs)
 
         _LOGGER.debug("%s request to URL: %s", method.upper(), kwargs["url"])
 
-        response = requests.request(method=method, timeout=60, **kwargs)
-        return self.__parse_response(response)
+        with self._measure(method, kwargs["url"]) as measure:
+            response = requests.request(
+                method=method, timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            measure.set_response(response.status_code, len(response.content))
+
+        if cache_key is not None:
+            if response.status_code == 304 and cached is not None:
+                _LOGGER.debug("Response not modified, use cached response")
+                return cached.data
+            if response.status_code == 200:
+                return self._cache_response(
+                    cache_key, cached, response.headers, response.content
+                )
+
+        return self._parse_response(response)
 
     def get(self, endpoint, **kwargs):
         """Make a GET request."""
-        return self.__request("get", endpoint=endpoint, **kwargs)
+        return self._request("get", endpoint=endpoint, **kwargs)
 
     def post(self, endpoint, **kwargs):
         """Make a POST request."""
-        return self.__request("post", endpoint=endpoint, **kwargs)
+        return self._request("post", endpoint=endpoint, **kwargs)
+
+    def patch(self, endpoint, **kwargs):
+        """Make a PATCH request."""
+        return self._request("patch", endpoint=endpoint, **kwargs)
 
     def put(self, endpoint, **kwargs):
         """Make a PUT request."""
-        return self.__request("put", endpoint=endpoint, **kwargs)
+        return self._request("put", endpoint=endpoint, **kwargs)
 
     def delete(self, endpoint, **kwargs):
         """Make a DELETE request."""
-        return self.__request("delete", endpoint=endpoint, **kwargs)
+        return self._request("delete", endpoint=endpoint, **kwargs)
+
+
+class AsyncOAuth2Client(OAuth2Client):
+    """Wrapper class for OAuth2 requests made over a shared aiohttp session."""
+
+    def __init__(
+        self,
+        session: ClientSession,
+        url,
+        authorization_url,
+        access_token_url,
+        redirect_url,
+        client_id,
+        client_secret,
+        response_cache=None,
+        limiter=None,
+        metrics=None,
+        serializer=None,
+    ):
+        """Init the client object."""
+        super().__init__(
+            url=url,
+            authorization_url=authorization_url,
+            access_token_url=access_token_url,
+            redirect_url=redirect_url,
+            client_id=client_id,
+            client_secret=client_secret,
+            response_cache=response_cache,
+            metrics=metrics,
+            serializer=serializer,
+        )
+        self.session = session
+        self.limiter = limiter or RateLimiter()
+        self.timeout = ClientTimeout(total=REQUEST_TIMEOUT)
+
+    def _build_auth_kwargs(self, **kwargs):
+        """Build the authentication to make requests."""
+        if "access_token" not in kwargs and "auth" not in kwargs:
+            kwargs["auth"] = BasicAuth(self.client_id, self.client_secret)
+
+        return super()._build_auth_kwargs(**kwargs)
+
+    async def _parse_response(self, response):
+        """Parse response."""
+        if response.status >= 400:
+            raise ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=f"{response.reason}: {await response.text()}",
+                headers=response.headers,
+            )
+
+        if response.status == 204:
+            return {}
+
+        body = await response.read()
+        try:
+            return self.serializer.loads(body)
+        except ValueError:
+            return body.decode(response.get_encoding(), "replace")
+
+    async def _request(self, method, cache=False, **kwargs):
+        """Make a request, GET responses are cached when cache is True."""
+        kwargs = self._build_request_kwargs(**kwargs)
+        cache_key, cached = self._get_cached_response(method, cache, kwargs)
+
+        for attempt in range(MAX_RETRIES + 1):
+            _LOGGER.debug("%s request to URL: %s", method.upper(), kwargs["url"])
+
+            async with self.limiter:
+                with self._measure(method, kwargs["url"], attempt > 0) as measure:
+                    async with self.session.request(
+                        method=method, timeout=self.timeout, **kwargs
+                    ) as response:
+                        measure.set_response(response.status, response.content_length)
+                        if self._handle_rate_limit(response) and attempt < MAX_RETRIES:
+                            continue
+                        return await self._handle_response(response, cache_key, cached)
+
+    def _handle_rate_limit(self, response):
+        """Update the limiter from a response, return True if rate limited.
+
+        RateLimitExceeded is raised when the long-term quota is used up, since
+        retrying would only count more requests against it.
+        """
+        self.limiter.update(response.headers)
+        if response.status != 429:
+            self.limiter.succeeded()
+            return False
+        if (delay := self.limiter.quota_delay()) > 0:
+            _LOGGER.warning("Polar daily quota used up, retry in %.0fs", delay)
+            raise RateLimitExceeded(delay)
+        delay = self.limiter.backoff(response.headers.get(RETRY_AFTER_HEADER))
+        _LOGGER.warning("Rate limited by Polar, pause requests for %.0fs", delay)
+        return True
+
+    async def _handle_response(self, response, cache_key, cached):
+        """Return the data of a response, using and filling the cache."""
+        if cache_key is not None:
+            if response.status == 304 and cached is not None:
+                _LOGGER.debug("Response not modified, use cached response")
+                return cached.data
+            if response.status == 200:
+                return self._cache_response(
+                    cache_key, cached, response.headers, await response.read()
+                )
+
+        return await self._parse_response(response)
+
+    async def iter_chunks(self, endpoint, chunk_size=CHUNK_SIZE, **kwargs):
+        """Make a GET request and iterate over chunks of the response body.
+
+        The body is never held in memory as a whole, the timeout applies to
+        each read instead of the whole download.
+        """
+        kwargs = self._build_request_kwargs(endpoint=endpoint, **kwargs)
+
+        _LOGGER.debug("GET streamed request to URL: %s", kwargs["url"])
+
+        async with self.limiter:
+            with self._measure("get", kwargs["url"]) as measure:
+                async with self.session.request(
+                    method="get",
+                    timeout=ClientTimeout(total=None, sock_read=REQUEST_TIMEOUT),
+                    **kwargs,
+                ) as response:
+                    measure.set_response(response.status)
+                    self._handle_rate_limit(response)
+                    if response.status >= 400:
+                        await self._parse_response(response)
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        measure.size += len(chunk)
+                        yield chunk
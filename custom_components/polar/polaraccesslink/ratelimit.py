@@ -0,0 +1,268 @@
+"""Rate limiting of Polar Access Link requests."""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+import heapq
+import itertools
+import random
+import time
+
+from .utils import DEFAULT_MAX_CONCURRENCY
+
+# Polar short-term and long-term limits without the per user allowance,
+# as (requests, period in seconds)
+DEFAULT_WINDOWS = ((500, 15 * 60), (5000, 24 * 60 * 60))
+
+USAGE_HEADER = "RateLimit-Usage"
+LIMIT_HEADER = "RateLimit-Limit"
+RESET_HEADER = "RateLimit-Reset"
+RETRY_AFTER_HEADER = "Retry-After"
+
+# requests are sent by ascending priority
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 10
+
+# seconds of the first backoff, doubled on each consecutive rate limited request
+BACKOFF_BASE = 2
+BACKOFF_MAX = 15 * 60
+# longest wait for a request slot before giving up
+DEFAULT_MAX_WAIT = 60
+
+_request_priority = ContextVar("polar_request_priority", default=PRIORITY_HIGH)
+
+
+class RateLimitExceeded(Exception):
+    """Rate limit reached for longer than requests are allowed to wait."""
+
+    def __init__(self, retry_after):
+        """Init the error."""
+        super().__init__(f"Polar rate limit reached, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+@contextmanager
+def request_priority(priority):
+    """Send requests made in this context, and tasks it starts, with a priority."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def _parse_header_values(value):
+    """Parse a comma separated list of integers."""
+    try:
+        return [int(item) for item in value.split(",")]
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_retry_after(value):
+    """Return seconds to wait from a Retry-After header, None if invalid."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0)
+
+
+class TokenBucket:
+    """Token bucket allowing rate requests per period.
+
+    Tokens are refilled continuously, until the server reports the usage of
+    its window, then at once when that window resets.
+    """
+
+    def __init__(self, rate, period):
+        """Init the bucket, full."""
+        self.rate = rate
+        self.period = period
+        self.tokens = float(rate)
+        self._updated = time.monotonic()
+        self._reset_at = None
+
+    def _refill(self):
+        """Add tokens earned since the last update."""
+        now = time.monotonic()
+        if self._reset_at is None:
+            self.tokens = min(
+                self.rate, self.tokens + (now - self._updated) * self.rate / self.period
+            )
+        elif now >= self._reset_at:
+            self.tokens = float(self.rate)
+            self._reset_at = None
+        self._updated = now
+
+    def delay(self):
+        """Return seconds to wait for a token."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        if self._reset_at is not None:
+            return self._reset_at - self._updated
+        return (1 - self.tokens) * self.period / self.rate
+
+    def consume(self):
+        """Take a token."""
+        self._refill()
+        self.tokens -= 1
+
+    def sync(self, limit, usage, reset):
+        """Align the bucket on the window reported by the server."""
+        self._updated = time.monotonic()
+        self.rate = limit
+        self.tokens = float(max(limit - usage, 0))
+        self._reset_at = self._updated + reset
+
+
+class RateLimiter:
+    """Schedule requests of a Polar client within its rate limits.
+
+    Requests wait for a concurrency slot and a token of every rate limit
+    window, and are released by priority, then in arrival order. Rate limited
+    responses pause every request with a jittered exponential backoff, or
+    the Retry-After delay given by Polar, unless the long-term quota is used
+    up, which no retry could get past. A request that would wait more than
+    max_wait raises RateLimitExceeded instead of holding its caller.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        windows=DEFAULT_WINDOWS,
+        max_wait=DEFAULT_MAX_WAIT,
+    ):
+        """Init the limiter."""
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self._buckets = [TokenBucket(rate, period) for rate, period in windows]
+        self._active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._failures = 0
+        self._paused_until = 0.0
+        self._timer = None
+
+    def _delay(self):
+        """Return seconds to wait before the next request."""
+        return max(
+            self._paused_until - time.monotonic(),
+            *(bucket.delay() for bucket in self._buckets),
+        )
+
+    def _dispatch(self):
+        """Release waiting requests allowed to run."""
+        while self._waiters and self._active < self.max_concurrency:
+            future = self._waiters[0][2]
+            if future.done():
+                # cancelled or failed
+                heapq.heappop(self._waiters)
+                continue
+            if (delay := self._delay()) > self.max_wait:
+                self._fail_waiters(delay)
+                return
+            if delay > 0:
+                self._schedule_dispatch(delay)
+                return
+            heapq.heappop(self._waiters)
+            for bucket in self._buckets:
+                bucket.consume()
+            self._active += 1
+            future.set_result(None)
+
+    def _schedule_dispatch(self, delay):
+        """Dispatch again once the delay is over."""
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._timer is not None:
+            if self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._on_timer)
+
+    def _on_timer(self):
+        """Dispatch requests after a wait."""
+        self._timer = None
+        self._dispatch()
+
+    def _fail_waiters(self, delay):
+        """Fail every waiting request."""
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.set_exception(RateLimitExceeded(delay))
+        self._waiters.clear()
+
+    async def acquire(self, priority=None):
+        """Wait until a request can be made."""
+        if (delay := self._delay()) > self.max_wait:
+            raise RateLimitExceeded(delay)
+        if priority is None:
+            priority = _request_priority.get()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was given while being cancelled
+                self.release()
+            raise
+
+    def release(self):
+        """Release the request slot."""
+        self._active -= 1
+        self._dispatch()
+
+    def update(self, headers):
+        """Update rate limit windows from the headers of a response."""
+        usages = _parse_header_values(headers.get(USAGE_HEADER))
+        limits = _parse_header_values(headers.get(LIMIT_HEADER))
+        resets = _parse_header_values(headers.get(RESET_HEADER))
+        if not usages or not limits or not resets:
+            return
+        for bucket, usage, limit, reset in zip(
+            self._buckets, usages, limits, resets, strict=False
+        ):
+            bucket.sync(limit, usage, reset)
+
+    def quota_delay(self):
+        """Return seconds until the long-term windows allow a request again.
+
+        It is 0 while they have requests left, rate limited responses being
+        caused by the short-term window then.
+        """
+        return max((bucket.delay() for bucket in self._buckets[1:]), default=0)
+
+    def succeeded(self):
+        """Reset the backoff after a request not rate limited."""
+        self._failures = 0
+
+    def backoff(self, retry_after=None):
+        """Pause requests after a rate limited response, return the delay."""
+        self._failures += 1
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self._failures - 1))
+            delay *= random.uniform(0.5, 1)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if delay > self.max_wait:
+            self._fail_waiters(delay)
+        return delay
+
+    async def __aenter__(self):
+        """Acquire a request slot."""
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        """Release the request slot."""
+        self.release()
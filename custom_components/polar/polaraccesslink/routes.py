@@ -0,0 +1,179 @@
+"""Exercise route files."""
+import gzip
+import math
+import os
+from xml.etree.ElementTree import iterparse
+
+ROUTE_FORMATS = {
+    "gpx": "application/gpx+xml",
+    "tcx": "application/vnd.garmin.tcx+xml",
+}
+
+EARTH_RADIUS = 6371008.8
+# altitude changes below this many meters are considered noise
+ELEVATION_THRESHOLD = 2.0
+
+
+def open_route_file(file_path, mode="rb", compress=None):
+    """Open a route file, gzip compressed by default when its name ends with .gz."""
+    if compress is None:
+        compress = file_path.endswith(".gz")
+    if compress:
+        return gzip.open(file_path, mode)
+    return open(file_path, mode)
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """Return distance in meters between two coordinates."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def _local_name(tag):
+    """Return tag name without its namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class _RouteStats:
+    """Incremental route statistics."""
+
+    def __init__(self):
+        """Init the statistics."""
+        self.points = 0
+        self.distance = 0.0
+        self.recorded_distance = None
+        self.elevation_gain = 0.0
+        self.elevation_loss = 0.0
+        self.bounds = None
+        self._position = None
+        self._elevation = None
+
+    def add_point(self, lat, lon, elevation, distance=None):
+        """Add a point of the route."""
+        self.points += 1
+        if distance is not None:
+            self.recorded_distance = distance
+        if lat is not None and lon is not None:
+            if self._position is not None:
+                self.distance += _haversine(*self._position, lat, lon)
+            self._position = (lat, lon)
+            if self.bounds is None:
+                self.bounds = [lat, lon, lat, lon]
+            else:
+                self.bounds = [
+                    min(self.bounds[0], lat),
+                    min(self.bounds[1], lon),
+                    max(self.bounds[2], lat),
+                    max(self.bounds[3], lon),
+                ]
+        if elevation is not None:
+            if self._elevation is None:
+                self._elevation = elevation
+            elif abs(elevation - self._elevation) >= ELEVATION_THRESHOLD:
+                if elevation > self._elevation:
+                    self.elevation_gain += elevation - self._elevation
+                else:
+                    self.elevation_loss += self._elevation - elevation
+                self._elevation = elevation
+
+    def as_dict(self):
+        """Return the statistics."""
+        distance = (
+            self.recorded_distance
+            if self.recorded_distance is not None
+            else self.distance
+        )
+        return {
+            "points": self.points,
+            "distance": round(distance, 1),
+            "elevation_gain": round(self.elevation_gain, 1),
+            "elevation_loss": round(self.elevation_loss, 1),
+            "bounding_box": self.bounds,
+        }
+
+
+def _float(text):
+    """Convert element text to float."""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_route(file_path):
+    """Get distance, elevation and bounding box of a GPX or TCX route.
+
+    The document is parsed incrementally and every point is dropped once
+    read, so memory does not grow with the size of the route.
+    """
+    stats = _RouteStats()
+    # elements being parsed, to detach every point from its parent
+    parents = []
+    with open_route_file(file_path) as route_file:
+        for event, element in iterparse(route_file, events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+            parents.pop()
+            name = _local_name(element.tag)
+            if name == "trkpt":
+                # GPX
+                elevation = None
+                for child in element:
+                    if _local_name(child.tag) == "ele":
+                        elevation = _float(child.text)
+                stats.add_point(
+                    _float(element.get("lat")), _float(element.get("lon")), elevation
+                )
+            elif name == "Trackpoint":
+                # TCX
+                values = {}
+                for child in element.iter():
+                    values[_local_name(child.tag)] = child.text
+                stats.add_point(
+                    _float(values.get("LatitudeDegrees")),
+                    _float(values.get("LongitudeDegrees")),
+                    _float(values.get("AltitudeMeters")),
+                    _float(values.get("DistanceMeters")),
+                )
+            else:
+                continue
+            # the point is the last child of its parent, removed at once
+            if parents:
+                parents[-1].remove(element)
+    return stats.as_dict()
+
+
+class RouteFileWriter:
+    """Write a route to a temporary file, then move it in place."""
+
+    def __init__(self, file_path):
+        """Init the writer."""
+        self.file_path = file_path
+        self._temp_path = f"{file_path}.tmp"
+        self._file = None
+
+    def open(self):
+        """Open the temporary file."""
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        self._file = open_route_file(
+            self._temp_path, "wb", compress=self.file_path.endswith(".gz")
+        )
+
+    def write(self, chunk):
+        """Write a chunk of the route."""
+        self._file.write(chunk)
+
+    def close(self, success=True):
+        """Close the file, keep it on success or remove it."""
+        self._file.close()
+        if success:
+            os.replace(self._temp_path, self.file_path)
+        else:
+            os.remove(self._temp_path)
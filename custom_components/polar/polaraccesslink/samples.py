@@ -0,0 +1,150 @@
+"""Exercise samples decoding and binary storage."""
+from array import array
+import math
+import struct
+import sys
+
+# sample type: (name, array typecode)
+SAMPLE_TYPES = {
+    0: ("heart_rate", "H"),
+    1: ("speed", "f"),
+    2: ("cadence", "H"),
+    3: ("altitude", "f"),
+    4: ("power", "H"),
+    5: ("power_pedaling_index", "H"),
+    6: ("power_left_right_balance", "f"),
+    7: ("air_pressure", "f"),
+    8: ("running_cadence", "H"),
+    9: ("temperature", "f"),
+    10: ("distance", "f"),
+    11: ("rr_interval", "H"),
+}
+
+# magic, format version, byte order, number of series
+_FILE_HEADER = struct.Struct("<4sBBH")
+# sample type, typecode, recording rate, number of values
+_SERIES_HEADER = struct.Struct("<BcHI")
+_MAGIC = b"PLSM"
+_VERSION = 1
+_LITTLE_ENDIAN = 0
+_BIG_ENDIAN = 1
+_ALIGNMENT = 8
+
+
+class ExerciseSamples:
+    """Samples of one type recorded during an exercise."""
+
+    __slots__ = ("recording_rate", "sample_type", "values")
+
+    def __init__(self, sample_type, recording_rate, values):
+        """Init the samples."""
+        self.sample_type = sample_type
+        self.recording_rate = recording_rate
+        self.values = values
+
+    @property
+    def name(self):
+        """Return the name of the sample type."""
+        return SAMPLE_TYPES.get(self.sample_type, (f"type_{self.sample_type}",))[0]
+
+    def __len__(self):
+        """Return the number of samples."""
+        return len(self.values)
+
+
+def _decode_value(raw, typecode):
+    """Decode one sample value, missing values are NaN or 0."""
+    try:
+        value = float(raw)
+    except ValueError:
+        return math.nan if typecode == "f" else 0
+    if typecode == "f":
+        return value
+    return min(max(int(value), 0), 65535)
+
+
+def decode_values(data, typecode):
+    """Decode comma separated sample values into a typed array."""
+    if not data:
+        return array(typecode)
+    values = data.split(",")
+    try:
+        return array(typecode, map(int if typecode != "f" else float, values))
+    except (ValueError, OverflowError):
+        # missing or out of range values
+        return array(typecode, (_decode_value(value, typecode) for value in values))
+
+
+def decode_samples(samples):
+    """Decode the samples of an exercise, as returned by Polar.
+
+    Each sample is a dict with recording-rate, sample-type and comma separated
+    data. Unknown sample types are decoded as floats. ValueError is raised
+    when the samples are malformed.
+    """
+    decoded = {}
+    try:
+        for sample in samples:
+            sample_type = int(sample["sample-type"])
+            typecode = SAMPLE_TYPES.get(sample_type, (None, "f"))[1]
+            decoded[sample_type] = ExerciseSamples(
+                sample_type,
+                int(sample.get("recording-rate", 0)),
+                decode_values(sample.get("data", ""), typecode),
+            )
+    except (AttributeError, KeyError, TypeError) as err:
+        raise ValueError(f"Invalid exercise samples: {err!r}") from err
+    return decoded
+
+
+def _padding(size):
+    """Return padding needed to keep series aligned."""
+    return -size % _ALIGNMENT
+
+
+def dump_samples(samples):
+    """Serialize decoded samples to bytes.
+
+    Series values are stored raw and aligned, so the file can be memory-mapped
+    and read without decoding.
+    """
+    byteorder = _LITTLE_ENDIAN if sys.byteorder == "little" else _BIG_ENDIAN
+    chunks = [_FILE_HEADER.pack(_MAGIC, _VERSION, byteorder, len(samples))]
+    size = _FILE_HEADER.size
+    for series in samples.values():
+        header = _SERIES_HEADER.pack(
+            series.sample_type,
+            series.values.typecode.encode(),
+            series.recording_rate,
+            len(series.values),
+        )
+        header += bytes(_padding(size + len(header)))
+        values = series.values.tobytes()
+        chunks += [header, values, bytes(_padding(len(values)))]
+        size += len(header) + len(values) + _padding(len(values))
+    return b"".join(chunks)
+
+
+def load_samples(buffer):
+    """Deserialize samples from bytes, a memoryview or a mmap."""
+    magic, version, byteorder, count = _FILE_HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not a Polar samples file")
+    swap = byteorder != (_LITTLE_ENDIAN if sys.byteorder == "little" else _BIG_ENDIAN)
+
+    samples = {}
+    offset = _FILE_HEADER.size
+    for _ in range(count):
+        sample_type, typecode, recording_rate, length = _SERIES_HEADER.unpack_from(
+            buffer, offset
+        )
+        offset += _SERIES_HEADER.size
+        offset += _padding(offset)
+        values = array(typecode.decode())
+        end = offset + length * values.itemsize
+        values.frombytes(buffer[offset:end])
+        if swap:
+            values.byteswap()
+        samples[sample_type] = ExerciseSamples(sample_type, recording_rate, values)
+        offset = end + _padding(end)
+    return samples
@@ -0,0 +1,52 @@
+"""JSON serialization of Polar Access Link payloads."""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonSerializer:
+    """Serializer of the standard library, from and to bytes."""
+
+    name = "json"
+
+    def loads(self, data):
+        """Decode JSON bytes or string, raise ValueError if invalid."""
+        return json.loads(data)
+
+    def dumps(self, obj, sort_keys=False, indent=False):
+        """Encode an object to JSON bytes, unknown types as strings."""
+        return json.dumps(
+            obj,
+            sort_keys=sort_keys,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+            ensure_ascii=False,
+            default=str,
+        ).encode()
+
+
+class OrjsonSerializer(JsonSerializer):
+    """Serializer of orjson."""
+
+    name = "orjson"
+
+    def loads(self, data):
+        """Decode JSON bytes or string, raise ValueError if invalid."""
+        return orjson.loads(data)
+
+    def dumps(self, obj, sort_keys=False, indent=False):
+        """Encode an object to JSON bytes, unknown types as strings."""
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option)
+
+
+# orjson is installed with Home Assistant, it decodes bytes without an
+# intermediate string
+DEFAULT_SERIALIZER = JsonSerializer() if orjson is None else OrjsonSerializer()
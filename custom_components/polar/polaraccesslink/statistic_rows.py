@@ -0,0 +1,76 @@
+"""Hourly rows of statistics of Polar records."""
+from dataclasses import dataclass
+from datetime import datetime, time
+import math
+
+
+@dataclass(slots=True)
+class StatisticRow:
+    """Row of a statistic, starting at a UTC timestamp."""
+
+    start: float
+    state: float
+    sum: float
+
+
+def hour_start(timestamp):
+    """Return the first hour start from a timestamp.
+
+    Statistics can only start on the hour, while local midnight is not in
+    time zones with a half-hour offset.
+    """
+    return math.ceil(timestamp / 3600) * 3600
+
+
+def local_hour_starts(day, hours, tzinfo):
+    """Return timestamps of the wall clock hours of a local day, on the hour.
+
+    Hours are converted to UTC one by one, so they follow daylight saving
+    time changes: an hour skipped by the change starts with the next one, and
+    a repeated hour starts at its first occurrence.
+    """
+    return [
+        hour_start(datetime.combine(day, time(hour), tzinfo).timestamp())
+        for hour in range(hours)
+    ]
+
+
+def updated_rows(imported, values):
+    """Return rows to import for new or changed values.
+
+    imported are the last imported rows, oldest first, and values the state
+    of records by start. Values before the first imported row are ignored,
+    since the sum before it is unknown. From the first new or changed value
+    on, every row is returned, with its sum recomputed.
+    """
+    first_start = imported[0].start if imported else None
+    states = {row.start: row.state for row in imported}
+    changed = [
+        start
+        for start, value in values.items()
+        if (first_start is None or start >= first_start) and states.get(start) != value
+    ]
+    if not changed:
+        return []
+
+    since = min(changed)
+    # sum before the first returned row
+    running_sum = next(
+        (row.sum - row.state for row in imported if row.start >= since),
+        imported[-1].sum if imported else 0.0,
+    )
+    starts = {start for start in values if start >= since}
+    starts.update(row.start for row in imported if row.start >= since)
+    rows = []
+    for start in sorted(starts):
+        state = values[start] if start in values else states[start]
+        running_sum += state
+        rows.append(StatisticRow(start, state, running_sum))
+    return rows
+
+
+def merge_rows(imported, rows, max_rows):
+    """Return the last max_rows rows, oldest first, once rows are imported."""
+    merged = {row.start: row for row in imported}
+    merged.update((row.start, row) for row in rows)
+    return [merged[start] for start in sorted(merged)[-max_rows:]]
@@ -0,0 +1,56 @@
+"""Index of records sorted by time."""
+from bisect import bisect_left
+
+
+class TimeIndex:
+    """Keys of records sorted by an ISO 8601 time, then by key.
+
+    ISO 8601 dates and timestamps sort as strings, so times are not parsed.
+    Time ranges are found by bisection. Changes are applied in bulk: the kept
+    entries are still sorted and the changed ones are appended, so a single
+    sort merges them in O(n + k log k) for k changes, instead of one O(n)
+    list insertion per change.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self, times=None):
+        """Init the index from the times of the records, by key."""
+        self._entries = sorted((time, key) for key, time in (times or {}).items())
+
+    def __len__(self):
+        """Return the number of records."""
+        return len(self._entries)
+
+    @property
+    def latest(self):
+        """Return the key of the newest record, None if empty."""
+        return self._entries[-1][1] if self._entries else None
+
+    def between(self, start=None, end=None):
+        """Return keys of records from start, included, to end, excluded.
+
+        Keys are returned newest first. A date bound matches the whole day of
+        timestamps.
+        """
+        low = 0 if start is None else bisect_left(self._entries, (start,))
+        high = len(self._entries) if end is None else bisect_left(self._entries, (end,))
+        return [key for _, key in reversed(self._entries[low:high])]
+
+    def at(self, time):
+        """Return keys of records with exactly this time."""
+        position = bisect_left(self._entries, (time,))
+        keys = []
+        while position < len(self._entries) and self._entries[position][0] == time:
+            keys.append(self._entries[position][1])
+            position += 1
+        return keys
+
+    def update(self, times):
+        """Set the time of records by key, removing those with a None time."""
+        if not times:
+            return
+        entries = [entry for entry in self._entries if entry[1] not in times]
+        entries.extend((time, key) for key, time in times.items() if time is not None)
+        entries.sort()
+        self._entries = entries
@@ -0,0 +1,193 @@
+"""Rolling training load of exercises, over acute and chronic windows."""
+from datetime import date, timedelta
+import math
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+WINDOWS = (ACUTE_DAYS, CHRONIC_DAYS)
+# summed exercise metrics, in the order of the totals
+METRICS = ("training_load", "duration", "distance", "calories")
+_LOAD = 0
+
+
+def exercise_metrics(exercise):
+    """Return the summed metrics of an exercise, missing ones being 0."""
+    return [
+        float(value or 0)
+        for value in (
+            exercise.training_load,
+            exercise.duration_seconds,
+            exercise.distance,
+            exercise.calories,
+        )
+    ]
+
+
+def _add(totals, metrics, sign=1):
+    """Add metrics to totals, in place."""
+    for index, value in enumerate(metrics):
+        totals[index] += sign * value
+
+
+class TrainingLoad:
+    """Training load, duration, distance and calories of the last days.
+
+    Exercises are summed by day and sport, for the days of the chronic window
+    only. Totals of each window are kept up to date: adding an exercise
+    updates the totals of the windows including its day, and a new day only
+    removes the days leaving the windows, so nothing is summed again from the
+    exercises. Exercises are identified by their start time, which does not
+    depend on where they were listed.
+    """
+
+    def __init__(self, today, days=None):
+        """Init the training load from the exercises by day and sport.
+
+        days maps ISO dates to the start times of their exercises and the
+        metrics by sport, as returned by as_dict.
+        """
+        self._reset(today)
+        for day, data in (days or {}).items():
+            if self._windows(day):
+                self.days[day] = data
+                self._add_day(day, data["sports"])
+
+    def _reset(self, today):
+        """Remove every exercise and move the windows to a day."""
+        self.today = today
+        self.days = {}
+        self._totals = {window: {} for window in WINDOWS}
+        # sum of the squared daily loads of the acute window
+        self._squares = 0.0
+
+    def _windows(self, day):
+        """Return the windows including a day."""
+        age = (self.today - date.fromisoformat(day)).days
+        return [window for window in WINDOWS if 0 <= age < window]
+
+    def _day_load(self, day):
+        """Return the training load of a day."""
+        if (data := self.days.get(day)) is None:
+            return 0.0
+        return sum(metrics[_LOAD] for metrics in data["sports"].values())
+
+    def _add_day(self, day, sports):
+        """Add metrics of a day to the totals of its windows."""
+        for window in self._windows(day):
+            totals = self._totals[window]
+            for sport, metrics in sports.items():
+                _add(totals.setdefault(sport, [0.0] * len(METRICS)), metrics)
+        if ACUTE_DAYS in self._windows(day):
+            self._squares += self._day_load(day) ** 2
+
+    def add(self, exercise):
+        """Add an exercise, return False if known or outside the windows."""
+        if exercise.start_time is None:
+            return False
+        day = exercise.start_time.date().isoformat()
+        if not self._windows(day):
+            return False
+        data = self.days.setdefault(day, {"exercises": [], "sports": {}})
+        start_time = exercise.start_time.isoformat()
+        if start_time in data["exercises"]:
+            return False
+
+        metrics = exercise_metrics(exercise)
+        sport = exercise.sport or "OTHER"
+        previous_load = self._day_load(day)
+        data["exercises"].append(start_time)
+        _add(data["sports"].setdefault(sport, [0.0] * len(METRICS)), metrics)
+        for window in self._windows(day):
+            _add(self._totals[window].setdefault(sport, [0.0] * len(METRICS)), metrics)
+        if ACUTE_DAYS in self._windows(day):
+            self._squares += self._day_load(day) ** 2 - previous_load**2
+        return True
+
+    def advance(self, today):
+        """Move the windows to a new day, return True if they moved."""
+        if today <= self.today:
+            return False
+        if (today - self.today).days >= CHRONIC_DAYS:
+            # every day left the windows
+            self._reset(today)
+            return True
+        while self.today < today:
+            for window in WINDOWS:
+                day = (self.today - timedelta(days=window - 1)).isoformat()
+                if (data := self.days.get(day)) is None:
+                    continue
+                for sport, metrics in data["sports"].items():
+                    _add(self._totals[window][sport], metrics, -1)
+                if window == ACUTE_DAYS:
+                    self._squares -= self._day_load(day) ** 2
+            self.days.pop(
+                (self.today - timedelta(days=CHRONIC_DAYS - 1)).isoformat(), None
+            )
+            self.today += timedelta(days=1)
+        return True
+
+    def totals(self, window, sport=None):
+        """Return the metrics of a window, of a sport or all of them."""
+        sports = self._totals[window]
+        if sport is not None:
+            return dict(zip(METRICS, sports.get(sport, [0.0] * len(METRICS))))
+        totals = [0.0] * len(METRICS)
+        for metrics in sports.values():
+            _add(totals, metrics)
+        return dict(zip(METRICS, totals))
+
+    @property
+    def sports(self):
+        """Return sports of the chronic window."""
+        return sorted(
+            sport
+            for sport, metrics in self._totals[CHRONIC_DAYS].items()
+            if any(abs(value) > 1e-9 for value in metrics)
+        )
+
+    @property
+    def acute_load(self):
+        """Return the average daily training load of the acute window."""
+        return self.totals(ACUTE_DAYS)["training_load"] / ACUTE_DAYS
+
+    @property
+    def chronic_load(self):
+        """Return the average daily training load of the chronic window."""
+        return self.totals(CHRONIC_DAYS)["training_load"] / CHRONIC_DAYS
+
+    @property
+    def acute_chronic_ratio(self):
+        """Return the acute:chronic workload ratio, None without chronic load."""
+        if (chronic_load := self.chronic_load) <= 1e-9:
+            return None
+        return self.acute_load / chronic_load
+
+    @property
+    def monotony(self):
+        """Return the training monotony of the acute window.
+
+        It is the average daily load divided by its standard deviation, rest
+        days counting as a load of 0. It is None when every day had the same
+        load.
+        """
+        mean = self.acute_load
+        variance = self._squares / ACUTE_DAYS - mean**2
+        if variance <= 1e-9:
+            return None
+        return mean / math.sqrt(variance)
+
+    @property
+    def strain(self):
+        """Return the training strain, weekly load times monotony."""
+        if (monotony := self.monotony) is None:
+            return None
+        return self.totals(ACUTE_DAYS)["training_load"] * monotony
+
+    def as_dict(self):
+        """Return the state, to restore it with the day it was computed."""
+        return {"today": self.today.isoformat(), "days": self.days}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore the state returned by as_dict."""
+        return cls(date.fromisoformat(data["today"]), data["days"])
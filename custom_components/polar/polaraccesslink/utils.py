@@ -0,0 +1,25 @@
+"""Utilities for Polar Access Link."""
+import asyncio
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+async def gather_limited(items, getter, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Await getter for every item, with at most max_concurrency at once.
+
+    Results keep the order of items. The first failure cancels the pending
+    calls and is raised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _get(item):
+        async with semaphore:
+            return await getter(item)
+
+    tasks = [asyncio.ensure_future(_get(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
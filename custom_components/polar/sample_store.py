@@ -0,0 +1,99 @@
+"""Storage of Polar samples in binary files."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import mmap
+import os
+import shutil
+from typing import Generic, TypeVar
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util.file import write_utf8_file
+
+from .const import DOMAIN
+
+SAMPLES_FILE_SUFFIX = ".samples"
+
+_SamplesT = TypeVar("_SamplesT")
+
+
+class SampleStore(ABC, Generic[_SamplesT]):
+    """Samples of a user, in one binary file per key.
+
+    Samples are kept as typed arrays, which are a fraction of the size of the
+    comma separated strings sent by Polar, and are only read on demand. Keys
+    with stored samples are listed once, then kept in memory.
+    """
+
+    directory: str
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.path = hass.config.path(
+            STORAGE_DIR, f"{DOMAIN}.{entry_id}.{self.directory}"
+        )
+        self._stored_keys: set[str] | None = None
+
+    @abstractmethod
+    def _dump(self, samples: _SamplesT) -> bytes:
+        """Serialize samples."""
+
+    @abstractmethod
+    def _load(self, key: str, buffer: mmap.mmap) -> _SamplesT:
+        """Deserialize samples."""
+
+    def _get_file_path(self, key: str) -> str:
+        """Return path of the samples file of a key."""
+        return os.path.join(self.path, f"{key}{SAMPLES_FILE_SUFFIX}")
+
+    def _list(self) -> set[str]:
+        """List keys with stored samples."""
+        if not os.path.isdir(self.path):
+            return set()
+        return {
+            name.removesuffix(SAMPLES_FILE_SUFFIX)
+            for name in os.listdir(self.path)
+            if name.endswith(SAMPLES_FILE_SUFFIX)
+        }
+
+    def _write(self, key: str, samples: _SamplesT) -> None:
+        """Write samples of a key."""
+        os.makedirs(self.path, exist_ok=True)
+        write_utf8_file(self._get_file_path(key), self._dump(samples), mode="wb")
+
+    def _read(self, key: str) -> _SamplesT:
+        """Read samples of a key."""
+        with (
+            open(self._get_file_path(key), "rb") as samples_file,
+            mmap.mmap(samples_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+        ):
+            return self._load(key, buffer)
+
+    async def _async_get_stored_keys(self) -> set[str]:
+        """Return keys with stored samples."""
+        if self._stored_keys is None:
+            self._stored_keys = await self.hass.async_add_executor_job(self._list)
+        return self._stored_keys
+
+    async def async_get_missing(self, keys: list[str]) -> list[str]:
+        """Return keys without stored samples."""
+        stored_keys = await self._async_get_stored_keys()
+        return [key for key in keys if key not in stored_keys]
+
+    async def async_save(self, key: str, samples: _SamplesT) -> None:
+        """Save samples of a key."""
+        await self.hass.async_add_executor_job(self._write, key, samples)
+        if self._stored_keys is not None:
+            self._stored_keys.add(key)
+
+    async def async_load(self, key: str) -> _SamplesT:
+        """Load samples of a key."""
+        return await self.hass.async_add_executor_job(self._read, key)
+
+    async def async_remove(self) -> None:
+        """Remove all stored samples."""
+        await self.hass.async_add_executor_job(shutil.rmtree, self.path, True)
+        self._stored_keys = set()
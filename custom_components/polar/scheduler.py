@@ -0,0 +1,134 @@
+"""Adaptive polling of Polar data."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_EXERCISE_DATA, ATTR_SLEEP_DATA
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOT_MINUTES = 30
+SLOTS = 24 * 60 // SLOT_MINUTES
+# observations needed before polling adaptively
+MIN_OBSERVATIONS = 3
+# share of the observations making a slot part of an arrival window
+WINDOW_SHARE = 0.1
+# slots polled densely before and after a usual arrival, data being
+# available once the watch is synced
+SLOTS_BEFORE = 1
+SLOTS_AFTER = 3
+
+
+def _sleep_arrival(night: dict[str, Any]) -> str | None:
+    """Return when a night ended."""
+    return night.get("sleep_end_time")
+
+
+def _exercise_arrival(exercise: dict[str, Any]) -> str | None:
+    """Return when an exercise started."""
+    return exercise.get("start_time")
+
+
+# data category: function returning when a record appeared; nightly recharge
+# is computed from the sleep and daily activity is synced with the others
+ARRIVAL_TIMES: dict[str, Callable[[dict[str, Any]], str | None]] = {
+    ATTR_SLEEP_DATA: _sleep_arrival,
+    ATTR_EXERCISE_DATA: _exercise_arrival,
+}
+
+
+def _slot(time: datetime) -> int:
+    """Return the slot of the day of a local time."""
+    return (time.hour * 60 + time.minute) // SLOT_MINUTES
+
+
+class ArrivalPattern:
+    """Count of the records of a data category by time of day."""
+
+    def __init__(self) -> None:
+        """Initialize the pattern."""
+        self.counts = [0] * SLOTS
+        self.total = 0
+
+    def add(self, raw_time: str) -> None:
+        """Add the time a record appeared."""
+        if (time := dt_util.parse_datetime(raw_time)) is None:
+            return
+        if time.tzinfo is not None:
+            time = dt_util.as_local(time)
+        self.counts[_slot(time)] += 1
+        self.total += 1
+
+    def dense_slots(self) -> set[int]:
+        """Return slots to poll densely, around usual arrival times."""
+        if self.total < MIN_OBSERVATIONS:
+            return set()
+        threshold = max(1, self.total * WINDOW_SHARE)
+        return {
+            (slot + offset) % SLOTS
+            for slot, count in enumerate(self.counts)
+            if count >= threshold
+            for offset in range(-SLOTS_BEFORE, SLOTS_AFTER + 1)
+        }
+
+
+class AdaptiveScheduler:
+    """Choose the next update interval from when data usually appears.
+
+    Data is polled every floor interval during the learned arrival windows,
+    then the next update is planned at the start of the next window, never
+    later than the ceiling interval.
+    """
+
+    def __init__(
+        self, floor: timedelta, ceiling: timedelta, default: timedelta
+    ) -> None:
+        """Initialize the scheduler."""
+        self.floor = floor
+        self.ceiling = ceiling
+        self.default = default
+        self._dense_slots: set[int] = set()
+        self._learned = False
+
+    def learn(
+        self,
+        data: dict[str, Iterable[dict[str, Any]]],
+        categories: Iterable[str] = ARRIVAL_TIMES,
+    ) -> None:
+        """Learn arrival windows from the records of some data categories."""
+        self._dense_slots = set()
+        self._learned = False
+        for category in categories:
+            arrival_fn = ARRIVAL_TIMES[category]
+            pattern = ArrivalPattern()
+            for record in data.get(category, []):
+                if raw_time := arrival_fn(record):
+                    pattern.add(raw_time)
+            if dense_slots := pattern.dense_slots():
+                self._dense_slots |= dense_slots
+                self._learned = True
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Return the interval until the next update."""
+        if not self._learned:
+            return min(max(self.default, self.floor), self.ceiling)
+
+        now = dt_util.as_local(now)
+        current_slot = _slot(now)
+        if current_slot in self._dense_slots:
+            return self.floor
+
+        slot_start = now.replace(
+            minute=now.minute - now.minute % SLOT_MINUTES, second=0, microsecond=0
+        )
+        for offset in range(1, SLOTS + 1):
+            if (current_slot + offset) % SLOTS in self._dense_slots:
+                interval = slot_start + timedelta(minutes=offset * SLOT_MINUTES) - now
+                return min(max(interval, self.floor), self.ceiling)
+        return self.ceiling
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import timedelta
 import logging
 from typing import Any
 
@@ -14,23 +15,30 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import PolarCoordinator
 from .const import (
+    ATTR_LAST_ACTIVITY_SAMPLES,
     ATTR_LAST_DAILY,
     ATTR_LAST_EXERCISE,
     ATTR_LAST_RECHARGE,
     ATTR_LAST_SLEEP,
+    ATTR_TRAINING_LOAD,
     ATTR_USER_DATA,
     ATTRIBUTION,
+    CONF_ACTIVITY_SAMPLES,
     DOMAIN,
 )
+from .coordinator import PolarCoordinator, PolarData
 
 _LOGGER = logging.getLogger(__name__)
+# interval diagnostic sensors read the runtime measures at
+SCAN_INTERVAL = timedelta(minutes=1)
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -40,6 +48,16 @@ class PolarEntityDescription(SensorEntityDescription):
     key_category: str
     unique_id: str
     attributes_keys: list[str]
+    # option the sensor is only created with
+    option: str | None = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class PolarDiagnosticEntityDescription(SensorEntityDescription):
+    """Provide a description of a Polar diagnostic sensor."""
+
+    value_fn: Callable[[PolarData], StateType]
+    attributes_fn: Callable[[PolarData], dict[str, Any]] | None = None
 
 
 SENSOR_DESCRIPTIONS = (
@@ -52,6 +70,47 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement="kg",
         device_class=SensorDeviceClass.WEIGHT,
         state_class=SensorStateClass.MEASUREMENT,
+        attributes_keys=["weight-source"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_USER_DATA,
+        key="height",
+        name="Height",
+        unique_id="height",
+        native_unit_of_measurement="cm",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:human-male-height",
+        attributes_keys=[],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_USER_DATA,
+        key="vo2-max",
+        name="VO2max",
+        unique_id="vo2_max",
+        native_unit_of_measurement="mL/kg/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:lungs",
+        attributes_keys=[],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_USER_DATA,
+        key="maximum-heart-rate",
+        name="Maximum heart rate",
+        unique_id="maximum_heart_rate",
+        native_unit_of_measurement="bpm",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:heart-flash",
+        attributes_keys=["aerobic-threshold", "anaerobic-threshold"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_USER_DATA,
+        key="resting-heart-rate",
+        name="Resting heart rate",
+        unique_id="resting_heart_rate",
+        native_unit_of_measurement="bpm",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:heart-pulse",
         attributes_keys=[],
     ),
     # daily
@@ -83,6 +142,28 @@ SENSOR_DESCRIPTIONS = (
         icon="mdi:shoe-print",
         attributes_keys=[],
     ),
+    # activity samples
+    PolarEntityDescription(
+        key_category=ATTR_LAST_ACTIVITY_SAMPLES,
+        key="hourly_steps",
+        option=CONF_ACTIVITY_SAMPLES,
+        native_unit_of_measurement="steps",
+        name="Hourly steps",
+        unique_id="hourly_steps",
+        icon="mdi:shoe-print",
+        attributes_keys=["date", "hour", "steps_by_hour"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_LAST_ACTIVITY_SAMPLES,
+        key="sedentary_time",
+        option=CONF_ACTIVITY_SAMPLES,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        name="Sedentary time",
+        unique_id="sedentary_time",
+        icon="mdi:seat-recline-normal",
+        attributes_keys=["date", "zones"],
+    ),
     # exercise
     PolarEntityDescription(
         key_category=ATTR_LAST_EXERCISE,
@@ -99,8 +180,59 @@ SENSOR_DESCRIPTIONS = (
             "calories",
             "running_index",
             "device",
+            "route",
         ],
     ),
+    # training load
+    PolarEntityDescription(
+        key_category=ATTR_TRAINING_LOAD,
+        key="acute_chronic_ratio",
+        name="Acute chronic workload ratio",
+        unique_id="acute_chronic_workload_ratio",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:scale-balance",
+        attributes_keys=["date", "acute_load", "chronic_load"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_TRAINING_LOAD,
+        key="weekly_training_load",
+        name="Weekly training load",
+        unique_id="weekly_training_load",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:weight-lifter",
+        attributes_keys=["date", "sports"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_TRAINING_LOAD,
+        key="weekly_duration",
+        name="Weekly training duration",
+        unique_id="weekly_training_duration",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        attributes_keys=["date", "weekly_calories"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_TRAINING_LOAD,
+        key="weekly_distance",
+        name="Weekly training distance",
+        unique_id="weekly_training_distance",
+        native_unit_of_measurement="km",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:map-marker-distance",
+        attributes_keys=["date"],
+    ),
+    PolarEntityDescription(
+        key_category=ATTR_TRAINING_LOAD,
+        key="monotony",
+        name="Training monotony",
+        unique_id="training_monotony",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:chart-bell-curve",
+        attributes_keys=["date", "strain"],
+    ),
     # sleep
     PolarEntityDescription(
         key_category=ATTR_LAST_SLEEP,
@@ -151,14 +283,61 @@ SENSOR_DESCRIPTIONS = (
     ),
 )
 
+DIAGNOSTIC_SENSOR_DESCRIPTIONS = (
+    PolarDiagnosticEntityDescription(
+        key="refresh_duration",
+        name="Refresh duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        # the slowest category, refreshes of categories being independent
+        value_fn=lambda polar: max(polar.refresh_durations.values(), default=None),
+        attributes_fn=lambda polar: {
+            category: round(duration, 3)
+            for category, duration in polar.refresh_durations.items()
+        },
+    ),
+    PolarDiagnosticEntityDescription(
+        key="api_calls_today",
+        name="API calls today",
+        native_unit_of_measurement="calls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:api",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        # the rate limit applies to the client, shared by entries of a family
+        value_fn=lambda polar: polar.client.metrics.requests_today,
+    ),
+)
+
+
+def _device_info(entry_id: str, user_name: str) -> DeviceInfo:
+    """Return the device of the sensors of a user."""
+    return DeviceInfo(
+        configuration_url="https://flow.polar.com/",
+        entry_type=DeviceEntryType.SERVICE,
+        identifiers={(DOMAIN, entry_id)},
+        manufacturer="Polar",
+        name=user_name,
+    )
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the Polar sensor platform."""
-    coordinator: PolarCoordinator = hass.data[DOMAIN][entry.entry_id]
+    polar: PolarData = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        PolarSensor(polar.get_coordinator(description.key_category), description)
+        for description in SENSOR_DESCRIPTIONS
+        if description.option is None or entry.options.get(description.option, False)
+    )
     async_add_entities(
-        PolarSensor(coordinator, description) for description in SENSOR_DESCRIPTIONS
+        PolarDiagnosticSensor(polar, description)
+        for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS
     )
 
 
@@ -178,48 +357,79 @@ class PolarSensor(CoordinatorEntity[PolarCoordinator], SensorEntity):
         super().__init__(coordinator)
         self.entity_description = description
 
-        self._attr_device_info = DeviceInfo(
-            configuration_url="https://flow.polar.com/",
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, coordinator.entry_id)},
-            manufacturer="Polar",
-            name=coordinator.user_name,
+        self._attr_device_info = _device_info(
+            coordinator.entry_id, coordinator.user_name
         )
         self._attr_unique_id = (
             f"{coordinator.entry_id}_{description.unique_id or description.key}"
         )
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
+        # fingerprint of the record and coordinator success last written
+        self._written_state: tuple[str | None, bool] | None = None
+        self._update_from_data()
 
+    def _current_state(self) -> tuple[str | None, bool]:
+        """Return fingerprint of the record and coordinator success."""
         return (
-            super().available
-            and self.entity_description.key
-            in self.coordinator.data[self.entity_description.key_category]
+            self.coordinator.fingerprints.get(self.entity_description.key_category),
+            self.coordinator.last_update_success,
         )
 
-    @property
-    def native_value(self) -> float | None:
-        """Return sensor state."""
-        if (
-            value := self.coordinator.data[self.entity_description.key_category][
-                self.entity_description.key
-            ]
-        ) is None:
-            return None
-        return value
+    def _update_from_data(self) -> None:
+        """Compute state and attributes once from the record of the sensor."""
+        record = (self.coordinator.data or {}).get(
+            self.entity_description.key_category, {}
+        )
+        self._attr_available = self.entity_description.key in record
+        self._attr_native_value = record.get(self.entity_description.key)
+        if self.entity_description.attributes_keys:
+            self._attr_extra_state_attributes = {
+                key: record[key]
+                for key in self.entity_description.attributes_keys
+                if key in record
+            }
+        self._written_state = self._current_state()
 
     @property
-    def extra_state_attributes(self) -> Mapping[str, Any] | None:
-        """Return attributes."""
-        if self.entity_description.attributes_keys:
-            attributes = {}
-            for key in self.entity_description.attributes_keys:
-                if key in self.coordinator.data[self.entity_description.key_category]:
-                    value = self.coordinator.data[self.entity_description.key_category][
-                        key
-                    ]
-                    attributes.update({key: value})
-            return attributes
-        return None
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return super().available and self._attr_available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the record of the sensor changed."""
+        if self._current_state() == self._written_state:
+            return
+        self._update_from_data()
+        self.async_write_ha_state()
+
+
+class PolarDiagnosticSensor(SensorEntity):
+    """Sensor of a runtime measure of the integration, polled."""
+
+    entity_description: PolarDiagnosticEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        polar: PolarData,
+        description: PolarDiagnosticEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.polar = polar
+        self.entity_description = description
+        self._attr_device_info = _device_info(polar.entry_id, polar.user_name)
+        self._attr_unique_id = f"{polar.entry_id}_{description.key}"
+        self._update_from_polar()
+
+    def _update_from_polar(self) -> None:
+        """Read the measure."""
+        self._attr_native_value = self.entity_description.value_fn(self.polar)
+        if self.entity_description.attributes_fn is not None:
+            self._attr_extra_state_attributes = self.entity_description.attributes_fn(
+                self.polar
+            )
+
+    async def async_update(self) -> None:
+        """Update the measure."""
+        self._update_from_polar()
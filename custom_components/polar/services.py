@@ -0,0 +1,86 @@
+"""Services of the Polar integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_DAILY_DATA,
+    ATTR_EXERCISE_DATA,
+    ATTR_RECHARGE_DATA,
+    ATTR_SLEEP_DATA,
+    ATTR_USER_DATA,
+    DOMAIN,
+)
+from .coordinator import PolarData
+
+SERVICE_GET_HISTORY = "get_history"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_CATEGORY = "category"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_LIMIT = "limit"
+
+# service category: data category
+HISTORY_CATEGORIES = {
+    "exercises": ATTR_EXERCISE_DATA,
+    "sleep": ATTR_SLEEP_DATA,
+    "nightly_recharge": ATTR_RECHARGE_DATA,
+    "daily_activity": ATTR_DAILY_DATA,
+    "physical_information": ATTR_USER_DATA,
+}
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_CATEGORY): vol.In(list(HISTORY_CATEGORIES)),
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+async def _async_get_history(call: ServiceCall) -> ServiceResponse:
+    """Return records of a user between two dates, newest first."""
+    polar = call.hass.data.get(DOMAIN, {}).get(call.data[ATTR_CONFIG_ENTRY_ID])
+    if not isinstance(polar, PolarData):
+        raise ServiceValidationError(
+            f"Polar entry {call.data[ATTR_CONFIG_ENTRY_ID]} is not loaded"
+        )
+
+    history = polar.histories[HISTORY_CATEGORIES[call.data[ATTR_CATEGORY]]]
+    await history.async_load()
+    start = call.data.get(ATTR_START)
+    end = call.data.get(ATTR_END)
+    records = history.between(
+        None if start is None else start.isoformat(),
+        # the end date is included
+        None if end is None else (end + timedelta(days=1)).isoformat(),
+    )
+    if (limit := call.data.get(ATTR_LIMIT)) is not None:
+        records = records[:limit]
+    return {"records": [dict(record) for record in records]}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Polar services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,281 @@
+"""Import Polar history as long-term statistics."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_ACTIVITY_SAMPLES,
+    ATTR_DAILY_DATA,
+    ATTR_RECHARGE_DATA,
+    ATTR_SLEEP_DATA,
+    DOMAIN,
+)
+from .polaraccesslink.activity_samples import SEDENTARY_ZONE
+from .polaraccesslink.models import Night
+from .polaraccesslink.statistic_rows import (
+    StatisticRow,
+    local_hour_starts,
+    merge_rows,
+    updated_rows,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# days imported again when Polar updates them
+REIMPORT_DAYS = 7
+
+
+@dataclass(frozen=True, kw_only=True)
+class PolarStatisticDescription:
+    """Provide a description of a Polar statistic."""
+
+    key: str
+    category: str
+    name: str
+    unit: str | None
+    value_fn: Callable[[Any], float | None]
+    has_sum: bool = False
+    # value_fn returns the values of every hour of the day of the record
+    hourly: bool = False
+
+
+def _sleep_duration(night: Night) -> float | None:
+    """Return sleep duration in hours."""
+    if (seconds := night.sleep_seconds) is None:
+        return None
+    return round(seconds / 3600, 2)
+
+
+STATISTIC_DESCRIPTIONS = (
+    # sleep
+    PolarStatisticDescription(
+        key="sleep_score",
+        category=ATTR_SLEEP_DATA,
+        name="Sleep score",
+        unit=None,
+        value_fn=lambda night: night.sleep_score,
+    ),
+    PolarStatisticDescription(
+        key="sleep_duration",
+        category=ATTR_SLEEP_DATA,
+        name="Sleep duration",
+        unit=UnitOfTime.HOURS,
+        value_fn=_sleep_duration,
+    ),
+    # recharge
+    PolarStatisticDescription(
+        key="ans_charge",
+        category=ATTR_RECHARGE_DATA,
+        name="ANS charge",
+        unit=None,
+        value_fn=lambda recharge: recharge.ans_charge,
+    ),
+    PolarStatisticDescription(
+        key="nightly_heart_rate",
+        category=ATTR_RECHARGE_DATA,
+        name="Nightly heart rate",
+        unit="bpm",
+        value_fn=lambda recharge: recharge.heart_rate_avg,
+    ),
+    PolarStatisticDescription(
+        key="nightly_heart_rate_variability",
+        category=ATTR_RECHARGE_DATA,
+        name="Nightly heart rate variability",
+        unit=UnitOfTime.MILLISECONDS,
+        value_fn=lambda recharge: recharge.heart_rate_variability_avg,
+    ),
+    PolarStatisticDescription(
+        key="nightly_breathing_rate",
+        category=ATTR_RECHARGE_DATA,
+        name="Nightly breathing rate",
+        unit="br/min",
+        value_fn=lambda recharge: recharge.breathing_rate_avg,
+    ),
+    # daily
+    PolarStatisticDescription(
+        key="daily_steps",
+        category=ATTR_DAILY_DATA,
+        name="Daily steps",
+        unit="steps",
+        value_fn=lambda activity: activity.active_steps,
+        has_sum=True,
+    ),
+    PolarStatisticDescription(
+        key="daily_calories",
+        category=ATTR_DAILY_DATA,
+        name="Daily calories",
+        unit="kcal",
+        value_fn=lambda activity: activity.calories,
+        has_sum=True,
+    ),
+    PolarStatisticDescription(
+        key="daily_active_calories",
+        category=ATTR_DAILY_DATA,
+        name="Daily active calories",
+        unit="kcal",
+        value_fn=lambda activity: activity.active_calories,
+        has_sum=True,
+    ),
+    # activity samples
+    PolarStatisticDescription(
+        key="hourly_steps",
+        category=ATTR_ACTIVITY_SAMPLES,
+        name="Hourly steps",
+        unit="steps",
+        value_fn=lambda samples: samples.hourly_steps(),
+        has_sum=True,
+        hourly=True,
+    ),
+    PolarStatisticDescription(
+        key="sedentary_time",
+        category=ATTR_ACTIVITY_SAMPLES,
+        name="Sedentary time",
+        unit=UnitOfTime.HOURS,
+        value_fn=lambda samples: round(samples.zone_seconds(SEDENTARY_ZONE) / 3600, 2),
+    ),
+)
+
+
+def _values(
+    description: PolarStatisticDescription, record: Any
+) -> Iterator[tuple[float, float]]:
+    """Return start timestamps and values of a statistic of a record.
+
+    Values of the hours of a day starting at the same time, because of a
+    daylight saving time change, are added up.
+    """
+    if record.date is None:
+        return
+    if (value := description.value_fn(record)) is None:
+        return
+    time_zone = dt_util.get_default_time_zone()
+    if not description.hourly:
+        yield local_hour_starts(record.date, 1, time_zone)[0], float(value)
+        return
+    hours: dict[float, float] = {}
+    for start, hour_value in zip(
+        local_hour_starts(record.date, len(value), time_zone), value, strict=True
+    ):
+        hours[start] = hours.get(start, 0.0) + float(hour_value)
+    yield from hours.items()
+
+
+class PolarStatisticsImporter:
+    """Import dated Polar records as external statistics of a user.
+
+    A record is imported at the local midnight of its date, or at the next
+    hour when midnight is not on the hour. The rows of the last days are kept,
+    since Polar updates days after they were imported: from the first new or
+    changed day of this window on, every row is imported again with its sum
+    recomputed.
+    """
+
+    def __init__(self, hass: HomeAssistant, user_id: str, user_name: str) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self.user_id = user_id
+        self.user_name = user_name
+        # last imported rows, oldest first, by statistic ID
+        self._imported: dict[str, list[StatisticRow]] = {}
+
+    def _statistic_id(self, description: PolarStatisticDescription) -> str:
+        """Return the external statistic ID of a description."""
+        return f"{DOMAIN}:{self.user_id}_{description.key}"
+
+    async def _async_get_imported(
+        self, statistic_id: str, max_rows: int
+    ) -> list[StatisticRow]:
+        """Return the last imported rows of a statistic, oldest first."""
+        if statistic_id not in self._imported:
+            last_stats = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics,
+                self.hass,
+                max_rows,
+                statistic_id,
+                True,
+                {"state", "sum"},
+            )
+            self._imported[statistic_id] = [
+                StatisticRow(
+                    start=row["start"],
+                    state=row.get("state") or 0,
+                    sum=row.get("sum") or 0,
+                )
+                for row in reversed(last_stats.get(statistic_id, []))
+            ]
+        return self._imported[statistic_id]
+
+    async def async_import(
+        self, data: dict[str, list[Any]], categories: list[str]
+    ) -> None:
+        """Import new days of the records of some data categories."""
+        for description in STATISTIC_DESCRIPTIONS:
+            if description.category in categories:
+                await self._async_import_statistic(
+                    description, data.get(description.category, [])
+                )
+
+    async def _async_import_statistic(
+        self, description: PolarStatisticDescription, records: list[Any]
+    ) -> None:
+        """Import new and changed days of a statistic."""
+        statistic_id = self._statistic_id(description)
+        max_rows = REIMPORT_DAYS * (24 if description.hourly else 1)
+        imported = await self._async_get_imported(statistic_id, max_rows)
+
+        rows = updated_rows(
+            imported,
+            dict(value for record in records for value in _values(description, record)),
+        )
+        if not rows:
+            return
+
+        statistics: list[StatisticData] = []
+        for row in rows:
+            if description.has_sum:
+                statistics.append(
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(row.start),
+                        state=row.state,
+                        sum=row.sum,
+                    )
+                )
+            else:
+                statistics.append(
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(row.start),
+                        state=row.state,
+                        mean=row.state,
+                        min=row.state,
+                        max=row.state,
+                    )
+                )
+
+        _LOGGER.debug("Importing %s rows of %s", len(statistics), statistic_id)
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=not description.has_sum,
+                has_sum=description.has_sum,
+                name=f"{self.user_name} {description.name}",
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=description.unit,
+            ),
+            statistics,
+        )
+        self._imported[statistic_id] = merge_rows(imported, rows, max_rows)
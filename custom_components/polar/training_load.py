@@ -0,0 +1,115 @@
+"""Rolling training load of the exercises of a user."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .history import SAVE_DELAY, STORAGE_VERSION, ExerciseHistory
+from .polaraccesslink.models import Exercise
+from .polaraccesslink.training_load import (
+    ACUTE_DAYS,
+    CHRONIC_DAYS,
+    WINDOWS,
+    TrainingLoad,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _format_totals(totals: dict[str, float], suffix: str = "") -> dict[str, Any]:
+    """Return totals of a window in the units of the sensors."""
+    return {
+        f"training_load{suffix}": round(totals["training_load"], 1),
+        f"duration{suffix}": round(totals["duration"] / 3600, 2),
+        f"distance{suffix}": round(totals["distance"] / 1000, 2),
+        f"calories{suffix}": round(totals["calories"]),
+    }
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    """Round a value which may be missing."""
+    return None if value is None else round(value, digits)
+
+
+class TrainingLoadTracker:
+    """Training load of a user over 7 and 28 days, saved in a store.
+
+    The state is computed from the exercise history once, then every new
+    exercise updates it and it is saved, so a restart only reads it back.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the tracker."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.training_load"
+        )
+        self.training_load: TrainingLoad | None = None
+
+    @property
+    def day(self) -> date | None:
+        """Return the last day of the windows."""
+        return None if self.training_load is None else self.training_load.today
+
+    async def async_load(self, history: ExerciseHistory, today: date) -> None:
+        """Load the state, computing it from the history the first time."""
+        if self.training_load is not None:
+            return
+        if (data := await self._store.async_load()) is not None:
+            self.training_load = TrainingLoad.from_dict(data)
+            return
+
+        self.training_load = TrainingLoad(today)
+        start = today - timedelta(days=CHRONIC_DAYS - 1)
+        exercises = history.between(start.isoformat())
+        _LOGGER.debug("Computing training load from %s exercises", len(exercises))
+        for exercise in exercises:
+            self.training_load.add(exercise)
+        await self._store.async_save(self.training_load.as_dict())
+
+    def advance(self, today: date) -> None:
+        """Move the windows to a new day."""
+        if self.training_load.advance(today):
+            self._store.async_delay_save(self.training_load.as_dict, SAVE_DELAY)
+
+    async def async_add(self, exercises: Iterable[Exercise]) -> None:
+        """Add new exercises and save the state before returning."""
+        added = [exercise for exercise in exercises if self.training_load.add(exercise)]
+        if added:
+            await self._store.async_save(self.training_load.as_dict())
+
+    def summary(self) -> dict[str, Any]:
+        """Return what sensors show of the training load."""
+        training_load = self.training_load
+        if training_load is None:
+            return {}
+        weekly = _format_totals(training_load.totals(ACUTE_DAYS))
+        return {
+            "date": training_load.today.isoformat(),
+            "acute_load": round(training_load.acute_load, 1),
+            "chronic_load": round(training_load.chronic_load, 1),
+            "acute_chronic_ratio": _round(training_load.acute_chronic_ratio, 2),
+            "monotony": _round(training_load.monotony, 2),
+            "strain": _round(training_load.strain, 1),
+            **{f"weekly_{key}": value for key, value in weekly.items()},
+            "sports": {
+                sport: {
+                    key: value
+                    for window in WINDOWS
+                    for key, value in _format_totals(
+                        training_load.totals(window, sport), f"_{window}d"
+                    ).items()
+                }
+                for sport in training_load.sports
+            },
+        }
+
+    async def async_remove(self) -> None:
+        """Remove the stored state."""
+        await self._store.async_remove()
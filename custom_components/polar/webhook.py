@@ -0,0 +1,186 @@
+"""Webhook push mode for the Polar integration."""
+
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_EXTERNAL_URL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    ATTR_DAILY_DATA,
+    ATTR_EXERCISE_DATA,
+    ATTR_RECHARGE_DATA,
+    ATTR_SLEEP_DATA,
+    AUTH_CALLBACK_PATH,
+    CONF_WEBHOOK,
+    CONF_WEBHOOK_SECRET,
+    DOMAIN,
+    WEBHOOK_NAME,
+    WEBHOOK_PATH,
+)
+from .coordinator import PolarData
+from .polaraccesslink.accesslink import AsyncAccessLink
+from .polaraccesslink.endpoints.webhooks import is_valid_signature
+from .polaraccesslink.serializer import DEFAULT_SERIALIZER
+
+_LOGGER = logging.getLogger(__name__)
+
+# data categories refreshed when receiving a webhook event
+WEBHOOK_EVENTS: dict[str, list[str]] = {
+    "EXERCISE": [ATTR_EXERCISE_DATA],
+    "ACTIVITY_SUMMARY": [ATTR_DAILY_DATA],
+    "SLEEP": [ATTR_SLEEP_DATA, ATTR_RECHARGE_DATA],
+}
+
+SIGNATURE_HEADER = "Polar-Webhook-Signature"
+EVENT_HEADER = "Polar-Webhook-Event"
+EVENT_PING = "PING"
+
+DATA_VIEW_REGISTERED = f"{DOMAIN}_webhook_view"
+
+
+def _get_webhook_url(external_url: str) -> str:
+    """Get webhook url from the url used for the authorization callback."""
+    return f"{external_url.strip('/').removesuffix(AUTH_CALLBACK_PATH)}{WEBHOOK_PATH}"
+
+
+def _find_client_secret(hass: HomeAssistant, client_id: str) -> str | None:
+    """Return the webhook secret already known for a Polar client."""
+    return next(
+        (
+            entry.data[CONF_WEBHOOK_SECRET]
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.data[CONF_CLIENT_ID] == client_id
+            and entry.data.get(CONF_WEBHOOK_SECRET)
+        ),
+        None,
+    )
+
+
+def _store_client_secret(hass: HomeAssistant, client_id: str, secret: str) -> None:
+    """Store the webhook secret in every entry of a Polar client."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.data[CONF_CLIENT_ID] == client_id:
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_WEBHOOK_SECRET: secret}
+            )
+
+
+async def _async_list_webhooks(accesslink: AsyncAccessLink) -> list[dict]:
+    """List the webhooks of the Polar client."""
+    webhooks = (await accesslink.webhooks.get()).get("data") or []
+    if isinstance(webhooks, dict):
+        return [webhooks]
+    return webhooks
+
+
+async def async_setup_webhook(
+    hass: HomeAssistant, entry: ConfigEntry, polar: PolarData
+) -> None:
+    """Register the webhook view and the Polar webhook of the client."""
+    if not hass.data.get(DATA_VIEW_REGISTERED):
+        hass.http.register_view(PolarWebhookView())
+        hass.data[DATA_VIEW_REGISTERED] = True
+
+    client_id = entry.data[CONF_CLIENT_ID]
+    webhook_url = _get_webhook_url(entry.data[CONF_EXTERNAL_URL])
+    events = sorted(WEBHOOK_EVENTS)
+
+    webhooks = await _async_list_webhooks(polar.accesslink)
+
+    secret = _find_client_secret(hass, client_id)
+    for webhook in webhooks:
+        if webhook["url"] == webhook_url and secret:
+            if set(webhook.get("events", [])) != set(events):
+                await polar.accesslink.webhooks.update(webhook["id"], events=events)
+            if webhook.get("active") is False:
+                await polar.accesslink.webhooks.activate()
+            _LOGGER.debug("Using existing Polar webhook %s", webhook["id"])
+            return
+
+    # a Polar client only has one webhook, replace the one we can't use
+    for webhook in webhooks:
+        _LOGGER.warning(
+            "Replacing Polar webhook %s pointing to %s", webhook["id"], webhook["url"]
+        )
+        await polar.accesslink.webhooks.delete(webhook["id"])
+
+    response = await polar.accesslink.webhooks.create(webhook_url, events)
+    _LOGGER.debug("Created Polar webhook %s", response["data"]["id"])
+    _store_client_secret(hass, client_id, response["data"]["signature_secret_key"])
+
+
+async def async_remove_webhook(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the Polar webhook when no other entry of the client uses it."""
+    client_id = entry.data[CONF_CLIENT_ID]
+    if any(
+        other.data[CONF_CLIENT_ID] == client_id and other.options.get(CONF_WEBHOOK)
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        return
+
+    accesslink = AsyncAccessLink(
+        session=async_get_clientsession(hass),
+        client_id=client_id,
+        client_secret=entry.data[CONF_CLIENT_SECRET],
+    )
+    for webhook in await _async_list_webhooks(accesslink):
+        if webhook["url"] == _get_webhook_url(entry.data[CONF_EXTERNAL_URL]):
+            await accesslink.webhooks.delete(webhook["id"])
+    # the secret of a deleted webhook can't be used anymore
+    for other in hass.config_entries.async_entries(DOMAIN):
+        if (
+            other.data[CONF_CLIENT_ID] == client_id
+            and CONF_WEBHOOK_SECRET in other.data
+        ):
+            data = dict(other.data)
+            data.pop(CONF_WEBHOOK_SECRET)
+            hass.config_entries.async_update_entry(other, data=data)
+
+
+class PolarWebhookView(HomeAssistantView):
+    """Polar Accesslink Webhook View."""
+
+    requires_auth = False
+    url = WEBHOOK_PATH
+    name = WEBHOOK_NAME
+
+    async def post(self, request: web.Request) -> web.Response:
+        """Receive a webhook event."""
+        hass: HomeAssistant = request.app["hass"]
+        body = await request.read()
+
+        if request.headers.get(EVENT_HEADER) == EVENT_PING:
+            return web.Response(status=200)
+
+        try:
+            payload = DEFAULT_SERIALIZER.loads(body)
+            event = payload["event"]
+            user_id = str(payload["user_id"])
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400, text="Invalid payload")
+
+        signature = request.headers.get(SIGNATURE_HEADER, "")
+        for polar in hass.data.get(DOMAIN, {}).values():
+            if not isinstance(polar, PolarData) or polar.user_id != user_id:
+                continue
+            if not is_valid_signature(
+                polar.entry.data.get(CONF_WEBHOOK_SECRET), body, signature
+            ):
+                _LOGGER.warning("Invalid signature for Polar webhook event %s", event)
+                return web.Response(status=401, text="Invalid signature")
+
+            _LOGGER.debug("Polar webhook event %s for %s", event, user_id)
+            if categories := WEBHOOK_EVENTS.get(event):
+                hass.async_create_task(
+                    polar.async_request_categories_refresh(categories)
+                )
+
+        return web.Response(status=200)
@@ -0,0 +1,601 @@
+"""In-process fake Polar AccessLink server for benchmarks.
+
+Payloads are generated from a seed, so two runs with the same configuration
+serve exactly the same data, latencies and errors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+import functools
+import gzip
+import hashlib
+import json
+import math
+import random
+import threading
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+USER_ID = 12345678
+BASE_DATE = date(2024, 6, 30)
+
+
+@dataclass
+class FakeAccessLinkConfig:
+    """Size and behaviour of the fake server."""
+
+    exercises: int = 30
+    nights: int = 28
+    # daily activities of the activity transaction
+    activities: int = 7
+    # new exercises of each exercise transaction
+    new_exercises: int = 1
+    # seconds of samples and route points of an exercise
+    exercise_seconds: int = 3600
+    # seconds added to every response
+    latency: float = 0.0
+    # share of data requests answered by a 503
+    error_rate: float = 0.0
+    # gzip responses when the client accepts it
+    compress: bool = True
+    seed: int = 0
+
+
+@dataclass
+class FakeAccessLinkStats:
+    """Traffic served by the fake server."""
+
+    requests: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+    by_endpoint: dict[str, int] = field(default_factory=dict)
+
+
+def _iso_duration(seconds: int) -> str:
+    """Format seconds as an ISO 8601 duration."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"PT{hours}H{minutes}M{seconds}S"
+
+
+def _memoized(method):
+    """Cache results of a method in its instance, freed with the instance."""
+
+    @functools.wraps(method)
+    def wrapper(self, key):
+        cache = self._payloads.setdefault(method.__name__, {})
+        if key not in cache:
+            cache[key] = method(self, key)
+        return cache[key]
+
+    return wrapper
+
+
+class FakeAccessLink:
+    """Fake AccessLink v3 API, with ETags like the real one."""
+
+    def __init__(self, config: FakeAccessLinkConfig) -> None:
+        """Generate the payloads."""
+        self.config = config
+        self.stats = FakeAccessLinkStats()
+        self._rng = random.Random(config.seed)
+        # generated payloads, by method and argument
+        self._payloads: dict[str, dict] = {}
+        self._server: TestServer | None = None
+        self._exercise_transactions = 0
+        # physical information is delivered once, until it is committed
+        self._physical_info_committed = False
+        # requests received for each path, to pick failures deterministically
+        self._path_requests: dict[str, int] = {}
+        self._exercises = [self._exercise(index) for index in range(config.exercises)]
+        self._nights = [self._night(index) for index in range(config.nights)]
+        self._recharges = [self._recharge(index) for index in range(config.nights)]
+        self._activities = [self._activity(index) for index in range(config.activities)]
+
+    @property
+    def url(self) -> str:
+        """Return the API URL, as the AccessLink client expects it."""
+        assert self._server is not None
+        return str(self._server.make_url("/v3"))
+
+    def _exercise(self, index: int) -> dict:
+        """Return an exercise summary, days after the base date if negative."""
+        rng = random.Random(f"{self.config.seed}-exercise-{index}")
+        start = datetime.combine(BASE_DATE, datetime.min.time()) - timedelta(
+            days=index, hours=-rng.choice((7, 12, 18))
+        )
+        return {
+            "id": f"exercise{index:05d}",
+            "upload_time": (start + timedelta(hours=2)).isoformat() + ".000Z",
+            "polar_user": f"https://www.polaraccesslink.com/v3/users/{USER_ID}",
+            "device": "Polar Vantage V2",
+            "device_id": "1111AAAA",
+            "start_time": start.strftime("%Y-%m-%dT%H:%M:%S"),
+            "start_time_utc_offset": 120,
+            "duration": _iso_duration(self.config.exercise_seconds),
+            "calories": rng.randint(200, 1200),
+            "distance": round(rng.uniform(2000, 20000), 1),
+            "heart_rate": {
+                "average": rng.randint(110, 160),
+                "maximum": rng.randint(160, 190),
+            },
+            "training_load": round(rng.uniform(20, 250), 1),
+            "sport": rng.choice(("RUNNING", "CYCLING", "OTHER")),
+            "has_route": True,
+            "detailed_sport_info": "RUNNING",
+            "running_index": rng.randint(40, 60),
+        }
+
+    def _night(self, index: int) -> dict:
+        """Return a sleep."""
+        day = BASE_DATE - timedelta(days=index)
+        start = datetime.combine(day - timedelta(days=1), datetime.min.time())
+        start += timedelta(hours=22, minutes=self._rng.randint(0, 90))
+        end = start + timedelta(hours=7, minutes=self._rng.randint(0, 90))
+        return {
+            "polar_user": f"https://www.polaraccesslink.com/v3/users/{USER_ID}",
+            "date": day.isoformat(),
+            "sleep_start_time": start.isoformat() + "+02:00",
+            "sleep_end_time": end.isoformat() + "+02:00",
+            "device_id": "1111AAAA",
+            "continuity": round(self._rng.uniform(1, 5), 1),
+            "continuity_class": self._rng.randint(1, 5),
+            "light_sleep": self._rng.randint(10000, 16000),
+            "deep_sleep": self._rng.randint(3000, 6000),
+            "rem_sleep": self._rng.randint(3000, 7000),
+            "unrecognized_sleep_stage": self._rng.randint(0, 600),
+            "sleep_score": self._rng.randint(50, 95),
+            "total_interruption_duration": self._rng.randint(600, 3000),
+            "sleep_charge": self._rng.randint(1, 5),
+            "sleep_goal": 28800,
+            "sleep_rating": self._rng.randint(1, 5),
+            "short_interruption_duration": self._rng.randint(300, 1500),
+            "long_interruption_duration": self._rng.randint(300, 1500),
+            "sleep_cycles": self._rng.randint(3, 6),
+            "group_duration_score": round(self._rng.uniform(50, 100), 1),
+            "group_solidity_score": round(self._rng.uniform(50, 100), 1),
+            "group_regeneration_score": round(self._rng.uniform(50, 100), 1),
+            "hypnogram": {
+                f"{hour:02d}:00": self._rng.randint(0, 4) for hour in range(8)
+            },
+            "heart_rate_samples": {
+                f"{hour:02d}:{minute:02d}": self._rng.randint(45, 65)
+                for hour in range(8)
+                for minute in range(0, 60, 5)
+            },
+        }
+
+    def _recharge(self, index: int) -> dict:
+        """Return a nightly recharge."""
+        return {
+            "polar_user": f"https://www.polaraccesslink.com/v3/users/{USER_ID}",
+            "date": (BASE_DATE - timedelta(days=index)).isoformat(),
+            "heart_rate_avg": self._rng.randint(45, 65),
+            "beat_to_beat_avg": self._rng.randint(900, 1300),
+            "heart_rate_variability_avg": self._rng.randint(20, 90),
+            "breathing_rate_avg": round(self._rng.uniform(12, 18), 1),
+            "nightly_recharge_status": self._rng.randint(1, 6),
+            "ans_charge": round(self._rng.uniform(-10, 10), 1),
+            "ans_charge_status": self._rng.randint(1, 5),
+            "hrv_samples": {
+                f"{hour:02d}:{minute:02d}": self._rng.randint(20, 90)
+                for hour in range(4)
+                for minute in range(0, 60, 5)
+            },
+        }
+
+    def _activity(self, index: int) -> dict:
+        """Return a daily activity summary."""
+        day = BASE_DATE - timedelta(days=index)
+        return {
+            "id": 1000 + index,
+            "polar-user": f"https://www.polaraccesslink.com/v3/users/{USER_ID}",
+            "transaction-id": 179879,
+            "date": day.isoformat(),
+            "created": f"{day.isoformat()}T23:59:59.000Z",
+            "calories": self._rng.randint(1800, 3500),
+            "active-calories": self._rng.randint(300, 1500),
+            "duration": _iso_duration(self._rng.randint(3600, 20000)),
+            "active-steps": self._rng.randint(2000, 20000),
+        }
+
+    @_memoized
+    def _step_samples(self, index: int) -> dict:
+        """Return step samples of a daily activity, by minute."""
+        rng = random.Random(f"{self.config.seed}-steps-{index}")
+        return {
+            "interval": 1,
+            "samples": [
+                {
+                    "steps": rng.randint(0, 120) if 7 <= minute // 60 < 22 else 0,
+                    "time": f"{minute // 60:02d}:{minute % 60:02d}:00.000",
+                }
+                for minute in range(1440)
+            ],
+        }
+
+    @_memoized
+    def _zone_samples(self, index: int) -> dict:
+        """Return activity zone samples of a daily activity, by 5 minutes."""
+        rng = random.Random(f"{self.config.seed}-zones-{index}")
+        return {
+            "interval": 5,
+            "samples": [
+                {
+                    "activity-zones": [
+                        {"index": rng.randint(0, 4), "inzone": "PT5M"},
+                    ],
+                    "time": f"{minute // 60:02d}:{minute % 60:02d}:00.000",
+                }
+                for minute in range(0, 1440, 5)
+            ],
+        }
+
+    @_memoized
+    def _samples(self, exercise_id: str) -> list[dict]:
+        """Return samples of an exercise, as comma separated values."""
+        rng = random.Random(f"{self.config.seed}-{exercise_id}")
+        seconds = self.config.exercise_seconds
+        heart_rate = ",".join(str(rng.randint(90, 180)) for _ in range(seconds))
+        speed = ",".join(f"{rng.uniform(8, 16):.1f}" for _ in range(seconds))
+        altitude = ",".join(
+            f"{100 + 20 * math.sin(second / 300):.1f}" for second in range(seconds)
+        )
+        distance = ",".join(f"{second * 3.2:.1f}" for second in range(seconds))
+        return [
+            {"recording-rate": 1, "sample-type": "0", "data": heart_rate},
+            {"recording-rate": 1, "sample-type": "1", "data": speed},
+            {"recording-rate": 1, "sample-type": "3", "data": altitude},
+            {"recording-rate": 1, "sample-type": "10", "data": distance},
+        ]
+
+    @_memoized
+    def _gpx(self, exercise_id: str) -> bytes:
+        """Return the GPX route of an exercise."""
+        rng = random.Random(f"{self.config.seed}-{exercise_id}-route")
+        lat, lon = 48.85, 2.35
+        points = []
+        for second in range(self.config.exercise_seconds):
+            lat += rng.uniform(-0.00003, 0.00005)
+            lon += rng.uniform(-0.00003, 0.00005)
+            points.append(
+                f'<trkpt lat="{lat:.6f}" lon="{lon:.6f}">'
+                f"<ele>{100 + 20 * math.sin(second / 300):.1f}</ele>"
+                f"<time>2024-06-30T07:{second // 60 % 60:02d}:{second % 60:02d}Z</time>"
+                "</trkpt>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<gpx version="1.1" creator="Polar" '
+            'xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>'
+            + "".join(points)
+            + "</trkseg></trk></gpx>"
+        ).encode()
+
+    def _respond(self, request: web.Request, body: bytes, content_type: str):
+        """Return a response with an ETag, or 304 when the client has it."""
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.stats.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        headers = {"ETag": etag}
+        if self.config.compress and "gzip" in request.headers.get(
+            "Accept-Encoding", ""
+        ):
+            body = self._gzip(body)
+            headers["Content-Encoding"] = "gzip"
+        return web.Response(body=body, content_type=content_type, headers=headers)
+
+    @_memoized
+    def _gzip(self, body: bytes) -> bytes:
+        """Compress a body, reproducibly."""
+        return gzip.compress(body, mtime=0)
+
+    def _json(self, request: web.Request, data) -> web.Response:
+        """Return a JSON response."""
+        return self._respond(request, json.dumps(data).encode(), "application/json")
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Count requests, add latency and errors."""
+        self.stats.requests += 1
+        route = request.match_info.route.resource
+        name = route.canonical if route is not None else request.path
+        self.stats.by_endpoint[name] = self.stats.by_endpoint.get(name, 0) + 1
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        count = self._path_requests.get(request.path_qs, 0)
+        self._path_requests[request.path_qs] = count + 1
+        if (
+            self.config.error_rate
+            and random.Random(f"{self.config.seed}-{request.path_qs}-{count}").random()
+            < self.config.error_rate
+        ):
+            self.stats.errors += 1
+            return web.Response(status=503, text="Service unavailable")
+        response = await handler(request)
+        if isinstance(response.body, bytes):
+            self.stats.bytes_sent += len(response.body)
+        return response
+
+    async def _get_exercises(self, request: web.Request) -> web.Response:
+        return self._json(request, self._exercises)
+
+    async def _get_exercise(self, request: web.Request) -> web.Response:
+        exercise_id = request.match_info["exercise_id"]
+        exercise = next(
+            (exercise for exercise in self._exercises if exercise["id"] == exercise_id),
+            None,
+        )
+        if exercise is None:
+            raise web.HTTPNotFound
+        if request.query.get("samples") == "true":
+            exercise = {**exercise, "samples": self._samples(exercise_id)}
+        return self._json(request, exercise)
+
+    async def _get_gpx(self, request: web.Request) -> web.Response:
+        return self._respond(
+            request, self._gpx(request.match_info["exercise_id"]), "application/gpx+xml"
+        )
+
+    async def _get_sleep(self, request: web.Request) -> web.Response:
+        return self._json(request, {"nights": self._nights})
+
+    async def _get_recharge(self, request: web.Request) -> web.Response:
+        return self._json(request, {"recharges": self._recharges})
+
+    async def _get_user(self, request: web.Request) -> web.Response:
+        return self._json(
+            request,
+            {
+                "polar-user-id": USER_ID,
+                "member-id": "member",
+                "registration-date": "2020-01-01T00:00:00.000Z",
+                "first-name": "Jane",
+                "last-name": "Doe",
+                "birthdate": "1990-01-01",
+                "gender": "FEMALE",
+                "weight": 60.0,
+                "height": 170.0,
+            },
+        )
+
+    async def _create_physical_transaction(self, request: web.Request) -> web.Response:
+        if self._physical_info_committed:
+            return web.Response(status=204)
+        return web.json_response(
+            {
+                "transaction-id": 179881,
+                "resource-uri": f"{self.url}/users/{USER_ID}"
+                "/physical-information-transactions/1",
+            },
+            status=201,
+        )
+
+    async def _list_physical_infos(self, request: web.Request) -> web.Response:
+        transaction = f"{self.url}/users/{USER_ID}/physical-information-transactions/1"
+        return web.json_response(
+            {"physical-informations": [f"{transaction}/physical-informations/1"]}
+        )
+
+    async def _get_physical_info(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "id": 1,
+                "transaction-id": 179881,
+                "created": "2024-01-01T08:00:00.000Z",
+                "polar-user": f"https://www.polaraccesslink.com/v3/users/{USER_ID}",
+                "weight": 60.0,
+                "height": 170,
+                "maximum-heart-rate": 190,
+                "resting-heart-rate": 52,
+                "aerobic-threshold": 140,
+                "anaerobic-threshold": 170,
+                "vo2-max": 48,
+                "weight-source": "SOURCE_MEASURED",
+            }
+        )
+
+    async def _commit_physical_transaction(self, request: web.Request) -> web.Response:
+        self._physical_info_committed = True
+        return web.Response(status=200)
+
+    async def _get_notifications(self, request: web.Request) -> web.Response:
+        return self._json(
+            request,
+            {
+                "available-user-data": [
+                    {"user-id": USER_ID, "data-type": data_type, "url": ""}
+                    for data_type in ("EXERCISE", "ACTIVITY_SUMMARY")
+                ]
+            },
+        )
+
+    async def _create_transaction(self, request: web.Request) -> web.Response:
+        if not self._activities:
+            return web.Response(status=204)
+        return web.json_response(
+            {
+                "transaction-id": 179879,
+                "resource-uri": f"{self.url}/users/{USER_ID}/activity-transactions/1",
+            },
+            status=201,
+        )
+
+    async def _list_activities(self, request: web.Request) -> web.Response:
+        transaction = f"{self.url}/users/{USER_ID}/activity-transactions/1"
+        return web.json_response(
+            {
+                "activity-log": [
+                    f"{transaction}/activities/{index}"
+                    for index in range(len(self._activities))
+                ]
+            }
+        )
+
+    async def _get_activity(self, request: web.Request) -> web.Response:
+        return web.json_response(self._activities[int(request.match_info["index"])])
+
+    async def _get_step_samples(self, request: web.Request) -> web.Response:
+        return web.json_response(self._step_samples(int(request.match_info["index"])))
+
+    async def _get_zone_samples(self, request: web.Request) -> web.Response:
+        return web.json_response(self._zone_samples(int(request.match_info["index"])))
+
+    async def _commit_transaction(self, request: web.Request) -> web.Response:
+        # activities are served again by the next transaction, so every
+        # refresh downloads the same amount of data
+        return web.Response(status=200)
+
+    def _transaction_exercise(self, request: web.Request) -> tuple[int, dict]:
+        """Return index and summary of an exercise of a transaction."""
+        index = -int(request.match_info["index"])
+        exercise = self._exercise(index)
+        summary = {key.replace("_", "-"): value for key, value in exercise.items()}
+        summary["id"] = 900000 - index
+        return index, summary
+
+    async def _create_exercise_transaction(self, request: web.Request) -> web.Response:
+        # every transaction delivers exercises following the previous ones
+        if not self.config.new_exercises:
+            return web.Response(status=204)
+        self._exercise_transactions += 1
+        return web.json_response(
+            {
+                "transaction-id": self._exercise_transactions,
+                "resource-uri": f"{self.url}/users/{USER_ID}/exercise-transactions/"
+                f"{self._exercise_transactions}",
+            },
+            status=201,
+        )
+
+    async def _list_exercises(self, request: web.Request) -> web.Response:
+        transaction = int(request.match_info["transaction_id"])
+        first = (transaction - 1) * self.config.new_exercises + 1
+        return web.json_response(
+            {
+                "exercises": [
+                    f"{self.url}/users/{USER_ID}/exercise-transactions/"
+                    f"{transaction}/exercises/{index}"
+                    for index in range(first, first + self.config.new_exercises)
+                ]
+            }
+        )
+
+    async def _get_transaction_exercise(self, request: web.Request) -> web.Response:
+        return self._json(request, self._transaction_exercise(request)[1])
+
+    async def _list_transaction_samples(self, request: web.Request) -> web.Response:
+        index, _ = self._transaction_exercise(request)
+        return web.json_response(
+            {
+                "samples": [
+                    f"{request.url}/{sample['sample-type']}"
+                    for sample in self._samples(f"exercise{index:05d}")
+                ]
+            }
+        )
+
+    async def _get_transaction_sample(self, request: web.Request) -> web.Response:
+        index, _ = self._transaction_exercise(request)
+        sample = next(
+            sample
+            for sample in self._samples(f"exercise{index:05d}")
+            if sample["sample-type"] == request.match_info["sample_type"]
+        )
+        return self._json(request, sample)
+
+    async def _get_transaction_gpx(self, request: web.Request) -> web.Response:
+        index, _ = self._transaction_exercise(request)
+        return self._respond(
+            request, self._gpx(f"exercise{index:05d}"), "application/gpx+xml"
+        )
+
+    def _app(self) -> web.Application:
+        """Return the application."""
+        app = web.Application(middlewares=[self._middleware])
+        transaction = f"/v3/users/{USER_ID}/activity-transactions/{{transaction_id}}"
+        app.router.add_get("/v3/exercises", self._get_exercises)
+        app.router.add_get("/v3/exercises/{exercise_id}", self._get_exercise)
+        app.router.add_get("/v3/exercises/{exercise_id}/gpx", self._get_gpx)
+        app.router.add_get("/v3/users/sleep/", self._get_sleep)
+        app.router.add_get("/v3/users/nightly-recharge/", self._get_recharge)
+        app.router.add_get("/v3/notifications", self._get_notifications)
+        app.router.add_get(f"/v3/users/{USER_ID}", self._get_user)
+        app.router.add_post(
+            f"/v3/users/{USER_ID}/activity-transactions", self._create_transaction
+        )
+        app.router.add_get(transaction, self._list_activities)
+        app.router.add_put(transaction, self._commit_transaction)
+        app.router.add_get(f"{transaction}/activities/{{index}}", self._get_activity)
+        app.router.add_get(
+            f"{transaction}/activities/{{index}}/step-samples", self._get_step_samples
+        )
+        app.router.add_get(
+            f"{transaction}/activities/{{index}}/zone-samples", self._get_zone_samples
+        )
+        physical_transaction = (
+            f"/v3/users/{USER_ID}/physical-information-transactions/{{transaction_id}}"
+        )
+        app.router.add_post(
+            f"/v3/users/{USER_ID}/physical-information-transactions",
+            self._create_physical_transaction,
+        )
+        app.router.add_get(physical_transaction, self._list_physical_infos)
+        app.router.add_put(physical_transaction, self._commit_physical_transaction)
+        app.router.add_get(
+            f"{physical_transaction}/physical-informations/{{index}}",
+            self._get_physical_info,
+        )
+        exercise_transaction = (
+            f"/v3/users/{USER_ID}/exercise-transactions/{{transaction_id}}"
+        )
+        exercise = f"{exercise_transaction}/exercises/{{index}}"
+        app.router.add_post(
+            f"/v3/users/{USER_ID}/exercise-transactions",
+            self._create_exercise_transaction,
+        )
+        app.router.add_get(exercise_transaction, self._list_exercises)
+        app.router.add_put(exercise_transaction, self._commit_transaction)
+        app.router.add_get(exercise, self._get_transaction_exercise)
+        app.router.add_get(f"{exercise}/samples", self._list_transaction_samples)
+        app.router.add_get(
+            f"{exercise}/samples/{{sample_type}}", self._get_transaction_sample
+        )
+        app.router.add_get(f"{exercise}/gpx", self._get_transaction_gpx)
+        return app
+
+    async def start(self) -> None:
+        """Start the server on a free local port."""
+        self._server = TestServer(self._app())
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            await self._server.close()
+
+    def start_in_thread(self) -> None:
+        """Start the server in a thread with its own event loop.
+
+        Work of the server then does not block the event loop of the client.
+        """
+        loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=loop.run_forever, name="fake-accesslink", daemon=True
+        )
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+        self._loop = loop
+
+    def stop_thread(self) -> None:
+        """Stop the server started by start_in_thread."""
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,350 @@
+"""Benchmark a refresh of the Polar integration against a fake AccessLink.
+
+The coordinators of a config entry refresh together in a test Home Assistant
+instance with a recorder, with exercise samples, activity samples and route
+export enabled: exercises with their samples and routes, sleeps, nightly
+recharges, user data and a daily activity transaction with the step and zone
+samples of changed days, stored and imported as statistics. The first round
+starts with empty caches and stores and bootstraps exercises from the exercise
+list. The next rounds are warm refreshes, where unchanged responses are
+answered by 304 and new exercises come from training data transactions.
+
+It measures for each round:
+
+- wall time of the refresh,
+- requests received and bytes sent by the fake server,
+- time spent in executor jobs,
+- event loop lag, measured by a task sleeping every millisecond.
+
+The fake server generates its data from a seed, so runs with the same options
+are comparable. Results can be saved as JSON and compared with a saved run:
+
+    python scripts/benchmark/refresh.py --output baseline.json
+    python scripts/benchmark/refresh.py --compare baseline.json
+
+Home Assistant test helpers are needed to run the coordinators:
+
+    pip install pytest-homeassistant-custom-component
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from fake_accesslink import USER_ID, FakeAccessLink, FakeAccessLinkConfig
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_init_recorder_component,
+    async_test_home_assistant,
+)
+
+from homeassistant.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_EXTERNAL_URL,
+    CONF_NAME,
+    CONF_SCAN_INTERVAL,
+)
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from custom_components.polar.const import (
+    CONF_ACTIVITY_SAMPLES,
+    CONF_EXERCISE_SAMPLES,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_ROUTE_EXPORT,
+    CONF_USER_ID,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from custom_components.polar.coordinator import PolarData
+
+ACCESS_TOKEN = "benchmark"
+# seconds between two event loop lag samples
+LAG_INTERVAL = 0.001
+
+
+@dataclass
+class RoundResult:
+    """Measures of a refresh."""
+
+    wall_time: float
+    requests: int
+    not_modified: int
+    errors: int
+    bytes_received: int
+    executor_time: float
+    executor_jobs: int
+    loop_lag_max: float
+    loop_lag_total: float
+    failed_categories: int
+
+
+class TimingExecutor(ThreadPoolExecutor):
+    """Thread pool measuring time spent in its jobs."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the executor."""
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.busy_time = 0.0
+        self.jobs = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        """Submit a timed job."""
+
+        def _timed():
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.busy_time += elapsed
+                    self.jobs += 1
+
+        return super().submit(_timed)
+
+    def reset(self) -> None:
+        """Reset measures."""
+        with self._lock:
+            self.busy_time = 0.0
+            self.jobs = 0
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a sleeping task."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = max(loop.time() - expected, 0.0)
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+
+    def __enter__(self) -> LoopLagMonitor:
+        """Start monitoring."""
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop monitoring."""
+        assert self._task is not None
+        self._task.cancel()
+
+
+def _create_polar_data(
+    hass: HomeAssistant, args: argparse.Namespace, url: str
+) -> PolarData:
+    """Create the runtime data of an entry using the fake server."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Benchmark",
+        unique_id=str(USER_ID),
+        data={
+            CONF_CLIENT_ID: "client_id",
+            CONF_CLIENT_SECRET: "client_secret",
+            CONF_USER_ID: USER_ID,
+            CONF_ACCESS_TOKEN: ACCESS_TOKEN,
+            CONF_NAME: "Benchmark",
+            CONF_EXTERNAL_URL: "http://localhost:8123",
+            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+        },
+        options={
+            CONF_MAX_CONCURRENT_REQUESTS: args.concurrency,
+            CONF_EXERCISE_SAMPLES: True,
+            CONF_ACTIVITY_SAMPLES: True,
+            CONF_ROUTE_EXPORT: "gpx",
+        },
+    )
+    entry.add_to_hass(hass)
+    hass.data.setdefault(DOMAIN, {})
+    polar = PolarData(hass, entry)
+    polar.accesslink.oauth.url = url
+    return polar
+
+
+async def async_run(args: argparse.Namespace) -> list[RoundResult]:
+    """Run the benchmark rounds."""
+    fake = FakeAccessLink(
+        FakeAccessLinkConfig(
+            exercises=args.exercises,
+            nights=args.nights,
+            activities=args.activities,
+            new_exercises=args.new_exercises,
+            exercise_seconds=args.exercise_seconds,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            compress=not args.no_compression,
+            seed=args.seed,
+        )
+    )
+    fake.start_in_thread()
+    executor = TimingExecutor(max_workers=args.executor_workers)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with async_test_home_assistant(config_dir=config_dir) as hass:
+                # executor jobs of Home Assistant run in the default executor
+                hass.loop.set_default_executor(executor)
+                await async_init_recorder_component(hass)
+                polar = _create_polar_data(hass, args, fake.url)
+                for _ in range(args.rounds):
+                    results.append(await _async_round(polar, fake, executor))
+    finally:
+        fake.stop_thread()
+        executor.shutdown()
+    return results
+
+
+async def _async_round(
+    polar: PolarData, fake: FakeAccessLink, executor: TimingExecutor
+) -> RoundResult:
+    """Run and measure a refresh."""
+    requests = fake.stats.requests
+    not_modified = fake.stats.not_modified
+    errors = fake.stats.errors
+    bytes_sent = fake.stats.bytes_sent
+    executor.reset()
+    with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        await polar.async_refresh()
+        wall_time = time.perf_counter() - start
+    return RoundResult(
+        wall_time=wall_time,
+        requests=fake.stats.requests - requests,
+        not_modified=fake.stats.not_modified - not_modified,
+        errors=fake.stats.errors - errors,
+        bytes_received=fake.stats.bytes_sent - bytes_sent,
+        executor_time=executor.busy_time,
+        executor_jobs=executor.jobs,
+        loop_lag_max=monitor.max_lag,
+        loop_lag_total=monitor.total_lag,
+        failed_categories=sum(
+            not coordinator.last_update_success
+            for coordinator in polar.coordinators.values()
+        ),
+    )
+
+
+def summarize(results: list[RoundResult]) -> dict[str, dict[str, float]]:
+    """Return the cold round and the median of warm rounds."""
+    summary = {"cold": asdict(results[0])}
+    if warm := results[1:]:
+        summary["warm"] = {
+            name: statistics.median(getattr(result, name) for result in warm)
+            for name in asdict(warm[0])
+        }
+    return summary
+
+
+def _format_value(name: str, value: float) -> str:
+    """Format a measure."""
+    if name in ("wall_time", "executor_time", "loop_lag_max", "loop_lag_total"):
+        return f"{value * 1000:.1f} ms"
+    if name == "bytes_received":
+        return f"{value / 1024:.1f} KiB"
+    return f"{value:g}"
+
+
+def report(summary: dict, baseline: dict | None = None) -> str:
+    """Return a text report, with changes from a baseline."""
+    lines = []
+    for phase, measures in summary.items():
+        lines.append(f"{phase}:")
+        for name, value in measures.items():
+            line = f"  {name:<18} {_format_value(name, value):>12}"
+            reference = (baseline or {}).get(phase, {}).get(name)
+            if reference:
+                line += f"  {(value - reference) / reference * 100:+.1f}%"
+            elif reference == 0 and value:
+                line += "  (was 0)"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rounds", type=int, default=6, help="cold + warm rounds")
+    parser.add_argument("--exercises", type=int, default=30)
+    parser.add_argument("--nights", type=int, default=28)
+    parser.add_argument("--activities", type=int, default=7)
+    parser.add_argument(
+        "--new-exercises",
+        type=int,
+        default=1,
+        help="new exercises of each refresh after the first one",
+    )
+    parser.add_argument(
+        "--exercise-seconds",
+        type=int,
+        default=3600,
+        help="duration of exercises, in samples and route points",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="server latency, in seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of 503 responses"
+    )
+    parser.add_argument(
+        "--no-compression", action="store_true", help="do not gzip responses"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--executor-workers", type=int, default=min(32, (os.cpu_count() or 1) + 4)
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="save results as JSON")
+    parser.add_argument("--compare", type=Path, help="compare with saved results")
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+
+    results = asyncio.run(async_run(args))
+    summary = summarize(results)
+    baseline = None
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())["summary"]
+    print(report(summary, baseline))
+    if args.output is not None:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "options": {
+                        name: value
+                        for name, value in vars(args).items()
+                        if name not in ("output", "compare")
+                    },
+                    "rounds": [asdict(result) for result in results],
+                    "summary": summary,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
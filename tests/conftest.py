@@ -0,0 +1,30 @@
+"""Fixtures of the Polar tests."""
+
+import importlib.util
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).parents[1]
+LIBRARY_PATH = ROOT / "custom_components" / "polar" / "polaraccesslink"
+
+# the integration is imported from the repository
+sys.path.insert(0, str(ROOT))
+
+
+def _import_library() -> None:
+    """Import the AccessLink library as polaraccesslink.
+
+    The library does not depend on Home Assistant, so its tests run without
+    importing the integration package.
+    """
+    spec = importlib.util.spec_from_file_location(
+        "polaraccesslink",
+        LIBRARY_PATH / "__init__.py",
+        submodule_search_locations=[str(LIBRARY_PATH)],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["polaraccesslink"] = module
+    spec.loader.exec_module(module)
+
+
+_import_library()
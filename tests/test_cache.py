@@ -0,0 +1,44 @@
+"""Tests of the conditional request cache."""
+
+from polaraccesslink.cache import CachedResponse, ResponseCache
+
+
+def test_conditional_headers():
+    """Validators of a response are sent back to revalidate it."""
+    assert CachedResponse(
+        {}, b"", '"v1"', "Sat, 01 Jun 2024 07:00:00 GMT"
+    ).get_conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Sat, 01 Jun 2024 07:00:00 GMT",
+    }
+    assert CachedResponse({}, b"").get_conditional_headers() == {}
+
+
+def test_keys_do_not_hold_credentials():
+    """Responses are cached per URL and credentials, hashed."""
+    key = ResponseCache.build_key("https://polar/users/1", "Bearer token")
+    assert key[0] == "https://polar/users/1"
+    assert "token" not in key[1]
+    assert key != ResponseCache.build_key("https://polar/users/1", "Bearer other")
+
+
+def test_digest_tells_unchanged_bodies():
+    """Bodies with the same bytes have the same digest."""
+    assert ResponseCache.digest(b'{"a": 1}') == ResponseCache.digest(b'{"a": 1}')
+    assert ResponseCache.digest(b'{"a": 1}') != ResponseCache.digest(b'{"a": 2}')
+
+
+def test_least_recently_used_responses_are_evicted():
+    """Reading a response keeps it, the least recently used one is evicted."""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", CachedResponse("a", b"a"))
+    cache.set("b", CachedResponse("b", b"b"))
+    assert cache.get("a").data == "a"
+
+    cache.set("c", CachedResponse("c", b"c"))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").data == "a"
+
+    cache.clear()
+    assert len(cache) == 0
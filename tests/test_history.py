@@ -0,0 +1,91 @@
+"""Tests of the time-indexed histories."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.polar.history import ExerciseHistory, PolarHistory, SleepHistory
+
+
+def _history(history_class: type[PolarHistory], stored=None) -> PolarHistory:
+    """Return a history with a mocked store."""
+    with patch("custom_components.polar.history.Store") as store_class:
+        store_class.return_value.async_load = AsyncMock(return_value=stored)
+        history = history_class(MagicMock(), "entry_id")
+    asyncio.run(history.async_load())
+    return history
+
+
+def _exercise(exercise_id: str, start_time: str, **fields) -> dict:
+    """Return an exercise of the exercise list."""
+    return {"id": exercise_id, "start_time": start_time, **fields}
+
+
+def test_records_are_ordered_by_time():
+    """Records are kept newest first, whatever order they are merged in."""
+    history = _history(ExerciseHistory)
+    assert history.merge(
+        [
+            _exercise("b", "2024-06-02T07:00:00"),
+            _exercise("c", "2024-06-03T07:00:00"),
+            _exercise("a", "2024-06-01T07:00:00"),
+        ]
+    )
+    assert [exercise.id for exercise in history.records] == ["c", "b", "a"]
+    assert history.latest.id == "c"
+    assert [
+        exercise.id for exercise in history.between("2024-06-02", "2024-06-03")
+    ] == ["b"]
+    assert [exercise.id for exercise in history.between("2024-06-02")] == ["c", "b"]
+
+
+def test_merge_replaces_and_dedupes():
+    """A record replaces the one with its key, unchanged records are skipped."""
+    history = _history(ExerciseHistory)
+    history.merge([_exercise("a", "2024-06-01T07:00:00", calories=100)])
+    assert not history.merge([_exercise("a", "2024-06-01T07:00:00", calories=100)])
+
+    # moved in time
+    assert history.merge([_exercise("a", "2024-06-05T07:00:00", calories=200)])
+    assert len(history.records) == 1
+    assert history.get("a")["calories"] == 200
+    assert history.between("2024-06-01", "2024-06-02") == []
+
+
+def test_exercise_stored_under_other_id_is_skipped():
+    """Transactions and the exercise list identify exercises differently."""
+    history = _history(ExerciseHistory)
+    history.merge([_exercise("list-id", "2024-06-01T07:00:00")])
+    transaction_exercise = _exercise("123", "2024-06-01T07:00:00")
+
+    assert history.contains(history.get("list-id"))
+    assert not history.merge([transaction_exercise])
+    assert [exercise.id for exercise in history.records] == ["list-id"]
+
+
+def test_exercises_of_a_merge_under_other_ids_are_skipped():
+    """An exercise delivered twice in a merge, under two IDs, is stored once."""
+    history = _history(ExerciseHistory)
+    assert history.merge(
+        [
+            _exercise("list-id", "2024-06-01T07:00:00"),
+            _exercise("123", "2024-06-01T07:00:00"),
+            _exercise("456", "2024-06-02T07:00:00"),
+        ]
+    )
+    assert [exercise.id for exercise in history.records] == ["456", "list-id"]
+
+
+def test_excluded_fields_are_not_stored():
+    """Sample series of sleeps are stripped, on merge and from older stores."""
+    night = {"date": "2024-06-01", "sleep_score": 80, "hypnogram": {"00:00": 1}}
+    history = _history(SleepHistory, {"records": {"2024-06-01": night}})
+    assert history.get("2024-06-01").raw == {"date": "2024-06-01", "sleep_score": 80}
+    history._store.async_delay_save.assert_called_once()
+
+    assert not history.merge([night])
+    assert history.merge([{**night, "date": "2024-06-02", "heart_rate_samples": {}}])
+    assert "heart_rate_samples" not in history.latest.raw
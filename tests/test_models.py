@@ -0,0 +1,79 @@
+"""Tests of the typed records of Polar payloads."""
+
+from datetime import date, datetime, timedelta
+
+from polaraccesslink.models import (
+    DailyActivity,
+    Exercise,
+    Night,
+    PhysicalInfo,
+    UserInfo,
+)
+
+EXERCISE = {
+    "id": "abc",
+    "start_time": "2024-06-30T07:00:00",
+    "duration": "PT1H2M3S",
+    "sport": "RUNNING",
+}
+
+
+def test_fields_are_parsed_once_on_access():
+    """Typed fields are parsed on first access, then cached."""
+    exercise = Exercise(dict(EXERCISE))
+    assert exercise.parsed == {}
+
+    assert exercise.start_time == datetime(2024, 6, 30, 7)
+    assert exercise.parsed == {"start_time": datetime(2024, 6, 30, 7)}
+
+    exercise.raw["start_time"] = "2024-07-01T07:00:00"
+    assert exercise.start_time == datetime(2024, 6, 30, 7)
+    assert exercise.duration_seconds == 3723
+
+
+def test_invalid_and_missing_fields_are_none():
+    """Fields which are missing or can't be parsed are None."""
+    night = Night({"date": "not a date"})
+    assert night.date is None
+    assert night.sleep_start_time is None
+    assert night.sleep_seconds is None
+    assert "date" in night.parsed
+
+
+def test_record_is_a_mapping_of_the_payload():
+    """Records read like the payload, durations being formatted."""
+    exercise = Exercise(dict(EXERCISE))
+    assert exercise["duration"] == "1:02:03"
+    assert exercise["sport"] == "RUNNING"
+    assert dict(exercise) == {**EXERCISE, "duration": "1:02:03"}
+    assert len(exercise) == len(EXERCISE)
+    assert exercise == Exercise(dict(EXERCISE))
+    assert exercise.as_dict() is exercise.raw
+
+
+def test_already_formatted_duration():
+    """Durations stored as H:MM:SS are parsed too."""
+    activity = DailyActivity({"date": "2024-06-30", "duration": "2:30:00"})
+    assert activity.date == date(2024, 6, 30)
+    assert activity.duration == timedelta(hours=2, minutes=30)
+
+
+def test_exercise_from_transaction():
+    """Transaction summaries are converted to the exercise list format."""
+    exercise = Exercise.from_transaction(
+        {"id": 123, "start-time": "2024-06-30T07:00:00", "has-route": True}
+    )
+    assert exercise.id == "123"
+    assert exercise.start_time == datetime(2024, 6, 30, 7)
+    assert exercise.has_route
+
+
+def test_user_info_with_physical_info():
+    """Physical information replaces the profile fields it has."""
+    user_info = UserInfo({"first-name": "Jane", "weight": 60, "height": 170})
+    physical_info = PhysicalInfo(
+        {"created": "2024-06-30T07:00:00", "weight": 58.5, "height": None}
+    )
+    profile = user_info.with_physical_info(physical_info)
+    assert profile.raw == {"first-name": "Jane", "weight": 58.5, "height": 170}
+    assert user_info.with_physical_info(None) is user_info
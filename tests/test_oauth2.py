@@ -0,0 +1,174 @@
+"""Tests of the asynchronous OAuth2 client."""
+
+import asyncio
+
+from polaraccesslink.cache import ResponseCache
+from polaraccesslink.oauth2 import AsyncOAuth2Client
+from polaraccesslink.ratelimit import RateLimiter, RateLimitExceeded
+import pytest
+
+URL = "https://www.polaraccesslink.com/v3"
+
+
+class FakeResponse:
+    """Response of the fake session."""
+
+    def __init__(self, status, body=b"{}", headers=None):
+        """Init the response."""
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.reason = "Reason"
+        self.request_info = None
+        self.history = ()
+
+    @property
+    def content_length(self):
+        """Return the size of the body."""
+        return len(self.body)
+
+    async def read(self):
+        """Return the body."""
+        return self.body
+
+    async def text(self):
+        """Return the body as text."""
+        return self.body.decode()
+
+    def get_encoding(self):
+        """Return the body encoding."""
+        return "utf-8"
+
+    async def __aenter__(self):
+        """Return the response."""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Release the response."""
+
+
+class FakeSession:
+    """aiohttp session answering requests with prepared responses."""
+
+    def __init__(self, *responses):
+        """Init the session."""
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        """Return the next response."""
+        self.requests.append((method, url, kwargs.get("headers", {})))
+        return self.responses.pop(0)
+
+
+def _client(session):
+    """Return a client using the fake session."""
+    return AsyncOAuth2Client(
+        session=session,
+        url=URL,
+        authorization_url=None,
+        access_token_url=None,
+        redirect_url=None,
+        client_id="client_id",
+        client_secret="client_secret",
+        response_cache=ResponseCache(),
+        limiter=RateLimiter(),
+    )
+
+
+def _get_all(client, count):
+    """Get a cached resource several times, return the responses."""
+
+    async def _async_get_all():
+        return [
+            await client.get("/users/1", access_token="token", cache=True)
+            for _ in range(count)
+        ]
+
+    return asyncio.run(_async_get_all())
+
+
+def test_not_modified_response_reuses_cached_body():
+    """The ETag is sent back, and a 304 returns the cached object."""
+    session = FakeSession(
+        FakeResponse(200, b'{"id": 1}', {"ETag": '"v1"'}),
+        FakeResponse(304),
+        FakeResponse(200, b'{"id": 2}', {"ETag": '"v2"'}),
+    )
+    first, second, third = _get_all(_client(session), 3)
+
+    assert first == {"id": 1}
+    assert second is first
+    assert third == {"id": 2}
+    assert "If-None-Match" not in session.requests[0][2]
+    assert session.requests[1][2]["If-None-Match"] == '"v1"'
+    assert session.requests[2][2]["If-None-Match"] == '"v1"'
+
+
+def test_unchanged_body_without_validators_is_not_parsed_again():
+    """Without validators, the digest of the body tells it is unchanged."""
+    session = FakeSession(
+        FakeResponse(200, b'{"id": 1}'),
+        FakeResponse(200, b'{"id": 1}'),
+        FakeResponse(200, b'{"id": 2}'),
+    )
+    first, second, third = _get_all(_client(session), 3)
+
+    assert second is first
+    assert third == {"id": 2}
+    assert all("If-None-Match" not in headers for _, _, headers in session.requests)
+
+
+def test_uncached_requests_are_parsed_every_time():
+    """Responses are only cached when requested."""
+    session = FakeSession(FakeResponse(200, b'{"id": 1}', {"ETag": '"v1"'}))
+    session.responses.append(FakeResponse(200, b'{"id": 1}', {"ETag": '"v1"'}))
+    client = _client(session)
+
+    async def _async_get_twice():
+        return [await client.get("/users/1", access_token="token") for _ in range(2)]
+
+    first, second = asyncio.run(_async_get_twice())
+    assert first == second
+    assert second is not first
+    assert "If-None-Match" not in session.requests[1][2]
+
+
+def test_short_window_rate_limit_is_retried():
+    """A 429 of the short-term window is retried after the Retry-After delay."""
+    session = FakeSession(
+        FakeResponse(429, headers={"Retry-After": "0"}),
+        FakeResponse(200, b'{"id": 1}'),
+    )
+    client = _client(session)
+
+    assert asyncio.run(client.get("/users/1", access_token="token")) == {"id": 1}
+    assert len(session.requests) == 2
+    assert client.metrics.endpoints["GET /v3/users/{id}"].retries == 1
+
+
+def test_used_up_daily_quota_is_not_retried():
+    """A 429 of the long-term window fails at once, without more requests."""
+    session = FakeSession(
+        FakeResponse(
+            429,
+            headers={
+                "RateLimit-Usage": "20, 5000",
+                "RateLimit-Limit": "500, 5000",
+                "RateLimit-Reset": "600, 36000",
+                "Retry-After": "0",
+            },
+        ),
+        FakeResponse(200),
+    )
+    client = _client(session)
+
+    with pytest.raises(RateLimitExceeded) as err:
+        asyncio.run(client.get("/users/1", access_token="token"))
+    assert err.value.retry_after > 35000
+    assert len(session.requests) == 1
+
+    # later requests fail fast too, until the quota resets
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(client.get("/users/1", access_token="token"))
+    assert len(session.requests) == 1
@@ -0,0 +1,149 @@
+"""Tests of the request scheduling within Polar rate limits."""
+
+import asyncio
+
+from polaraccesslink.ratelimit import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    RateLimiter,
+    RateLimitExceeded,
+    parse_retry_after,
+)
+import pytest
+
+
+async def _async_acquire_in_order(limiter, order, name, priority):
+    """Acquire a slot, record when it is given, and release it."""
+    await limiter.acquire(priority)
+    order.append(name)
+    limiter.release()
+
+
+def test_priority_then_arrival_order():
+    """Requests are released by priority, then in arrival order."""
+
+    async def _async_test():
+        limiter = RateLimiter(max_concurrency=1)
+        await limiter.acquire()
+        order = []
+        tasks = [
+            asyncio.create_task(_async_acquire_in_order(limiter, order, name, priority))
+            for name, priority in (
+                ("low", PRIORITY_LOW),
+                ("high 1", PRIORITY_HIGH),
+                ("high 2", PRIORITY_HIGH),
+            )
+        ]
+        await asyncio.sleep(0)
+        assert order == []
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order == ["high 1", "high 2", "low"]
+
+    asyncio.run(_async_test())
+
+
+def test_cancelled_waiter_is_skipped():
+    """A cancelled request does not take a slot."""
+
+    async def _async_test():
+        limiter = RateLimiter(max_concurrency=1)
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        limiter.release()
+        await waiting
+        limiter.release()
+        assert limiter._active == 0
+        assert limiter._waiters == []
+
+    asyncio.run(_async_test())
+
+
+def test_slot_given_while_cancelled_is_released():
+    """A slot given to a request being cancelled is released again."""
+
+    async def _async_test():
+        limiter = RateLimiter(max_concurrency=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # the slot is given, then the request is cancelled before it runs
+        limiter.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter._active == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    asyncio.run(_async_test())
+
+
+def test_request_fails_fast_when_wait_exceeds_max_wait():
+    """A request raises instead of waiting longer than max_wait."""
+
+    async def _async_test():
+        limiter = RateLimiter(windows=((1, 3600),), max_wait=5)
+        async with limiter:
+            pass
+        with pytest.raises(RateLimitExceeded) as err:
+            await asyncio.wait_for(limiter.acquire(), 1)
+        assert err.value.retry_after > 5
+
+    asyncio.run(_async_test())
+
+
+def test_long_backoff_fails_waiting_requests():
+    """A Retry-After longer than max_wait fails every waiting request."""
+
+    async def _async_test():
+        limiter = RateLimiter(max_concurrency=1, max_wait=60)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        assert limiter.backoff("120") == 120
+        with pytest.raises(RateLimitExceeded):
+            await waiter
+        limiter.release()
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire()
+
+    asyncio.run(_async_test())
+
+
+def test_backoff_doubles_until_success():
+    """Backoff delays are jittered, doubled then reset by a success."""
+    limiter = RateLimiter()
+    assert 1 <= limiter.backoff() <= 2
+    assert 2 <= limiter.backoff() <= 4
+    limiter.succeeded()
+    assert 1 <= limiter.backoff() <= 2
+
+
+def test_update_from_headers():
+    """Usage reported by Polar sets the tokens left in its windows."""
+    limiter = RateLimiter(windows=((500, 900), (5000, 86400)), max_wait=60)
+    limiter.update(
+        {
+            "RateLimit-Usage": "500,1000",
+            "RateLimit-Limit": "500,5000",
+            "RateLimit-Reset": "300,80000",
+        }
+    )
+    assert 299 < limiter._delay() <= 300
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"), [(None, None), ("30", 30), ("-5", 0), ("soon", None)]
+)
+def test_parse_retry_after(value, expected):
+    """Retry-After headers are parsed as seconds."""
+    assert parse_retry_after(value) == expected
@@ -0,0 +1,196 @@
+"""Tests of exercise route files."""
+
+import asyncio
+import gzip
+
+from polaraccesslink.accesslink import AsyncAccessLink
+from polaraccesslink.routes import RouteFileWriter, open_route_file, summarize_route
+import pytest
+
+GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1">
+  <trk><trkseg>
+    <trkpt lat="60.0" lon="25.0"><ele>10.0</ele></trkpt>
+    <trkpt lat="60.001" lon="25.0"><ele>11.0</ele></trkpt>
+    <trkpt lat="60.002" lon="25.001"><ele>15.0</ele></trkpt>
+    <trkpt lat="60.003" lon="25.001"><ele>12.0</ele></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+TCX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase
+  xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities><Activity><Lap><Track>
+    <Trackpoint>
+      <Position>
+        <LatitudeDegrees>60.0</LatitudeDegrees>
+        <LongitudeDegrees>25.0</LongitudeDegrees>
+      </Position>
+      <AltitudeMeters>10.0</AltitudeMeters>
+      <DistanceMeters>0.0</DistanceMeters>
+    </Trackpoint>
+    <Trackpoint>
+      <Position>
+        <LatitudeDegrees>60.001</LatitudeDegrees>
+        <LongitudeDegrees>25.002</LongitudeDegrees>
+      </Position>
+      <AltitudeMeters>20.0</AltitudeMeters>
+      <DistanceMeters>160.5</DistanceMeters>
+    </Trackpoint>
+  </Track></Lap></Activity></Activities>
+</TrainingCenterDatabase>
+"""
+
+
+def _write(file_path, body):
+    """Write a route file, compressed when its name ends with .gz."""
+    with open_route_file(str(file_path), "wb") as route_file:
+        route_file.write(body)
+
+
+@pytest.mark.parametrize("name", ["route.gpx", "route.gpx.gz"])
+def test_summarize_gpx(tmp_path, name):
+    """Distance and elevation are computed from GPX track points."""
+    file_path = tmp_path / name
+    _write(file_path, GPX)
+
+    summary = summarize_route(str(file_path))
+    assert summary["points"] == 4
+    assert summary["distance"] == pytest.approx(346.7, abs=0.5)
+    # the 1 m rise is noise
+    assert summary["elevation_gain"] == 5.0
+    assert summary["elevation_loss"] == 3.0
+    assert summary["bounding_box"] == [60.0, 25.0, 60.003, 25.001]
+
+
+@pytest.mark.parametrize("name", ["route.tcx", "route.tcx.gz"])
+def test_summarize_tcx(tmp_path, name):
+    """The distance recorded in TCX track points is preferred."""
+    file_path = tmp_path / name
+    _write(file_path, TCX)
+
+    summary = summarize_route(str(file_path))
+    assert summary["points"] == 2
+    assert summary["distance"] == 160.5
+    assert summary["elevation_gain"] == 10.0
+    assert summary["bounding_box"] == [60.0, 25.0, 60.001, 25.002]
+
+
+def test_gz_route_is_compressed(tmp_path):
+    """Route files ending with .gz are gzip compressed."""
+    file_path = tmp_path / "route.gpx.gz"
+    _write(file_path, GPX)
+    assert gzip.decompress(file_path.read_bytes()) == GPX
+
+
+def test_writer_replaces_route_once_complete(tmp_path):
+    """The route replaces the existing file only once closed successfully."""
+    file_path = tmp_path / "routes" / "route.gpx"
+    file_path.parent.mkdir()
+    file_path.write_bytes(b"old")
+
+    writer = RouteFileWriter(str(file_path))
+    writer.open()
+    writer.write(GPX[:10])
+    assert file_path.read_bytes() == b"old"
+    writer.write(GPX[10:])
+    writer.close()
+
+    assert file_path.read_bytes() == GPX
+    assert [path.name for path in file_path.parent.iterdir()] == ["route.gpx"]
+
+
+def test_writer_keeps_route_on_failure(tmp_path):
+    """A failed download keeps the existing file and removes the partial one."""
+    file_path = tmp_path / "route.gpx"
+    file_path.write_bytes(b"old")
+
+    writer = RouteFileWriter(str(file_path))
+    writer.open()
+    writer.write(GPX[:10])
+    writer.close(False)
+
+    assert file_path.read_bytes() == b"old"
+    assert [path.name for path in tmp_path.iterdir()] == ["route.gpx"]
+
+
+class FakeContent:
+    """Body of a streamed response."""
+
+    def __init__(self, chunks, error):
+        """Init the body."""
+        self.chunks = chunks
+        self.error = error
+
+    async def iter_chunked(self, chunk_size):
+        """Yield the chunks, then fail if an error is set."""
+        for chunk in self.chunks:
+            yield chunk
+        if self.error:
+            raise self.error
+
+
+class FakeStreamedResponse:
+    """Streamed response of the fake session."""
+
+    def __init__(self, chunks, error=None):
+        """Init the response."""
+        self.status = 200
+        self.headers = {}
+        self.content = FakeContent(chunks, error)
+
+    async def __aenter__(self):
+        """Return the response."""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Release the response."""
+
+
+class FakeSession:
+    """aiohttp session answering with a streamed response."""
+
+    def __init__(self, response):
+        """Init the session."""
+        self.response = response
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        """Return the response."""
+        self.requests.append((url, kwargs.get("headers", {})))
+        return self.response
+
+
+def _export(session, file_path):
+    """Export a route with the fake session."""
+    accesslink = AsyncAccessLink(session, "client_id", "client_secret")
+    return asyncio.run(
+        accesslink.export_route("1", "token", str(file_path), route_format="gpx")
+    )
+
+
+def test_export_route_streams_to_file(tmp_path):
+    """Chunks of the route are written to the file as they arrive."""
+    file_path = tmp_path / "route.gpx.gz"
+    session = FakeSession(FakeStreamedResponse([GPX[:100], GPX[100:]]))
+
+    _export(session, file_path)
+
+    assert gzip.decompress(file_path.read_bytes()) == GPX
+    url, headers = session.requests[0]
+    assert url.endswith("/exercises/1/gpx")
+    assert headers["Accept"] == "application/gpx+xml"
+
+
+def test_export_route_failure_keeps_previous_file(tmp_path):
+    """A download failing midway leaves the previous route in place."""
+    file_path = tmp_path / "route.gpx"
+    file_path.write_bytes(b"old")
+    session = FakeSession(FakeStreamedResponse([GPX[:100]], OSError("reset")))
+
+    with pytest.raises(OSError, match="reset"):
+        _export(session, file_path)
+
+    assert file_path.read_bytes() == b"old"
+    assert [path.name for path in tmp_path.iterdir()] == ["route.gpx"]
@@ -0,0 +1,78 @@
+"""Tests of the decoding and binary storage of exercise samples."""
+
+from array import array
+import math
+import mmap
+
+from polaraccesslink.samples import decode_samples, dump_samples, load_samples
+import pytest
+
+SAMPLES = [
+    {"recording-rate": 1, "sample-type": "0", "data": "120,121,,70000"},
+    {"recording-rate": 5, "sample-type": "1", "data": "10.5,NaN,,11"},
+    {"recording-rate": 1, "sample-type": "42", "data": "1.5,2"},
+    {"recording-rate": 0, "sample-type": "11", "data": ""},
+]
+
+
+def test_samples_are_decoded_into_typed_arrays():
+    """Integer types are clamped unsigned shorts, missing values 0 or NaN."""
+    samples = decode_samples(SAMPLES)
+
+    heart_rate = samples[0]
+    assert heart_rate.name == "heart_rate"
+    assert heart_rate.recording_rate == 1
+    assert heart_rate.values == array("H", [120, 121, 0, 65535])
+
+    speed = samples[1].values
+    assert speed.typecode == "f"
+    assert speed[0] == 10.5
+    assert math.isnan(speed[1])
+    assert math.isnan(speed[2])
+    assert speed[3] == 11
+
+    # unknown types are decoded as floats
+    assert samples[42].name == "type_42"
+    assert samples[42].values == array("f", [1.5, 2])
+    assert len(samples[11]) == 0
+
+
+def test_malformed_samples_raise_value_error():
+    """Samples without type or of another shape are rejected."""
+    with pytest.raises(ValueError):
+        decode_samples([{"recording-rate": 1, "data": "1,2"}])
+    with pytest.raises(ValueError):
+        decode_samples("not samples")
+
+
+def test_dump_and_load_through_mmap(tmp_path):
+    """Samples written to a file are read back memory-mapped, unchanged."""
+    samples = decode_samples(SAMPLES)
+    file_path = tmp_path / "exercise.samples"
+    file_path.write_bytes(dump_samples(samples))
+
+    with (
+        open(file_path, "rb") as samples_file,
+        mmap.mmap(samples_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        loaded = load_samples(buffer)
+
+    assert loaded.keys() == samples.keys()
+    for sample_type, series in samples.items():
+        assert loaded[sample_type].recording_rate == series.recording_rate
+        assert loaded[sample_type].values.typecode == series.values.typecode
+        assert loaded[sample_type].values.tobytes() == series.values.tobytes()
+
+
+def test_load_from_memoryview():
+    """Files are padded to 8 bytes and can be read from any buffer."""
+    data = dump_samples(decode_samples(SAMPLES))
+    assert len(data) % 8 == 0
+    loaded = load_samples(memoryview(data))
+    assert loaded[0].values == array("H", [120, 121, 0, 65535])
+
+
+def test_other_files_are_rejected():
+    """A file without the samples header is not read."""
+    with pytest.raises(ValueError):
+        load_samples(bytes(16))
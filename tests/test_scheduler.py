@@ -0,0 +1,65 @@
+"""Tests of the adaptive polling of Polar data."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.polar.const import ATTR_EXERCISE_DATA, ATTR_SLEEP_DATA
+from custom_components.polar.scheduler import AdaptiveScheduler
+
+FLOOR = timedelta(minutes=10)
+CEILING = timedelta(hours=4)
+DEFAULT = timedelta(minutes=30)
+
+# nights ending around 07:10, polled densely from 06:30 to 09:00
+NIGHTS = [
+    {"sleep_end_time": f"2024-06-0{day}T07:{minute}:00+00:00"}
+    for day, minute in ((1, "05"), (2, "10"), (3, "20"))
+]
+
+
+def _at(hour: int, minute: int) -> datetime:
+    """Return a time of the day."""
+    return datetime(2024, 6, 4, hour, minute, tzinfo=UTC)
+
+
+def _scheduler(default: timedelta = DEFAULT) -> AdaptiveScheduler:
+    """Return a scheduler which learned the nights."""
+    scheduler = AdaptiveScheduler(FLOOR, CEILING, default)
+    scheduler.learn({ATTR_SLEEP_DATA: NIGHTS, ATTR_EXERCISE_DATA: []})
+    return scheduler
+
+
+@pytest.mark.parametrize(
+    ("default", "expected"),
+    [(DEFAULT, DEFAULT), (timedelta(minutes=1), FLOOR), (timedelta(days=1), CEILING)],
+)
+def test_default_interval_until_learned(default: timedelta, expected: timedelta):
+    """The default interval, clamped, is used without enough observations."""
+    scheduler = AdaptiveScheduler(FLOOR, CEILING, default)
+    scheduler.learn({ATTR_SLEEP_DATA: NIGHTS[:2]})
+    assert scheduler.next_interval(_at(7, 15)) == expected
+
+
+@pytest.mark.parametrize("time", [_at(6, 30), _at(7, 15), _at(8, 59)])
+def test_floor_inside_arrival_window(time: datetime):
+    """Data is polled every floor interval around the usual arrival."""
+    assert _scheduler().next_interval(time) == FLOOR
+
+
+def test_next_window_is_planned():
+    """The next update is planned at the start of the next window."""
+    assert _scheduler().next_interval(_at(5, 50)) == timedelta(minutes=40)
+
+
+def test_interval_is_never_below_floor():
+    """An update just before the window waits the floor interval."""
+    assert _scheduler().next_interval(_at(6, 25)) == FLOOR
+
+
+@pytest.mark.parametrize("time", [_at(2, 0), _at(9, 0)])
+def test_interval_is_never_above_ceiling(time: datetime):
+    """A window far away waits the ceiling interval at most."""
+    assert _scheduler().next_interval(time) == CEILING
@@ -0,0 +1,69 @@
+"""Tests of the Polar sensors."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.polar.const import ATTR_USER_DATA
+from custom_components.polar.coordinator import _fingerprint
+from custom_components.polar.sensor import SENSOR_DESCRIPTIONS, PolarSensor
+
+WEIGHT = next(
+    description for description in SENSOR_DESCRIPTIONS if description.key == "weight"
+)
+
+
+def _set_user(coordinator: MagicMock, user: dict) -> None:
+    """Set the user record as a coordinator refresh does."""
+    coordinator.data = {ATTR_USER_DATA: user}
+    coordinator.fingerprints = {ATTR_USER_DATA: _fingerprint(user)}
+
+
+def _sensor() -> tuple[PolarSensor, MagicMock]:
+    """Return the weight sensor and its coordinator."""
+    coordinator = MagicMock(entry_id="entry_id", user_name="user")
+    coordinator.last_update_success = True
+    _set_user(coordinator, {"weight": 70.0})
+    return PolarSensor(coordinator, WEIGHT), coordinator
+
+
+def test_fingerprint_ignores_key_order():
+    """Records with the same content have the same fingerprint."""
+    assert _fingerprint({"a": 1, "b": 2}) == _fingerprint({"b": 2, "a": 1})
+    assert _fingerprint({"a": 1}) != _fingerprint({"a": 2})
+
+
+def test_unchanged_record_is_not_written():
+    """A refresh bringing the same record does not write the state."""
+    sensor, coordinator = _sensor()
+    _set_user(coordinator, {"weight": 70.0})
+
+    with patch.object(sensor, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+    write.assert_not_called()
+    assert sensor.native_value == 70.0
+
+
+def test_changed_record_is_written():
+    """A refresh changing the record writes the new state."""
+    sensor, coordinator = _sensor()
+    _set_user(coordinator, {"weight": 71.5, "weight-source": "manual"})
+
+    with patch.object(sensor, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+        sensor._handle_coordinator_update()
+    write.assert_called_once()
+    assert sensor.native_value == 71.5
+    assert sensor.extra_state_attributes == {"weight-source": "manual"}
+
+
+def test_failed_refresh_is_written():
+    """A failed refresh writes the state, to show the sensor unavailable."""
+    sensor, coordinator = _sensor()
+    coordinator.last_update_success = False
+
+    with patch.object(sensor, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+    write.assert_called_once()
@@ -0,0 +1,112 @@
+"""Tests of the hourly rows of statistics."""
+
+from datetime import UTC, date, datetime
+from zoneinfo import ZoneInfo
+
+from polaraccesslink.statistic_rows import (
+    StatisticRow,
+    hour_start,
+    local_hour_starts,
+    merge_rows,
+    updated_rows,
+)
+import pytest
+
+PARIS = ZoneInfo("Europe/Paris")
+DAY = 86400
+
+
+def _utc_hours(starts):
+    """Return the UTC hours of timestamps."""
+    return [datetime.fromtimestamp(start, UTC).hour for start in starts]
+
+
+def _rows(*states, start=0):
+    """Return rows of consecutive days, with their running sum."""
+    rows = []
+    running_sum = 0.0
+    for day, state in enumerate(states):
+        running_sum += state
+        rows.append(StatisticRow(start + day * DAY, state, running_sum))
+    return rows
+
+
+def test_hour_start():
+    """Timestamps are moved to the next hour start, if not on the hour."""
+    assert hour_start(7200) == 7200
+    assert hour_start(7201) == 10800
+    assert hour_start(5400) == 7200
+
+
+def test_local_hours_of_a_regular_day():
+    """Every wall clock hour has its own start, also with half-hour offsets."""
+    assert _utc_hours(local_hour_starts(date(2024, 6, 1), 24, PARIS)) == [
+        22,
+        23,
+        *range(22),
+    ]
+    kolkata = local_hour_starts(date(2024, 6, 1), 24, ZoneInfo("Asia/Kolkata"))
+    assert len(set(kolkata)) == 24
+    assert all(start % 3600 == 0 for start in kolkata)
+
+
+def test_local_hours_of_daylight_saving_days():
+    """Skipped hours share the next start, repeated hours start once."""
+    spring = local_hour_starts(date(2024, 3, 31), 24, PARIS)
+    # 02:00 does not exist, it starts with 03:00
+    assert spring[2] == spring[3]
+    assert len(set(spring)) == 23
+
+    autumn = local_hour_starts(date(2024, 10, 27), 24, PARIS)
+    assert len(set(autumn)) == 24
+    assert autumn[3] - autumn[2] == 7200
+    assert all(later > earlier for earlier, later in zip(autumn, autumn[1:]))
+
+
+def test_first_import():
+    """Every value is imported, with its running sum."""
+    rows = updated_rows([], {DAY: 2000.0, 0: 1000.0})
+    assert rows == _rows(1000, 2000)
+
+
+def test_unchanged_values_are_not_imported():
+    """Nothing is imported when no value is new or changed."""
+    assert updated_rows(_rows(1000, 2000), {0: 1000.0, DAY: 2000.0}) == []
+    assert updated_rows(_rows(1000, 2000), {}) == []
+
+
+def test_new_day():
+    """A new day follows the sum of the last imported row."""
+    rows = updated_rows(_rows(1000, 2000), {DAY: 2000.0, 2 * DAY: 500.0})
+    assert rows == [StatisticRow(2 * DAY, 500.0, 3500.0)]
+
+
+def test_revised_earlier_day():
+    """A revised day is imported again, with every later row."""
+    imported = _rows(1000, 2000, 3000, 4000)
+    rows = updated_rows(imported, {DAY: 2500.0})
+    assert rows == _rows(1000, 2500, 3000, 4000)[1:]
+
+    # the first imported row, whose previous sum is unknown
+    rows = updated_rows(imported, {0: 1500.0, 4 * DAY: 100.0})
+    assert rows == _rows(1500, 2000, 3000, 4000, 100)
+
+
+def test_days_before_the_imported_rows_are_ignored():
+    """The sum before the first imported row is unknown."""
+    imported = _rows(1000, 2000, start=10 * DAY)
+    assert updated_rows(imported, {9 * DAY: 500.0}) == []
+    assert updated_rows(imported, {9 * DAY: 500.0, 11 * DAY: 3000.0}) == [
+        StatisticRow(11 * DAY, 3000.0, 4000.0)
+    ]
+
+
+@pytest.mark.parametrize("max_rows", [2, 5])
+def test_merge_rows(max_rows):
+    """Imported rows replace those with the same start, the last ones are kept."""
+    imported = _rows(1000, 2000, 3000)
+    rows = _rows(1000, 2500, 3000, 4000)[1:]
+    assert (
+        merge_rows(imported, rows, max_rows)
+        == (_rows(1000, 2500, 3000, 4000)[-max_rows:])
+    )
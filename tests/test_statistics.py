@@ -0,0 +1,104 @@
+"""Tests of the incremental import of long-term statistics."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.polar.const import ATTR_DAILY_DATA
+from custom_components.polar.polaraccesslink.models import DailyActivity
+from custom_components.polar.statistics import PolarStatisticsImporter
+from homeassistant.util import dt as dt_util
+
+STEPS_ID = "polar:12345_daily_steps"
+
+
+@pytest.fixture(params=["Europe/Paris", "Asia/Kolkata"])
+def time_zone(request):
+    """Use a local time zone, on the hour or not."""
+    default = dt_util.get_default_time_zone()
+    dt_util.set_default_time_zone(ZoneInfo(request.param))
+    yield request.param
+    dt_util.set_default_time_zone(default)
+
+
+def _activities(*steps: int) -> list[DailyActivity]:
+    """Return daily activities from June 1st, newest first."""
+    return [
+        DailyActivity({"date": f"2024-06-{day + 1:02d}", "active-steps": value})
+        for day, value in reversed(list(enumerate(steps)))
+    ]
+
+
+def _import(importer: PolarStatisticsImporter, activities) -> list:
+    """Import daily activities, return the daily steps rows sent to the recorder."""
+    recorder = MagicMock()
+
+    async def _async_add_executor_job(func, *args):
+        return func(*args)
+
+    recorder.async_add_executor_job = _async_add_executor_job
+    with (
+        patch("custom_components.polar.statistics.get_instance", return_value=recorder),
+        patch(
+            "custom_components.polar.statistics.get_last_statistics", return_value={}
+        ),
+        patch(
+            "custom_components.polar.statistics.async_add_external_statistics"
+        ) as add_statistics,
+    ):
+        asyncio.run(
+            importer.async_import({ATTR_DAILY_DATA: activities}, [ATTR_DAILY_DATA])
+        )
+    return [
+        row
+        for _, metadata, rows in (call.args for call in add_statistics.call_args_list)
+        if metadata["statistic_id"] == STEPS_ID
+        for row in rows
+    ]
+
+
+def test_only_new_days_are_imported(time_zone):
+    """Days before the last imported one are not sent again."""
+    importer = PolarStatisticsImporter(MagicMock(), "12345", "Jane")
+
+    rows = _import(importer, _activities(1000, 2000))
+    assert [(row["state"], row["sum"]) for row in rows] == [(1000, 1000), (2000, 3000)]
+
+    assert _import(importer, _activities(1000, 2000)) == []
+
+    # the last day was updated, and a new one added
+    rows = _import(importer, _activities(1000, 2500, 500))
+    assert [(row["state"], row["sum"]) for row in rows] == [(2500, 3500), (500, 4000)]
+
+
+def test_revised_days_are_imported_again(time_zone):
+    """A day updated by Polar is imported again with the days after it."""
+    importer = PolarStatisticsImporter(MagicMock(), "12345", "Jane")
+    _import(importer, _activities(1000, 2000, 3000))
+
+    rows = _import(importer, _activities(1500, 2000, 3000))
+    assert [(row["state"], row["sum"]) for row in rows] == [
+        (1500, 1500),
+        (2000, 3500),
+        (3000, 6500),
+    ]
+
+
+def test_rows_start_on_the_hour(time_zone):
+    """Rows start on the hour, within the local day of the record."""
+    importer = PolarStatisticsImporter(MagicMock(), "12345", "Jane")
+    rows = _import(importer, _activities(1000, 2000))
+
+    for row, day in zip(rows, (1, 2), strict=True):
+        assert row["start"].minute == 0
+        assert row["start"].second == 0
+        local_start = dt_util.as_local(row["start"])
+        assert local_start.day == day
+        assert local_start - dt_util.start_of_local_day(local_start) < timedelta(
+            hours=1
+        )
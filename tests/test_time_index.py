@@ -0,0 +1,66 @@
+"""Tests of the index of records sorted by time."""
+
+import random
+
+from polaraccesslink.time_index import TimeIndex
+
+
+def test_keys_are_sorted_by_time():
+    """Keys are returned newest first, records at the same time by key."""
+    index = TimeIndex(
+        {
+            "b": "2024-06-02T07:00:00",
+            "c": "2024-06-03T07:00:00",
+            "a": "2024-06-01T07:00:00",
+            "a2": "2024-06-01T07:00:00",
+        }
+    )
+    assert len(index) == 4
+    assert index.latest == "c"
+    assert index.between() == ["c", "b", "a2", "a"]
+
+
+def test_range_queries():
+    """Start is included and end excluded, a date bound matching its whole day."""
+    index = TimeIndex({str(day): f"2024-06-{day:02d}T12:00:00" for day in range(1, 8)})
+    assert index.between("2024-06-03", "2024-06-05") == ["4", "3"]
+    assert index.between("2024-06-06") == ["7", "6"]
+    assert index.between(end="2024-06-02") == ["1"]
+    assert index.between("2024-07-01") == []
+    assert index.at("2024-06-04T12:00:00") == ["4"]
+    assert index.at("2024-06-04") == []
+
+
+def test_update_moves_adds_and_removes():
+    """A bulk update moves, adds and removes records at once."""
+    index = TimeIndex({"a": "2024-06-01", "b": "2024-06-02", "c": "2024-06-03"})
+    index.update({"a": "2024-06-05", "c": None, "d": "2024-06-02"})
+    assert index.between() == ["a", "d", "b"]
+    assert index.at("2024-06-02") == ["b", "d"]
+    assert index.latest == "a"
+
+    index.update({})
+    assert index.between() == ["a", "d", "b"]
+
+
+def test_bulk_update_matches_sorted_records():
+    """Random bulk updates keep the index equal to the sorted records."""
+    rng = random.Random(0)
+    times = {}
+    index = TimeIndex()
+    for _ in range(50):
+        changes = {}
+        for _ in range(rng.randint(1, 20)):
+            key = str(rng.randrange(100))
+            changes[key] = (
+                None if rng.random() < 0.2 else f"2024-06-{rng.randint(1, 30):02d}"
+            )
+        index.update(changes)
+        for key, time in changes.items():
+            if time is None:
+                times.pop(key, None)
+            else:
+                times[key] = time
+        assert index.between() == [
+            key for _, key in sorted(((t, k) for k, t in times.items()), reverse=True)
+        ]
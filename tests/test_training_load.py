@@ -0,0 +1,125 @@
+"""Tests of the rolling training load."""
+
+from datetime import date, datetime, timedelta
+import math
+import random
+
+from polaraccesslink.models import Exercise
+from polaraccesslink.training_load import ACUTE_DAYS, CHRONIC_DAYS, TrainingLoad
+import pytest
+
+TODAY = date(2024, 6, 30)
+
+
+def _exercise(day, load, sport="RUNNING", hour=7):
+    """Return an exercise of a day."""
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+    return Exercise(
+        {
+            "id": f"{day}-{hour}",
+            "start_time": start.isoformat(),
+            "duration": "PT1H",
+            "distance": 10000,
+            "calories": 500,
+            "training_load": load,
+            "sport": sport,
+        }
+    )
+
+
+def test_windows_sum_their_days():
+    """Exercises are summed in the windows including their day."""
+    training_load = TrainingLoad(TODAY)
+    assert training_load.add(_exercise(TODAY, 100))
+    assert training_load.add(_exercise(TODAY - timedelta(days=10), 50, "CYCLING"))
+    # outside the chronic window
+    assert not training_load.add(_exercise(TODAY - timedelta(days=CHRONIC_DAYS), 70))
+
+    assert training_load.totals(ACUTE_DAYS) == {
+        "training_load": 100,
+        "duration": 3600,
+        "distance": 10000,
+        "calories": 500,
+    }
+    assert training_load.totals(CHRONIC_DAYS)["training_load"] == 150
+    assert training_load.totals(CHRONIC_DAYS, "CYCLING")["training_load"] == 50
+    assert training_load.sports == ["CYCLING", "RUNNING"]
+    assert training_load.acute_chronic_ratio == pytest.approx(
+        (100 / ACUTE_DAYS) / (150 / CHRONIC_DAYS)
+    )
+
+
+def test_known_exercise_is_not_counted_twice():
+    """An exercise is identified by its start time, whatever its ID."""
+    training_load = TrainingLoad(TODAY)
+    exercise = _exercise(TODAY, 100)
+    assert training_load.add(exercise)
+    other_id = Exercise({**exercise.raw, "id": "123"})
+    assert not training_load.add(other_id)
+    assert training_load.totals(ACUTE_DAYS)["training_load"] == 100
+
+
+def test_advance_removes_days_leaving_the_windows():
+    """Moving to a new day only removes the days leaving each window."""
+    training_load = TrainingLoad(TODAY)
+    training_load.add(_exercise(TODAY - timedelta(days=ACUTE_DAYS - 1), 100))
+
+    assert not training_load.advance(TODAY)
+    assert training_load.advance(TODAY + timedelta(days=1))
+    assert training_load.totals(ACUTE_DAYS)["training_load"] == 0
+    assert training_load.totals(CHRONIC_DAYS)["training_load"] == 100
+
+    assert training_load.advance(TODAY + timedelta(days=CHRONIC_DAYS - ACUTE_DAYS + 1))
+    assert training_load.totals(CHRONIC_DAYS)["training_load"] == 0
+    assert training_load.days == {}
+    assert training_load.acute_chronic_ratio is None
+
+
+def test_monotony_and_strain():
+    """Monotony is the mean daily load by its deviation, rest days included."""
+    training_load = TrainingLoad(TODAY)
+    assert training_load.monotony is None
+    loads = [100, 0, 50, 0, 100, 0, 0]
+    for age, load in enumerate(loads):
+        if load:
+            training_load.add(_exercise(TODAY - timedelta(days=age), load))
+
+    mean = sum(loads) / ACUTE_DAYS
+    deviation = math.sqrt(sum((load - mean) ** 2 for load in loads) / ACUTE_DAYS)
+    assert training_load.monotony == pytest.approx(mean / deviation)
+    assert training_load.strain == pytest.approx(sum(loads) * mean / deviation)
+
+
+def _brute_force(exercises, today, window):
+    """Return the training load of a window, summed from the exercises."""
+    return sum(
+        exercise.training_load
+        for exercise in exercises
+        if 0 <= (today - exercise.start_time.date()).days < window
+    )
+
+
+def test_rolling_matches_brute_force_with_restores():
+    """Totals kept up to date match sums of the exercises over 120 days."""
+    rng = random.Random(0)
+    start = TODAY - timedelta(days=120)
+    training_load = TrainingLoad(start)
+    exercises = []
+    for offset in range(120):
+        today = start + timedelta(days=offset)
+        training_load.advance(today)
+        for hour in range(rng.choice((0, 0, 1, 2))):
+            exercise = _exercise(today, rng.randint(10, 200), hour=6 + hour)
+            exercises.append(exercise)
+            training_load.add(exercise)
+        if offset % 17 == 0:
+            training_load = TrainingLoad.from_dict(training_load.as_dict())
+
+        for window in (ACUTE_DAYS, CHRONIC_DAYS):
+            assert training_load.totals(window)["training_load"] == pytest.approx(
+                _brute_force(exercises, today, window)
+            )
+
+    # a long gap empties the windows
+    assert training_load.advance(TODAY + timedelta(days=CHRONIC_DAYS))
+    assert training_load.totals(CHRONIC_DAYS)["training_load"] == 0
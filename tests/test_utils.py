@@ -0,0 +1,77 @@
+"""Tests of the bounded gather of Polar resources."""
+
+import asyncio
+
+from polaraccesslink.utils import gather_limited
+import pytest
+
+
+def test_results_keep_order_with_bounded_concurrency():
+    """At most max_concurrency getters run at once, results are in order."""
+    running = 0
+    max_running = 0
+
+    async def _get(item):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # later items finish first
+        await asyncio.sleep(0.001 * (10 - item))
+        running -= 1
+        return item * 2
+
+    results = asyncio.run(gather_limited(range(10), _get, 3))
+    assert results == [item * 2 for item in range(10)]
+    assert max_running == 3
+
+
+def test_first_failure_cancels_pending_getters():
+    """The first failure is raised, getters still running are cancelled."""
+    started = []
+    cancelled = []
+
+    async def _get(item):
+        started.append(item)
+        if item == 1:
+            raise ValueError("failed")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    async def _async_run():
+        with pytest.raises(ValueError, match="failed"):
+            await gather_limited(range(6), _get, 2)
+        # let the cancelled getters run their cancellation
+        await asyncio.sleep(0)
+
+    asyncio.run(_async_run())
+    assert started == [0, 1, 2]
+    assert cancelled == [0, 2]
+
+
+def test_cancellation_cancels_every_getter():
+    """Cancelling the gather cancels the getters, none is left running."""
+    started = asyncio.Event()
+    cancelled = []
+
+    async def _get(item):
+        started.set()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    async def _async_run():
+        task = asyncio.ensure_future(gather_limited(range(4), _get, 2))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(_async_run())
+    assert sorted(cancelled) == [0, 1]
@@ -0,0 +1,65 @@
+"""Tests of the webhook push mode."""
+
+import asyncio
+import hashlib
+import hmac
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.polar.const import (
+    ATTR_EXERCISE_DATA,
+    CONF_WEBHOOK_SECRET,
+    DOMAIN,
+)
+from custom_components.polar.coordinator import PolarData
+from custom_components.polar.webhook import (
+    EVENT_HEADER,
+    SIGNATURE_HEADER,
+    PolarWebhookView,
+)
+
+SECRET = "signature_secret_key"
+BODY = b'{"event": "EXERCISE", "user_id": 12345}'
+
+
+def _post(headers: dict[str, str], body: bytes = BODY):
+    """Post an event to the view, return the response and the Polar data."""
+    polar = MagicMock(spec=PolarData)
+    polar.user_id = "12345"
+    polar.entry.data = {CONF_WEBHOOK_SECRET: SECRET}
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"entry_id": polar}}
+    hass.async_create_task = MagicMock(side_effect=lambda coro: coro.close())
+    request = MagicMock()
+    request.app = {"hass": hass}
+    request.headers = headers
+    request.read = AsyncMock(return_value=body)
+    return asyncio.run(PolarWebhookView().post(request)), polar
+
+
+def test_ping_is_accepted_without_signature():
+    """Polar checks the URL with an unsigned PING when creating the webhook."""
+    response, polar = _post({EVENT_HEADER: "PING"}, b"")
+    assert response.status == 200
+    polar.async_request_categories_refresh.assert_not_called()
+
+
+def test_signed_event_refreshes_its_categories():
+    """A signed event refreshes the data categories it announces."""
+    signature = hmac.new(SECRET.encode(), BODY, hashlib.sha256).hexdigest()
+    response, polar = _post({EVENT_HEADER: "EXERCISE", SIGNATURE_HEADER: signature})
+    assert response.status == 200
+    polar.async_request_categories_refresh.assert_called_once_with([ATTR_EXERCISE_DATA])
+
+
+def test_event_with_invalid_signature_is_rejected():
+    """An event not signed with the secret of the webhook refreshes nothing."""
+    response, polar = _post({EVENT_HEADER: "EXERCISE", SIGNATURE_HEADER: "forged"})
+    assert response.status == 401
+    polar.async_request_categories_refresh.assert_not_called()
+
+    response, polar = _post({EVENT_HEADER: "EXERCISE"})
+    assert response.status == 401
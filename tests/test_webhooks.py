@@ -0,0 +1,28 @@
+"""Tests of the signature of Polar webhook events."""
+
+import hashlib
+import hmac
+
+from polaraccesslink.endpoints.webhooks import is_valid_signature
+
+SECRET = "signature_secret_key"
+BODY = b'{"event": "EXERCISE", "user_id": 12345}'
+
+
+def _sign(secret, body):
+    """Return the signature Polar sends with an event."""
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def test_valid_signature():
+    """An event signed with the secret of the webhook is accepted."""
+    assert is_valid_signature(SECRET, BODY, _sign(SECRET, BODY))
+
+
+def test_invalid_signatures():
+    """Events signed with another secret or altered are rejected."""
+    assert not is_valid_signature(SECRET, BODY, _sign("other", BODY))
+    assert not is_valid_signature(SECRET, BODY + b" ", _sign(SECRET, BODY))
+    assert not is_valid_signature(SECRET, BODY, "")
+    assert not is_valid_signature(None, BODY, _sign(SECRET, BODY))
+    assert not is_valid_signature("", BODY, _sign("", BODY))